@@ -9,6 +9,9 @@ from app.api.routes.admin_routes.document_routes import router as document_route
 from app.api.routes.admin_routes.notification_routes import router as notification_router
 from app.api.routes.admin_routes.analysis_routes import router as analysis_router
 from app.api.routes.admin_routes.dynamic_form_routes import router as dynamic_form_router
+from app.api.routes.admin_routes.job_routes import router as job_router
+from app.api.routes.admin_routes.metrics_routes import router as metrics_router
+from app.api.routes.admin_routes.vector_routes import router as vector_router
 
 router = APIRouter()
 # Base.metadata.create_all(engine)
@@ -25,3 +28,6 @@ router.include_router(document_router)
 router.include_router(notification_router)
 router.include_router(analysis_router)
 router.include_router(dynamic_form_router)
+router.include_router(job_router)
+router.include_router(metrics_router)
+router.include_router(vector_router)
@@ -2,8 +2,8 @@ from fastapi import Depends, HTTPException, APIRouter, Request
 from app.db.database import get_db
 from app.schemas.schema import AdminEditRequest, ChatInputRequest
 from app.models.rfp_models import User
-from app.api.routes.utils import get_current_user
-from app.services.admin_services import (admin_filter_questions_by_status_service,analyze_overall_score_service,edit_question_by_admin_service,regenerate_answer_with_chat_service)
+from app.api.routes.utils import get_current_user, sse_response
+from app.services.admin_services import (admin_filter_questions_by_status_service,analyze_overall_score_service,edit_question_by_admin_service,regenerate_answer_with_chat_service,stream_regenerate_answer_with_chat_service)
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.rate_limiter import limiter
 
@@ -62,3 +62,20 @@ async def regenerate_answer_with_chat(
         raise http_exc
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/questions/chat_input/stream")
+@limiter.limit("5/minute")
+async def stream_regenerate_answer_with_chat(
+    request: Request,
+    chat_prompt: ChatInputRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Server-Sent Events: `token` events with text deltas, then `done` with the saved version (or `error`)."""
+    try:
+        events = await stream_regenerate_answer_with_chat_service(chat_prompt, db)
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return sse_response(events)
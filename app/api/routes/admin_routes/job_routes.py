@@ -0,0 +1,143 @@
+import asyncio
+import json
+from typing import List, Optional
+from fastapi import (
+    UploadFile, File, Form, Depends, HTTPException, APIRouter, status, Request, Query)
+from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_db, AsyncSessionLocal
+from app.models.rfp_models import User, BackgroundJob
+from app.api.routes.utils import get_current_user
+from app.services.admin_services.rfp_service import enqueue_rfp_file
+from app.services.admin_services.bulk_answer_service import enqueue_bulk_answers
+from app.services.job_services import get_job, retry_job, serialize_job, TERMINAL_STATUSES
+from app.core.rate_limiter import limiter
+
+router = APIRouter()
+
+
+def _require_admin(current_user: User):
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Only admins can access processing jobs."
+        )
+
+
+async def _get_owned_job(job_id: str, db: AsyncSession, current_user: User) -> BackgroundJob:
+    job = await get_job(db, job_id)
+    if not job or job.admin_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/rfp-jobs/")
+@limiter.limit("2/minute")
+async def create_rfp_job(
+    request: Request,
+    file: UploadFile = File(...),
+    project_name: str = Form(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    provider: str = Form(...),
+    custom_message: str = Form(None)
+):
+    _require_admin(current_user)
+    return await enqueue_rfp_file(file, project_name, db, current_user, provider, custom_message)
+
+
+@router.post("/rfps/{rfp_id}/answer-jobs")
+@limiter.limit("5/minute")
+async def create_bulk_answer_job(
+    request: Request,
+    rfp_id: int,
+    provider: str = "gpt-4o-mini",
+    overwrite: bool = False,
+    question_ids: Optional[List[int]] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue answer generation for every assigned question of an RFP; poll it under /rfp-jobs."""
+    return await enqueue_bulk_answers(rfp_id, db, current_user, provider, overwrite, question_ids)
+
+
+@router.get("/rfp-jobs")
+async def list_rfp_jobs(
+    limit: int = 20,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    _require_admin(current_user)
+
+    jobs = await db.execute(
+        select(BackgroundJob)
+        .filter(BackgroundJob.admin_id == current_user.id)
+        .order_by(BackgroundJob.created_at.desc())
+        .limit(min(limit, 100))
+    )
+    return [serialize_job(job) for job in jobs.scalars().all()]
+
+
+@router.get("/rfp-jobs/{job_id}")
+async def get_rfp_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    _require_admin(current_user)
+    return serialize_job(await _get_owned_job(job_id, db, current_user))
+
+
+@router.get("/rfp-jobs/{job_id}/events")
+async def stream_rfp_job_events(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Server-Sent Events: one `progress` event per change, then a final `done` event."""
+    _require_admin(current_user)
+    await _get_owned_job(job_id, db, current_user)
+
+    async def event_stream():
+        last_seen = None
+        while True:
+            async with AsyncSessionLocal() as session:
+                job = await get_job(session, job_id)
+            if not job:
+                yield "event: error\ndata: {\"message\": \"Job not found\"}\n\n"
+                return
+
+            payload = serialize_job(job)
+            if job.updated_at != last_seen:
+                last_seen = job.updated_at
+                event = "done" if job.status in TERMINAL_STATUSES else "progress"
+                yield f"event: {event}\ndata: {json.dumps(jsonable_encoder(payload))}\n\n"
+
+            if job.status in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(1)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/rfp-jobs/{job_id}/retry")
+async def retry_rfp_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    _require_admin(current_user)
+    job = await _get_owned_job(job_id, db, current_user)
+
+    try:
+        job = await retry_job(db, job)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return serialize_job(job)
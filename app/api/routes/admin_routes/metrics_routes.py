@@ -0,0 +1,82 @@
+from fastapi import Depends, HTTPException, APIRouter, status
+from app.models.rfp_models import User
+from app.api.routes.utils import get_current_user
+from app.core.serpapi.serpapi import serpapi_cache
+from app.core.llm_client.response_cache import llm_response_cache
+from app.core.llm_client.scheduler import llm_scheduler
+from app.core.llm_client.health import model_health
+from app.core.llm_client.telemetry import llm_usage, USAGE_GROUPS
+from app.services.llm_services.keystone_cache import keystone_cache
+from app.services.file_services.pdf_extraction import pdf_ocr_cache
+from app.services.file_services.extraction_store import extraction_store
+
+router = APIRouter()
+
+
+def _require_admin(current_user: User):
+    if current_user.role.lower() != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view metrics."
+        )
+
+
+@router.get("/admin/metrics/search-cache")
+async def search_cache_stats(current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    if serpapi_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **serpapi_cache.stats()}
+
+
+@router.get("/admin/metrics/ocr-cache")
+async def ocr_cache_stats(current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    if pdf_ocr_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **pdf_ocr_cache.stats()}
+
+
+@router.get("/admin/metrics/extraction-store")
+async def extraction_store_stats(current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    return extraction_store.stats()
+
+
+@router.get("/admin/metrics/llm-cache")
+async def llm_cache_stats(current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    return llm_response_cache.stats()
+
+
+@router.get("/admin/metrics/keystone-cache")
+async def keystone_cache_stats(current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    return keystone_cache.stats()
+
+
+@router.get("/admin/metrics/llm-scheduler")
+async def llm_scheduler_stats(current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    return llm_scheduler.stats()
+
+
+@router.get("/admin/metrics/llm-health")
+async def llm_health_stats(current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    return model_health.stats()
+
+
+@router.get("/admin/metrics/llm-usage")
+async def llm_usage_stats(
+    group_by: str = "caller",
+    since_hours: float = 24,
+    current_user: User = Depends(get_current_user),
+):
+    _require_admin(current_user)
+    if group_by not in USAGE_GROUPS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"group_by must be one of: {', '.join(USAGE_GROUPS)}",
+        )
+    return await llm_usage.summary(group_by=group_by, since_hours=since_hours)
@@ -0,0 +1,62 @@
+from typing import List, Optional
+from fastapi import Depends, HTTPException, APIRouter, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_db
+from app.models.rfp_models import User
+from app.api.routes.utils import get_current_user
+from app.services.job_services import enqueue_job, find_active_job, serialize_job
+from app.services.llm_services.retrieval_service import (
+    check_vector_consistency,
+    VECTOR_BACKFILL_JOB,
+)
+
+router = APIRouter()
+
+
+def _require_admin(current_user: User):
+    if current_user.role.lower() != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can manage the vector store."
+        )
+
+
+@router.get("/admin/vector-store/consistency")
+async def vector_store_consistency(
+    document_ids: Optional[List[int]] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Compare each live document's expected chunk count with its namespace."""
+    _require_admin(current_user)
+    report = await check_vector_consistency(db, document_ids)
+    return {
+        "checked": len(report),
+        "inconsistent": [entry for entry in report if entry["status"] != "ok"],
+    }
+
+
+@router.post("/admin/vector-store/backfill")
+async def vector_store_backfill(
+    dry_run: bool = False,
+    document_ids: Optional[List[int]] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue a background job that re-indexes every document missing vectors."""
+    _require_admin(current_user)
+
+    # A failed backfill is simply superseded; only a live one is reused
+    active = await find_active_job(db, VECTOR_BACKFILL_JOB, VECTOR_BACKFILL_JOB)
+    if active:
+        return {**serialize_job(active), "already_queued": True}
+
+    job = await enqueue_job(
+        db,
+        VECTOR_BACKFILL_JOB,
+        payload={"dry_run": dry_run, "document_ids": document_ids},
+        admin_id=current_user.id,
+        stage_names=["check", "backfill"],
+        dedupe_key=VECTOR_BACKFILL_JOB,
+    )
+    return {"status": "queued", **serialize_job(job)}
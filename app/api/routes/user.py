@@ -2,7 +2,7 @@ from fastapi import APIRouter,Depends, Form, Request
 from sqlalchemy.orm import Session
 from app.models.rfp_models import User
 from app.db.database import get_db
-from app.api.routes.utils import get_current_user
+from app.api.routes.utils import get_current_user, sse_response
 from app.schemas.schema import UpdateAnswerRequest
 from app.services.user_services.user_service import UserService
 from fastapi import HTTPException
@@ -40,6 +40,26 @@ async def generate_answers(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/generate-answers/{question_id}/stream")
+@limiter.limit("5/minute")
+async def stream_generate_answers(
+    request: Request,
+    question_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    provider: str = "gpt-4o-mini"
+):
+    """Server-Sent Events: `token` events with text deltas, then `done` with the saved answer (or `error`)."""
+    try:
+        service = UserService(db)
+        events = await service.stream_answer(current_user, question_id, provider)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return sse_response(events)
+
+
 @router.get("/answers/{question_id}/versions")
 async def get_answer_versions(
     question_id: int,
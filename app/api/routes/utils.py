@@ -12,6 +12,9 @@ from email.mime.text import MIMEText
 from fastapi import BackgroundTasks
 import os
 import re
+import json
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -91,3 +94,16 @@ def clean_answer(text: str) -> str:
     text = re.sub(r'[#*`]+', '', text)
     text = re.sub(r'\s+', ' ', text).strip()  
     return text
+
+
+def sse_response(events) -> StreamingResponse:
+    """Server-Sent Events response for an async iterator of (event, data) pairs."""
+    async def event_stream():
+        async for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
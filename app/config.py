@@ -3,7 +3,6 @@ from dotenv import load_dotenv
 from fastapi_mail import ConnectionConfig
 from fastapi.security import OAuth2PasswordBearer
 from openai import OpenAI
-from pinecone import Pinecone, ServerlessSpec
 
 load_dotenv(override=True)
 
@@ -35,23 +34,102 @@ client = OpenAI(api_key=OPENAI_API_KEY)
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 PINECONE_ENV = os.getenv("PINECONE_ENV", "us-east-1")
 PINECONE_INDEX = "devkb"      #os.getenv("PINECONE_INDEX", "devkb")
-pc = Pinecone(api_key=PINECONE_API_KEY)
 
-if PINECONE_INDEX not in pc.list_indexes().names():
-    pc.create_index(
-        name=PINECONE_INDEX,
-        dimension=1536,
-        metric="cosine",
-        spec=ServerlessSpec(
-            cloud="aws",
-            region="us-east-1",
-        ),
-    )
+UPLOAD_FOLDER = "uploads"
+GENERATED_FOLDER = "generated_docs"
+LOGIN_URL = os.getenv("LOGIN_URL")
 
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "2"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "600"))
+# A job whose worker dies this many times is failed instead of requeued
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
 
+SERPAPI_BASE_URL = os.getenv("SERPAPI_BASE_URL", "https://serpapi.com")
+SERPAPI_CONCURRENCY = int(os.getenv("SERPAPI_CONCURRENCY", "6"))
+SERPAPI_TIMEOUT_SECONDS = float(os.getenv("SERPAPI_TIMEOUT_SECONDS", "15"))
+SERPAPI_MAX_RETRIES = int(os.getenv("SERPAPI_MAX_RETRIES", "2"))
 
-index = pc.Index(PINECONE_INDEX)
+SERPAPI_CACHE_ENABLED = os.getenv("SERPAPI_CACHE_ENABLED", "true").lower() == "true"
+SERPAPI_CACHE_TTL_SECONDS = int(os.getenv("SERPAPI_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+SERPAPI_CACHE_MAX_ENTRIES = int(os.getenv("SERPAPI_CACHE_MAX_ENTRIES", "20000"))
 
-UPLOAD_FOLDER = "uploads"
-GENERATED_FOLDER = "generated_docs"
-LOGIN_URL = os.getenv("LOGIN_URL")
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+LLM_CACHE_DURABLE = os.getenv("LLM_CACHE_DURABLE", "true").lower() == "true"
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "512"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+LLM_CACHE_BYPASS_CALLERS = {
+    name.strip() for name in os.getenv("LLM_CACHE_BYPASS_CALLERS", "").split(",") if name.strip()
+}
+
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() == "true"
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "120"))
+LLM_HTTP_TIMEOUT_SECONDS = float(os.getenv("LLM_HTTP_TIMEOUT_SECONDS", "600"))
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "100000"))
+EMBEDDING_BATCH_MAX_INPUTS = int(os.getenv("EMBEDDING_BATCH_MAX_INPUTS", "512"))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "2"))
+
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "pinecone")
+VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", "vector_store")
+EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "1536"))
+PINECONE_POOL_THREADS = int(os.getenv("PINECONE_POOL_THREADS", "8"))
+VECTOR_UPSERT_BATCH_SIZE = int(os.getenv("VECTOR_UPSERT_BATCH_SIZE", "100"))
+VECTOR_UPSERT_CONCURRENCY = int(os.getenv("VECTOR_UPSERT_CONCURRENCY", "4"))
+
+KEYSTONE_TOP_K = int(os.getenv("KEYSTONE_TOP_K", "60"))
+KEYSTONE_CONTEXT_TOKENS = int(os.getenv("KEYSTONE_CONTEXT_TOKENS", "4000"))
+KEYSTONE_CACHE_ENTRIES = int(os.getenv("KEYSTONE_CACHE_ENTRIES", "32"))
+KEYSTONE_VERSION_TTL_SECONDS = int(os.getenv("KEYSTONE_VERSION_TTL_SECONDS", "30"))
+
+LLM_OPENAI_RPM = int(os.getenv("LLM_OPENAI_RPM", "500"))
+LLM_CLAUDE_RPM = int(os.getenv("LLM_CLAUDE_RPM", "50"))
+LLM_OPENAI_TPM = int(os.getenv("LLM_OPENAI_TPM", "200000"))
+LLM_CLAUDE_TPM = int(os.getenv("LLM_CLAUDE_TPM", "40000"))
+LLM_OPENAI_CONCURRENCY = int(os.getenv("LLM_OPENAI_CONCURRENCY", "16"))
+LLM_CLAUDE_CONCURRENCY = int(os.getenv("LLM_CLAUDE_CONCURRENCY", "8"))
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "1024"))
+LLM_REASONING_TOKEN_HEADROOM = int(os.getenv("LLM_REASONING_TOKEN_HEADROOM", "4096"))
+LLM_RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "3"))
+LLM_MAX_RETRY_AFTER_SECONDS = float(os.getenv("LLM_MAX_RETRY_AFTER_SECONDS", "60"))
+LLM_HEALTH_WINDOW = int(os.getenv("LLM_HEALTH_WINDOW", "50"))
+LLM_CIRCUIT_MIN_CALLS = int(os.getenv("LLM_CIRCUIT_MIN_CALLS", "5"))
+LLM_CIRCUIT_ERROR_RATE = float(os.getenv("LLM_CIRCUIT_ERROR_RATE", "0.5"))
+LLM_CIRCUIT_COOLDOWN_SECONDS = float(os.getenv("LLM_CIRCUIT_COOLDOWN_SECONDS", "60"))
+# Models whose p95 latency exceeds this are tried after the others; 0 disables
+LLM_SLOW_P95_SECONDS = float(os.getenv("LLM_SLOW_P95_SECONDS", "0"))
+# Hedge delay until a model has a p95 of its own to hedge on; 0 disables hedging
+LLM_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "0"))
+LLM_USAGE_ENABLED = os.getenv("LLM_USAGE_ENABLED", "true").lower() == "true"
+LLM_USAGE_FLUSH_SECONDS = float(os.getenv("LLM_USAGE_FLUSH_SECONDS", "10"))
+LLM_USAGE_FLUSH_EVERY = int(os.getenv("LLM_USAGE_FLUSH_EVERY", "200"))
+# JSON object of model -> [input, output] USD per million tokens; overrides the built-in prices
+LLM_PRICES_JSON = os.getenv("LLM_PRICES_JSON", "")
+# Document tokens per call for prompts that embed a whole RFP; longer RFPs are map-reduced
+LLM_DOC_CHUNK_TOKENS = int(os.getenv("LLM_DOC_CHUNK_TOKENS", "40000"))
+# Processes extracting PDF text layers, and the smaller pool OCR'ing pages without one
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 2)))
+PDF_OCR_WORKERS = int(os.getenv("PDF_OCR_WORKERS", str(max((os.cpu_count() or 2) // 2, 1))))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+# OCR renders each region at the DPI that makes its text lines about
+# PDF_OCR_TARGET_LINE_PX tall, within these bounds; PDF_OCR_DPI when no lines are found
+PDF_OCR_DPI = int(os.getenv("PDF_OCR_DPI", "300"))
+PDF_OCR_MIN_DPI = int(os.getenv("PDF_OCR_MIN_DPI", "150"))
+PDF_OCR_MAX_DPI = int(os.getenv("PDF_OCR_MAX_DPI", "400"))
+PDF_OCR_TARGET_LINE_PX = int(os.getenv("PDF_OCR_TARGET_LINE_PX", "30"))
+PDF_OCR_CACHE_ENABLED = os.getenv("PDF_OCR_CACHE_ENABLED", "true").lower() == "true"
+PDF_OCR_CACHE_TTL_SECONDS = int(os.getenv("PDF_OCR_CACHE_TTL_SECONDS", str(90 * 24 * 3600)))
+PDF_OCR_CACHE_MAX_ENTRIES = int(os.getenv("PDF_OCR_CACHE_MAX_ENTRIES", "200000"))
+# Extracted pages keyed by file sha256 and extractor version
+EXTRACTION_STORE_ENABLED = os.getenv("EXTRACTION_STORE_ENABLED", "true").lower() == "true"
+EXTRACTION_STORE_PATH = os.getenv("EXTRACTION_STORE_PATH", "extraction_store")
+BULK_ANSWER_CONCURRENCY = int(os.getenv("BULK_ANSWER_CONCURRENCY", "4"))
+BULK_ANSWER_MAX_RETRIES = int(os.getenv("BULK_ANSWER_MAX_RETRIES", "2"))
+BULK_ANSWER_COMMIT_EVERY = int(os.getenv("BULK_ANSWER_COMMIT_EVERY", "10"))
+ANSWER_SESSION_ENTRIES = int(os.getenv("ANSWER_SESSION_ENTRIES", "16"))
+ANSWER_SESSION_TTL_SECONDS = int(os.getenv("ANSWER_SESSION_TTL_SECONDS", "1800"))
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import delete, func, select, update
+
+from app.db.database import AsyncSessionLocal
+from app.models.rfp_models import CacheEntry
+
+# How many writes may happen between two LRU size checks
+_EVICTION_CHECK_EVERY = 50
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Content address for a cache entry: sha256 over the JSON-encoded parts."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Small in-process LRU map with an optional per-entry TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def clear(self):
+        self._data.clear()
+
+    def keys(self):
+        return list(self._data.keys())
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self._data)
+
+
+class PersistentCache:
+    """
+    Postgres-backed key/value cache shared by every app process.
+
+    Entries live in the `cache_entries` table under a namespace, expire after
+    `ttl_seconds`, and the least recently read entries are evicted once the
+    namespace grows past `max_entries`. Hit/miss counters are per process.
+    Cache failures are logged and treated as misses; they never fail the caller.
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: Optional[int] = None, max_entries: Optional[int] = None):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+        self._writes_since_eviction_check = _EVICTION_CHECK_EVERY
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        now = datetime.utcnow()
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(CacheEntry.key, CacheEntry.value).filter(
+                        CacheEntry.namespace == self.namespace,
+                        CacheEntry.key.in_(keys),
+                        (CacheEntry.expires_at.is_(None)) | (CacheEntry.expires_at > now),
+                    )
+                )
+                found = {row.key: row.value for row in result.all()}
+
+                if found:
+                    await session.execute(
+                        update(CacheEntry)
+                        .where(CacheEntry.namespace == self.namespace, CacheEntry.key.in_(list(found)))
+                        .values(last_accessed_at=now, hit_count=CacheEntry.hit_count + 1)
+                    )
+                    await session.commit()
+        except Exception as e:
+            self.errors += 1
+            print(f"[CACHE ERROR] {self.namespace} read: {e}")
+            found = {}
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def get(self, key: str) -> Optional[Any]:
+        return (await self.get_many([key])).get(key)
+
+    async def set_many(self, items: Dict[str, Any]):
+        if not items:
+            return
+
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl_seconds) if self.ttl_seconds else None
+        try:
+            async with AsyncSessionLocal() as session:
+                for key, value in items.items():
+                    await session.merge(CacheEntry(
+                        namespace=self.namespace,
+                        key=key,
+                        value=value,
+                        created_at=now,
+                        expires_at=expires_at,
+                        last_accessed_at=now,
+                        hit_count=0,
+                    ))
+                await session.commit()
+
+                self.writes += len(items)
+                self._writes_since_eviction_check += len(items)
+                if self.max_entries and self._writes_since_eviction_check >= _EVICTION_CHECK_EVERY:
+                    self._writes_since_eviction_check = 0
+                    await self._evict_lru(session)
+        except Exception as e:
+            self.errors += 1
+            print(f"[CACHE ERROR] {self.namespace} write: {e}")
+
+    async def set(self, key: str, value: Any):
+        await self.set_many({key: value})
+
+    async def _evict_lru(self, session):
+        total = await session.scalar(
+            select(func.count()).select_from(CacheEntry).filter(CacheEntry.namespace == self.namespace)
+        )
+        overflow = (total or 0) - self.max_entries
+        if overflow <= 0:
+            return
+
+        oldest = (
+            select(CacheEntry.key)
+            .filter(CacheEntry.namespace == self.namespace)
+            .order_by(CacheEntry.last_accessed_at.asc())
+            .limit(overflow)
+        )
+        await session.execute(
+            delete(CacheEntry).where(
+                CacheEntry.namespace == self.namespace,
+                CacheEntry.key.in_(oldest.scalar_subquery()),
+            )
+        )
+        await session.commit()
+        self.evictions += overflow
+
+    async def purge_expired(self) -> int:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                delete(CacheEntry).where(
+                    CacheEntry.namespace == self.namespace,
+                    CacheEntry.expires_at.is_not(None),
+                    CacheEntry.expires_at <= datetime.utcnow(),
+                )
+            )
+            await session.commit()
+            return result.rowcount or 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+        }
@@ -1,6 +1,7 @@
 from .claude import ClaudeClient
 from .openai import OpenAIClient
 from .base import BaseLLMClient
+from .registry import client_registry
 
 PROVIDERS = {
     "claude": ClaudeClient,
@@ -23,6 +24,11 @@ MODEL_REGISTRY = {
 #     return PROVIDERS[provider](model=model)
 
 
+# Wrappers are cheap and stateless; the pooled SDK clients behind them
+# come from the process-wide ClientRegistry.
+_CLIENTS: dict[str, BaseLLMClient] = {}
+
+
 def get_llm_client(model: str) -> BaseLLMClient:
     model = model.lower().strip()
     # print(f"Requested LLM model: '{model}'")
@@ -35,6 +41,8 @@ def get_llm_client(model: str) -> BaseLLMClient:
     if provider_name not in PROVIDERS:
         raise ValueError(f"Provider '{provider_name}' not configured")
 
-    client_class = PROVIDERS[provider_name]
+    if model not in _CLIENTS:
+        client_class = PROVIDERS[provider_name]
+        _CLIENTS[model] = client_class(model=model)
 
-    return client_class(model=model)
+    return _CLIENTS[model]
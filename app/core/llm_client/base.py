@@ -1,14 +1,30 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Optional
 
 @dataclass
 class LLMResponse:
     content: str
     provider: str
     model: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency_seconds: float = 0.0
+    cached: bool = False
+    # Models tried (and failed) before this one answered
+    failed_models: List[str] = field(default_factory=list)
 
 class BaseLLMClient(ABC):
     @abstractmethod
     def complete(self, prompt: str, system: Optional[str] = None):
-        pass
\ No newline at end of file
+        pass
+
+    async def stream(self, prompt: str, system: Optional[str] = None, usage: Optional[dict] = None, **kwargs) -> AsyncIterator[str]:
+        """
+        Yield the completion as text deltas; clients without native streaming
+        yield it whole. Token counts are written into `usage` when given.
+        """
+        response = await self.complete(prompt=prompt, system=system, **kwargs)
+        if usage is not None:
+            usage.update(input_tokens=response.input_tokens, output_tokens=response.output_tokens)
+        yield response.content
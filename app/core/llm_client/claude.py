@@ -1,20 +1,58 @@
-import anthropic
 from .base import BaseLLMClient, LLMResponse
-from app.config import CLAUDE_API_KEY
+from .profiles import DEFAULT_PROFILE, GenerationProfile
+from .registry import client_registry
+
+# Messages API requires max_tokens; used when the profile leaves it open
+CLAUDE_DEFAULT_MAX_TOKENS = 18096
 
 class ClaudeClient(BaseLLMClient):
-    def __init__(self, model="claude-sonnet-4-20250514"):
-        self.client = anthropic.AsyncAnthropic(api_key=CLAUDE_API_KEY)
+    def __init__(self, model="claude-sonnet-4-20250514", registry=client_registry):
+        self.registry = registry
         self.model = model
 
-    async def complete(self, prompt: str, system=None, **kwargs):
+    @property
+    def client(self):
+        return self.registry.anthropic()
+
+    def _request_kwargs(self, system, profile: GenerationProfile, kwargs: dict) -> dict:
+        # Sampling parameters (temperature) are left out: current Anthropic
+        # SDKs no longer accept them on messages.create
+        profile = profile or DEFAULT_PROFILE
+        options = {"max_tokens": profile.max_tokens or CLAUDE_DEFAULT_MAX_TOKENS}
+        if system:
+            options["system"] = system
+        if profile.stop:
+            options["stop_sequences"] = list(profile.stop)
+        options.update(kwargs)
+        return options
+
+    async def complete(self, prompt: str, system=None, profile: GenerationProfile = None, **kwargs):
         print(f"ClaudeClient: Completing with model '{self.model}'")
 
         msg = await self.client.messages.create(
             model=self.model,
-            max_tokens=18096,
             messages=[{"role": "user", "content": prompt}],
-            **kwargs
+            **self._request_kwargs(system, profile, kwargs)
         )
 
-        return msg.content[0].text
\ No newline at end of file
+        return LLMResponse(
+            content=msg.content[0].text,
+            provider="claude",
+            model=self.model,
+            input_tokens=msg.usage.input_tokens,
+            output_tokens=msg.usage.output_tokens,
+        )
+
+    async def stream(self, prompt: str, system=None, profile: GenerationProfile = None, usage: dict = None, **kwargs):
+        print(f"ClaudeClient: Streaming with model '{self.model}'")
+
+        async with self.client.messages.stream(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            **self._request_kwargs(system, profile, kwargs)
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+            if usage is not None:
+                final = await stream.get_final_message()
+                usage.update(input_tokens=final.usage.input_tokens, output_tokens=final.usage.output_tokens)
@@ -0,0 +1,196 @@
+"""
+Per-model health for routing LLM calls.
+
+Each model keeps its last LLM_HEALTH_WINDOW call outcomes, from which the
+rolling error rate and p50/p95 latency are derived. A circuit breaker
+opens once the error rate over at least LLM_CIRCUIT_MIN_CALLS calls
+reaches LLM_CIRCUIT_ERROR_RATE; an open model is skipped by the fallback
+chain for LLM_CIRCUIT_COOLDOWN_SECONDS, then half-opens and lets a single
+trial call through, whose outcome closes or re-opens it. A trial that never
+reports back (its chain succeeded on an earlier model) expires after
+another cooldown.
+
+Latency feeds routing too, per caller, since a whole-RFP extraction and a
+one-line score call on the same model have nothing in common: once a
+model has LLM_CIRCUIT_MIN_CALLS successful calls from a caller in its
+window, a p95 above LLM_SLOW_P95_SECONDS moves it behind the other models
+of that caller's chains, and the p95 is the delay before that caller's
+calls to it are hedged.
+"""
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from app.config import (
+    LLM_HEALTH_WINDOW,
+    LLM_CIRCUIT_MIN_CALLS,
+    LLM_CIRCUIT_ERROR_RATE,
+    LLM_CIRCUIT_COOLDOWN_SECONDS,
+    LLM_SLOW_P95_SECONDS,
+)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class ModelHealth:
+    def __init__(
+        self,
+        model: str,
+        window: int = LLM_HEALTH_WINDOW,
+        min_calls: int = LLM_CIRCUIT_MIN_CALLS,
+        error_rate_threshold: float = LLM_CIRCUIT_ERROR_RATE,
+        cooldown_seconds: float = LLM_CIRCUIT_COOLDOWN_SECONDS,
+        slow_p95_seconds: float = LLM_SLOW_P95_SECONDS,
+    ):
+        self.model = model
+        self.window = max(window, 1)
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.slow_p95_seconds = slow_p95_seconds
+
+        # (ok, latency_seconds) of the most recent calls
+        self.outcomes: deque = deque(maxlen=self.window)
+        # Latencies of the most recent successful calls, per caller
+        self.caller_latencies: Dict[str, deque] = {}
+        self.state = CIRCUIT_CLOSED
+        self.opened_at = 0.0
+        self.trial_started_at: Optional[float] = None
+
+        self.calls = 0
+        self.failures = 0
+        self.times_opened = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for ok, _ in self.outcomes if not ok) / len(self.outcomes)
+
+    def latency(self, pct: float) -> Optional[float]:
+        return _percentile([latency for ok, latency in self.outcomes if ok], pct)
+
+    def _measured_p95(self, caller: str) -> Optional[float]:
+        """`caller`'s p95 latency, once it has enough successful calls to trust it."""
+        latencies = self.caller_latencies.get(caller, ())
+        if len(latencies) < self.min_calls:
+            return None
+        return _percentile(list(latencies), 95)
+
+    def is_slow(self, caller: str) -> bool:
+        if self.slow_p95_seconds <= 0:
+            return False
+        p95 = self._measured_p95(caller)
+        return p95 is not None and p95 > self.slow_p95_seconds
+
+    def hedge_delay(self, caller: str, default: float) -> float:
+        """Seconds to wait on this model before hedging `caller`'s call: its p95, or `default` until measured."""
+        p95 = self._measured_p95(caller)
+        return p95 if p95 is not None else default
+
+    def allow(self) -> bool:
+        """Whether a call may be sent to this model now."""
+        if self.state == CIRCUIT_CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == CIRCUIT_OPEN:
+            if now - self.opened_at < self.cooldown_seconds:
+                return False
+            self.state = CIRCUIT_HALF_OPEN
+            self.trial_started_at = None
+        if self.trial_started_at is not None and now - self.trial_started_at < self.cooldown_seconds:
+            return False
+        self.trial_started_at = now
+        return True
+
+    def _open(self):
+        if self.state != CIRCUIT_OPEN:
+            self.times_opened += 1
+            print(f"[LLM CIRCUIT] '{self.model}' opened (error rate {self.error_rate:.0%})")
+        self.state = CIRCUIT_OPEN
+        self.opened_at = time.monotonic()
+        self.trial_started_at = None
+
+    def record_success(self, latency: float, caller: str = "unknown"):
+        self.calls += 1
+        self.outcomes.append((True, latency))
+        if caller not in self.caller_latencies:
+            self.caller_latencies[caller] = deque(maxlen=self.window)
+        self.caller_latencies[caller].append(latency)
+        if self.state == CIRCUIT_HALF_OPEN:
+            print(f"[LLM CIRCUIT] '{self.model}' closed")
+            self.state = CIRCUIT_CLOSED
+            self.trial_started_at = None
+
+    def record_failure(self, latency: float, error: Exception):
+        self.calls += 1
+        self.failures += 1
+        self.last_error = str(error)[:300]
+        self.outcomes.append((False, latency))
+        if self.state == CIRCUIT_HALF_OPEN:
+            self._open()
+        elif len(self.outcomes) >= self.min_calls and self.error_rate >= self.error_rate_threshold:
+            self._open()
+
+    def stats(self) -> dict:
+        p50, p95 = self.latency(50), self.latency(95)
+        retry_in = self.cooldown_seconds - (time.monotonic() - self.opened_at)
+        return {
+            "model": self.model,
+            "circuit": self.state,
+            "retry_in_seconds": round(retry_in, 1) if self.state == CIRCUIT_OPEN and retry_in > 0 else 0,
+            "window_calls": len(self.outcomes),
+            "error_rate": round(self.error_rate, 3),
+            "p50_latency_seconds": round(p50, 3) if p50 is not None else None,
+            "p95_latency_seconds": round(p95, 3) if p95 is not None else None,
+            "p95_latency_seconds_by_caller": {
+                caller: round(p95, 3)
+                for caller in self.caller_latencies
+                if (p95 := self._measured_p95(caller)) is not None
+            },
+            "calls": self.calls,
+            "failures": self.failures,
+            "times_opened": self.times_opened,
+            "last_error": self.last_error,
+        }
+
+
+class HealthTracker:
+    def __init__(self):
+        self._models: Dict[str, ModelHealth] = {}
+
+    def for_model(self, model: str) -> ModelHealth:
+        model = model.lower().strip()
+        if model not in self._models:
+            self._models[model] = ModelHealth(model)
+        return self._models[model]
+
+    def route(self, models: List[str], caller: str = "unknown") -> List[str]:
+        """
+        The models of a fallback chain that may be called now, in order,
+        with models slow for `caller` moved behind the rest. If every circuit is open the
+        full chain is returned, since trying a tripped model beats failing
+        outright.
+        """
+        candidates = list(dict.fromkeys(models))
+        allowed = [model for model in candidates if self.for_model(model).allow()]
+        fast = [model for model in allowed if not self.for_model(model).is_slow(caller)]
+        slow = [model for model in allowed if model not in fast]
+        return (fast + slow) or candidates
+
+    def stats(self) -> dict:
+        return {model: health.stats() for model, health in self._models.items()}
+
+
+model_health = HealthTracker()
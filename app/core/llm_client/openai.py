@@ -1,16 +1,42 @@
-from openai import OpenAI
 from .base import BaseLLMClient, LLMResponse
-from app.config import OPENAI_API_KEY
-from openai import AsyncOpenAI
-from .base import BaseLLMClient
-from app.config import OPENAI_API_KEY
+from .profiles import DEFAULT_PROFILE, GenerationProfile
+from .registry import client_registry
+from app.config import EMBEDDING_MODEL, LLM_REASONING_TOKEN_HEADROOM
+
+# Reasoning models reject temperature/stop, and their completion budget
+# also pays for hidden reasoning tokens
+REASONING_MODEL_PREFIXES = ("o1", "o3", "o4", "gpt-5")
 
 class OpenAIClient(BaseLLMClient):
-    def __init__(self, model="gpt-4o-mini"):
-        self.client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+    def __init__(self, model="gpt-4o-mini", registry=client_registry):
+        self.registry = registry
         self.model = model
 
-    async def complete(self, prompt: str, system=None, **kwargs):
+    @property
+    def client(self):
+        return self.registry.openai()
+
+    @property
+    def is_reasoning_model(self) -> bool:
+        return self.model.startswith(REASONING_MODEL_PREFIXES)
+
+    def _request_kwargs(self, profile: GenerationProfile, kwargs: dict) -> dict:
+        profile = profile or DEFAULT_PROFILE
+        options = {}
+        if self.is_reasoning_model:
+            if profile.max_tokens:
+                options["max_completion_tokens"] = profile.max_tokens + LLM_REASONING_TOKEN_HEADROOM
+        else:
+            if profile.max_tokens:
+                options["max_completion_tokens"] = profile.max_tokens
+            if profile.temperature is not None:
+                options["temperature"] = profile.temperature
+            if profile.stop:
+                options["stop"] = list(profile.stop)
+        options.update(kwargs)
+        return options
+
+    async def complete(self, prompt: str, system=None, profile: GenerationProfile = None, **kwargs):
         if isinstance(system, (tuple, list)):
             system = " ".join(str(part) for part in system if part is not None)
         if isinstance(prompt, (tuple, list)):
@@ -24,18 +50,54 @@ class OpenAIClient(BaseLLMClient):
                 {"role": "system", "content": system or ""},
                 {"role": "user", "content": prompt}
             ],
-            **kwargs
+            **self._request_kwargs(profile, kwargs)
+        )
+
+        return LLMResponse(
+            content=response.choices[0].message.content,
+            provider="openai",
+            model=self.model,
+            input_tokens=response.usage.prompt_tokens if response.usage else 0,
+            output_tokens=response.usage.completion_tokens if response.usage else 0,
+        )
+
+    async def stream(self, prompt: str, system=None, profile: GenerationProfile = None, usage: dict = None, **kwargs):
+        if isinstance(system, (tuple, list)):
+            system = " ".join(str(part) for part in system if part is not None)
+        if isinstance(prompt, (tuple, list)):
+            prompt = " ".join(str(part) for part in prompt if part is not None)
+
+        print(f"OpenAIClient: Streaming with model '{self.model}'")
+
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system or ""},
+                {"role": "user", "content": prompt}
+            ],
+            stream=True,
+            stream_options={"include_usage": True},
+            **self._request_kwargs(profile, kwargs)
         )
 
-        return response.choices[0].message.content
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            # With include_usage the last chunk carries usage and no choices
+            if chunk.usage is not None and usage is not None:
+                usage.update(input_tokens=chunk.usage.prompt_tokens, output_tokens=chunk.usage.completion_tokens)
     
 
 
 class OpenAIEmbeddingClient:
-    def __init__(self, model="text-embedding-3-small"):
-        self.client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+    def __init__(self, model=EMBEDDING_MODEL, registry=client_registry):
+        self.registry = registry
         self.model = model
 
+    @property
+    def client(self):
+        return self.registry.openai()
+
     async def embed(self, texts):
         is_single_input = isinstance(texts, str)
         inputs = [texts] if is_single_input else texts
@@ -0,0 +1,50 @@
+"""
+Generation profiles: output budget and sampling settings per task.
+
+Every llm_service call site already names itself through `caller`; the
+profile registered under that name is passed to the provider client. A
+tight max_tokens keeps short tasks short on the provider side (and lets
+the scheduler budget tokens accurately) and cuts off runaway outputs.
+Callers without a profile keep the providers' defaults.
+"""
+from dataclasses import dataclass, asdict
+from typing import Optional, Tuple
+
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    stop: Optional[Tuple[str, ...]] = None
+
+    def cache_params(self) -> dict:
+        return {key: value for key, value in asdict(self).items() if value is not None}
+
+
+DEFAULT_PROFILE = GenerationProfile()
+
+GENERATION_PROFILES = {
+    # A single float
+    "analyze_answer_score_only": GenerationProfile(max_tokens=8, temperature=0.0, stop=("\n",)),
+    # Twelve one-line queries
+    "generate_search_queries": GenerationProfile(max_tokens=600, temperature=0.3),
+    "generate_search_queries_reduce": GenerationProfile(max_tokens=600, temperature=0.0),
+    # 3-5 paragraphs
+    "generate_summary": GenerationProfile(max_tokens=1200),
+    "generate_summary_reduce": GenerationProfile(max_tokens=1200),
+    # ~250-word proposal answers
+    "generate_answer_with_context": GenerationProfile(max_tokens=1500),
+    "regenerate_answer_with_chat_service": GenerationProfile(max_tokens=2000),
+    # Long structured briefs
+    "extract_company_background_from_rfp": GenerationProfile(max_tokens=8000),
+    "summarize_results_with_llm": GenerationProfile(max_tokens=8000),
+    # JSON extraction over the whole RFP. Output grows with the document and
+    # truncated JSON fails the pipeline, so these keep the providers' limits.
+    "questions_grouped_function": GenerationProfile(temperature=0.0),
+    "extract_questions_with_llm": GenerationProfile(temperature=0.0),
+    "classification_QaI": GenerationProfile(temperature=0.0),
+}
+
+
+def profile_for(caller: str) -> GenerationProfile:
+    return GENERATION_PROFILES.get(caller, DEFAULT_PROFILE)
@@ -0,0 +1,37 @@
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket: `rate_per_minute` tokens refill continuously up to
+    `capacity`. It never sleeps itself; `delay` says how long a caller would
+    have to wait for an amount and `take` spends it, so the scheduler can
+    decide who waits in priority order.
+
+    A request larger than `capacity` waits for a full bucket and then takes
+    its whole amount, leaving the bucket in debt; later callers wait until
+    the debt has refilled, so a long call is paid for in full.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate_per_second = max(rate_per_minute, 1) / 60.0
+        self.capacity = capacity or max(rate_per_minute / 6.0, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate_per_second)
+        self.updated = now
+
+    def delay(self, amount: float = 1.0) -> float:
+        """Seconds until `amount` can be taken; 0 when it can be taken now."""
+        self._refill()
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate_per_second
+
+    def take(self, amount: float = 1.0):
+        self._refill()
+        self.tokens -= amount
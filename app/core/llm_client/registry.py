@@ -0,0 +1,99 @@
+import asyncio
+import weakref
+from typing import Optional
+
+import anthropic
+import httpx
+from openai import AsyncOpenAI
+
+from app.config import (
+    OPENAI_API_KEY,
+    CLAUDE_API_KEY,
+    LLM_HTTP2,
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_MAX_KEEPALIVE,
+    LLM_HTTP_KEEPALIVE_EXPIRY,
+    LLM_HTTP_TIMEOUT_SECONDS,
+)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class ClientRegistry:
+    """
+    Process-wide SDK clients, one pooled httpx connection pool per provider.
+
+    Building AsyncOpenAI/AsyncAnthropic per call meant a new pool and a new TLS
+    handshake per request. Here each provider gets a single keep-alive pool
+    (HTTP/2 when `h2` is installed) that every wrapper shares. httpx pools
+    are bound to the event loop that created them, so clients are kept per
+    running loop.
+    """
+
+    def __init__(
+        self,
+        openai_api_key: str = OPENAI_API_KEY,
+        claude_api_key: str = CLAUDE_API_KEY,
+        openai_base_url: Optional[str] = None,
+        anthropic_base_url: Optional[str] = None,
+        http2: bool = LLM_HTTP2,
+        max_connections: int = LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry: float = LLM_HTTP_KEEPALIVE_EXPIRY,
+        timeout: float = LLM_HTTP_TIMEOUT_SECONDS,
+    ):
+        self.openai_api_key = openai_api_key
+        self.claude_api_key = claude_api_key
+        self.openai_base_url = openai_base_url
+        self.anthropic_base_url = anthropic_base_url
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=10.0)
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+    def _loop_clients(self) -> dict:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = asyncio.get_event_loop()
+        return self._clients.setdefault(loop, {})
+
+    def _http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(http2=self.http2, limits=self.limits, timeout=self.timeout)
+
+    def openai(self) -> AsyncOpenAI:
+        clients = self._loop_clients()
+        if "openai" not in clients:
+            clients["openai"] = AsyncOpenAI(
+                api_key=self.openai_api_key,
+                base_url=self.openai_base_url,
+                http_client=self._http_client(),
+            )
+        return clients["openai"]
+
+    def anthropic(self) -> anthropic.AsyncAnthropic:
+        clients = self._loop_clients()
+        if "anthropic" not in clients:
+            clients["anthropic"] = anthropic.AsyncAnthropic(
+                api_key=self.claude_api_key,
+                base_url=self.anthropic_base_url,
+                http_client=self._http_client(),
+            )
+        return clients["anthropic"]
+
+    async def aclose(self):
+        clients = self._loop_clients()
+        for client in clients.values():
+            await client.close()
+        clients.clear()
+
+
+client_registry = ClientRegistry()
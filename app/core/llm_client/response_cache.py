@@ -0,0 +1,118 @@
+from collections import defaultdict
+from typing import Optional
+
+from app.config import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_DURABLE,
+    LLM_CACHE_MEMORY_ENTRIES,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_BYPASS_CALLERS,
+)
+from app.core.cache import LRUCache, PersistentCache, make_cache_key
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache for LLM completions.
+
+    The key is a hash of (model, system prompt, prompt, generation params), so
+    only byte-identical requests share an entry. Reads go to the in-process
+    LRU first, then to the durable Postgres tier, whose hits are promoted
+    back into memory. Counters are kept per caller (the llm_service function
+    issuing the call).
+    """
+
+    def __init__(
+        self,
+        enabled: bool = LLM_CACHE_ENABLED,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+        ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+        durable: Optional[PersistentCache] = None,
+        bypass_callers: set = None,
+    ):
+        self.enabled = enabled
+        self.memory = LRUCache(max_entries=memory_entries, ttl_seconds=ttl_seconds)
+        self.durable = durable
+        self.bypass_callers = set(bypass_callers or ())
+        self._metrics = defaultdict(lambda: {
+            "memory_hits": 0,
+            "durable_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "writes": 0,
+        })
+
+    @staticmethod
+    def make_key(model: str, system: Optional[str], prompt: str, params: Optional[dict] = None) -> str:
+        return make_cache_key("llm", model, system or "", prompt, params or {})
+
+    def should_use(self, caller: str) -> bool:
+        """Whether `caller`'s completions are cached at all (LLM_CACHE_BYPASS_CALLERS are not)."""
+        if not self.enabled:
+            return False
+        if caller in self.bypass_callers:
+            self._metrics[caller]["bypassed"] += 1
+            return False
+        return True
+
+    async def get(self, key: str, caller: str, refresh: bool = False) -> Optional[str]:
+        """
+        The cached completion, or None. `refresh=True` (a regeneration) skips
+        the lookup, so the fresh completion the caller then `set`s replaces
+        the entry.
+        """
+        if refresh:
+            self._metrics[caller]["bypassed"] += 1
+            return None
+
+        value = self.memory.get(key)
+        if value is not None:
+            self._metrics[caller]["memory_hits"] += 1
+            return value
+
+        if self.durable is not None:
+            value = await self.durable.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                self._metrics[caller]["durable_hits"] += 1
+                return value
+
+        self._metrics[caller]["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str, caller: str):
+        if not value:
+            return
+        self.memory.set(key, value)
+        if self.durable is not None:
+            await self.durable.set(key, value)
+        self._metrics[caller]["writes"] += 1
+
+    def stats(self) -> dict:
+        callers = {}
+        for caller, counts in self._metrics.items():
+            hits = counts["memory_hits"] + counts["durable_hits"]
+            lookups = hits + counts["misses"]
+            callers[caller] = {
+                **counts,
+                "hit_rate": round(hits / lookups, 3) if lookups else None,
+            }
+
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self.memory),
+            "durable": self.durable.stats() if self.durable is not None else None,
+            "bypass_callers": sorted(self.bypass_callers),
+            "callers": callers,
+        }
+
+
+llm_response_cache = LLMResponseCache(
+    durable=PersistentCache(
+        "llm_response",
+        ttl_seconds=LLM_CACHE_TTL_SECONDS,
+        max_entries=LLM_CACHE_MAX_ENTRIES,
+    ) if LLM_CACHE_DURABLE else None,
+    bypass_callers=LLM_CACHE_BYPASS_CALLERS,
+)
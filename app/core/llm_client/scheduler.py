@@ -0,0 +1,274 @@
+"""
+Process-wide admission control for LLM calls.
+
+Every completion goes through the scheduler of the model it targets. A
+model's scheduler enforces its request (RPM) and token (TPM) budgets with
+token buckets, caps how many calls are in flight, and admits waiting
+callers by priority: interactive edits first, then ordinary requests, then
+background jobs. When the provider still answers 429, the model is paused
+for the Retry-After it asked for, so every caller backs off together
+instead of each burning its own retries.
+
+Limits default per provider (LLM_<PROVIDER>_RPM/_TPM/_CONCURRENCY) and can
+be overridden per model with "rpm", "tpm" and "concurrency" keys in
+MODEL_REGISTRY.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from app.config import (
+    LLM_OPENAI_RPM,
+    LLM_OPENAI_TPM,
+    LLM_OPENAI_CONCURRENCY,
+    LLM_CLAUDE_RPM,
+    LLM_CLAUDE_TPM,
+    LLM_CLAUDE_CONCURRENCY,
+    LLM_EXPECTED_OUTPUT_TOKENS,
+    LLM_MAX_RETRY_AFTER_SECONDS,
+)
+from app.core.tokens import estimate_tokens
+from . import MODEL_REGISTRY
+from .rate_limit import TokenBucket
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_NORMAL: "normal",
+    PRIORITY_BULK: "bulk",
+}
+
+PROVIDER_LIMITS = {
+    "openai": {"rpm": LLM_OPENAI_RPM, "tpm": LLM_OPENAI_TPM, "concurrency": LLM_OPENAI_CONCURRENCY},
+    "claude": {"rpm": LLM_CLAUDE_RPM, "tpm": LLM_CLAUDE_TPM, "concurrency": LLM_CLAUDE_CONCURRENCY},
+}
+
+# Status codes that mean "this model is busy, try it again later" rather
+# than "this model cannot serve the request"
+RATE_LIMIT_STATUS_CODES = {429, 529}
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("llm_priority", default=PRIORITY_NORMAL)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+@contextmanager
+def llm_priority(priority: int):
+    """Run the enclosed LLM calls (including those of awaited callees) at `priority`."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def estimate_request_tokens(prompt, system=None, max_output_tokens: int = LLM_EXPECTED_OUTPUT_TOKENS) -> int:
+    """Tokens a completion is expected to spend: prompt, system prompt and expected output."""
+    parts = []
+    for value in (system, prompt):
+        if isinstance(value, (tuple, list)):
+            parts.extend(str(part) for part in value if part is not None)
+        elif value:
+            parts.append(str(value))
+    return sum(estimate_tokens(part) for part in parts) + max_output_tokens
+
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    return getattr(exc, "status_code", None) in RATE_LIMIT_STATUS_CODES
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """The delay the provider asked for in its Retry-After headers, if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return min(float(retry_after_ms) / 1000.0, LLM_MAX_RETRY_AFTER_SECONDS)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        delay = float(retry_after)
+    except ValueError:
+        try:
+            delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(delay, 0.0), LLM_MAX_RETRY_AFTER_SECONDS)
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq")
+
+    def __init__(self, priority: int, seq: int):
+        self.priority = priority
+        self.seq = seq
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class ModelScheduler:
+    """
+    Admission control for one model.
+
+    Callers queue by (priority, arrival). Only the head of the queue may
+    spend from the request and token buckets, and it takes a concurrency
+    slot only once a slot is free, both buckets can pay for it and no
+    provider-requested pause is running. Until then it waits in the queue
+    without holding a slot, so a rate-limit wait never blocks the slots,
+    and a higher-priority arrival replaces it as the head.
+    """
+
+    def __init__(self, model: str, rpm: float, tpm: float, max_concurrency: int):
+        self.model = model
+        self.max_concurrency = max(int(max_concurrency), 1)
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.in_flight = 0
+        self.paused_until = 0.0
+
+        self._waiters: list = []
+        self._seq = itertools.count()
+        self._condition = asyncio.Condition()
+
+        self.admitted = 0
+        self.rate_limited = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.waits_by_priority: Dict[int, list] = {}
+
+    def _admission_delay(self, waiter: _Waiter, tokens: int) -> Optional[float]:
+        """
+        None while `waiter` is not at the head or no slot is free, else the
+        seconds until the pause ends and both buckets can pay for it.
+        """
+        if self._waiters[0] is not waiter or self.in_flight >= self.max_concurrency:
+            return None
+        return max(
+            self.paused_until - time.monotonic(),
+            self.requests.delay(1),
+            self.tokens.delay(tokens),
+            0.0,
+        )
+
+    async def _acquire(self, tokens: int, priority: int) -> float:
+        started = time.monotonic()
+        waiter = _Waiter(priority, next(self._seq))
+
+        async with self._condition:
+            heapq.heappush(self._waiters, waiter)
+            # A new head must re-check the buckets
+            self._condition.notify_all()
+            try:
+                while True:
+                    delay = self._admission_delay(waiter, tokens)
+                    if delay == 0:
+                        break
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+                raise
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.in_flight += 1
+            # The next caller is now the head
+            self._condition.notify_all()
+
+        waited = time.monotonic() - started
+        self.admitted += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        stats = self.waits_by_priority.setdefault(priority, [0, 0.0])
+        stats[0] += 1
+        stats[1] += waited
+        return waited
+
+    async def _release(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self, tokens: int, priority: Optional[int] = None):
+        """Hold one admitted call for the duration of the block; yields the seconds waited."""
+        waited = await self._acquire(tokens, current_priority() if priority is None else priority)
+        try:
+            yield waited
+        finally:
+            await self._release()
+
+    def pause(self, seconds: float):
+        """Hold back every caller of this model for `seconds`, e.g. after a 429."""
+        self.rate_limited += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "queue_depth": len(self._waiters),
+            "queued_by_priority": {
+                PRIORITY_NAMES.get(p, str(p)): sum(1 for w in self._waiters if w.priority == p)
+                for p in PRIORITY_NAMES
+            },
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "paused_seconds": round(max(self.paused_until - time.monotonic(), 0.0), 2),
+            "avg_wait_seconds": round(self.total_wait_seconds / self.admitted, 3) if self.admitted else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+            "avg_wait_by_priority": {
+                PRIORITY_NAMES.get(p, str(p)): round(total / count, 3)
+                for p, (count, total) in self.waits_by_priority.items() if count
+            },
+        }
+
+
+class LLMScheduler:
+    """One ModelScheduler per MODEL_REGISTRY model, created on first use."""
+
+    def __init__(self):
+        self._models: Dict[str, ModelScheduler] = {}
+
+    def for_model(self, model: str) -> ModelScheduler:
+        model = model.lower().strip()
+        if model not in self._models:
+            entry = MODEL_REGISTRY.get(model, {})
+            limits = {**PROVIDER_LIMITS.get(entry.get("provider"), PROVIDER_LIMITS["openai"]), **entry}
+            self._models[model] = ModelScheduler(
+                model,
+                rpm=limits["rpm"],
+                tpm=limits["tpm"],
+                max_concurrency=limits["concurrency"],
+            )
+        return self._models[model]
+
+    def stats(self) -> dict:
+        return {model: scheduler.stats() for model, scheduler in self._models.items()}
+
+
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,251 @@
+"""
+Token, cost and latency accounting for LLM calls.
+
+_complete_with_fallback and _stream_with_fallback record one row per call
+into the llm_usage table: the caller, the model that answered and the ones
+that failed first, token usage, estimated cost, provider latency and end to
+end latency. Rows are buffered and written in batches off the request path.
+
+The RFP and user a call is made for come from `llm_attribution`, set by
+the job runner, the RFP pipeline, bulk answering and the interactive
+answer paths.
+`llm_usage_meter` sums the provider-reported tokens of the calls made
+inside it, for callers that report their own throughput.
+"""
+import asyncio
+import contextvars
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import case, func, select
+
+from app.config import (
+    LLM_USAGE_ENABLED,
+    LLM_USAGE_FLUSH_SECONDS,
+    LLM_USAGE_FLUSH_EVERY,
+    LLM_PRICES_JSON,
+)
+from app.db.database import AsyncSessionLocal
+from app.models.rfp_models import LLMUsageRecord
+from .base import LLMResponse
+
+# USD per million (input, output) tokens
+LLM_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "claude-sonnet-4-6": (3.00, 15.00),
+    "claude-opus-4-6": (5.00, 25.00),
+    "claude-haiku-4-5-20251001": (1.00, 5.00),
+}
+if LLM_PRICES_JSON:
+    LLM_PRICES.update({model: tuple(prices) for model, prices in json.loads(LLM_PRICES_JSON).items()})
+
+USAGE_GROUPS = {
+    "caller": LLMUsageRecord.caller,
+    "model": LLMUsageRecord.model,
+    "rfp": LLMUsageRecord.rfp_id,
+    "user": LLMUsageRecord.user_id,
+}
+
+_attribution: contextvars.ContextVar[dict] = contextvars.ContextVar("llm_attribution", default={})
+_meters: contextvars.ContextVar[tuple] = contextvars.ContextVar("llm_usage_meters", default=())
+
+
+def current_attribution() -> dict:
+    return _attribution.get()
+
+
+@contextmanager
+def llm_attribution(rfp_id: Optional[int] = None, user_id: Optional[int] = None):
+    """Attribute the enclosed LLM calls to an RFP and/or user; unset values are inherited."""
+    merged = dict(_attribution.get())
+    if rfp_id is not None:
+        merged["rfp_id"] = rfp_id
+    if user_id is not None:
+        merged["user_id"] = user_id
+    token = _attribution.set(merged)
+    try:
+        yield
+    finally:
+        _attribution.reset(token)
+
+
+class UsageMeter:
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+@contextmanager
+def llm_usage_meter():
+    """Count the token usage providers report for the enclosed LLM calls; meters nest."""
+    meter = UsageMeter()
+    token = _meters.set(_meters.get() + (meter,))
+    try:
+        yield meter
+    finally:
+        _meters.reset(token)
+
+
+# Models already reported as missing from LLM_PRICES
+_unpriced_models = set()
+
+
+def estimate_cost(model: Optional[str], input_tokens: int, output_tokens: int) -> Optional[float]:
+    prices = LLM_PRICES.get((model or "").lower())
+    if prices is None:
+        if model and model not in _unpriced_models:
+            _unpriced_models.add(model)
+            print(f"[LLM USAGE] No price for '{model}'; its calls are recorded without cost. Add it to LLM_PRICES_JSON.")
+        return None
+    return (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+
+
+class LLMUsageRecorder:
+    def __init__(self, enabled: bool = LLM_USAGE_ENABLED, flush_every: int = LLM_USAGE_FLUSH_EVERY):
+        self.enabled = enabled
+        self.flush_every = flush_every
+        self._pending: List[dict] = []
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Flushes started from record(); the loop only keeps weak references
+        self._flush_tasks = set()
+
+    def record(
+        self,
+        caller: str,
+        requested_model: str,
+        response: Optional[LLMResponse],
+        total_seconds: float,
+        attribution: Optional[dict] = None,
+        streamed: bool = False,
+        error: Optional[Exception] = None,
+        failed_models: Optional[List[str]] = None,
+    ):
+        """Queue one call's record; `response` is None when every model failed."""
+        if response is not None:
+            for meter in _meters.get():
+                meter.calls += 1
+                meter.input_tokens += response.input_tokens
+                meter.output_tokens += response.output_tokens
+
+        if not self.enabled:
+            return
+        attribution = current_attribution() if attribution is None else attribution
+        row = {
+            "created_at": datetime.utcnow(),
+            "caller": caller,
+            "requested_model": requested_model,
+            "rfp_id": attribution.get("rfp_id"),
+            "user_id": attribution.get("user_id"),
+            "total_ms": int(total_seconds * 1000),
+            "streamed": streamed,
+            "success": response is not None,
+            "error": str(error)[:1000] if error is not None else None,
+        }
+        if response is not None:
+            failed_models = response.failed_models
+            row.update(
+                model=response.model,
+                provider=response.provider,
+                input_tokens=response.input_tokens,
+                output_tokens=response.output_tokens,
+                cost_usd=None if response.cached else estimate_cost(
+                    response.model, response.input_tokens, response.output_tokens
+                ),
+                latency_ms=int(response.latency_seconds * 1000),
+                cached=response.cached,
+            )
+        row["failed_models"] = list(failed_models or [])
+        row["attempts"] = len(row["failed_models"]) + (1 if response is not None else 0)
+        self._pending.append(row)
+
+        if len(self._pending) >= self.flush_every:
+            try:
+                task = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                return
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            try:
+                async with AsyncSessionLocal() as session:
+                    session.add_all([LLMUsageRecord(**row) for row in rows])
+                    await session.commit()
+            except Exception as e:
+                print(f"[LLM USAGE] Could not write {len(rows)} records: {e}")
+                return 0
+            return len(rows)
+
+    async def _flush_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+    def start(self, interval: float = LLM_USAGE_FLUSH_SECONDS):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._flush_loop(interval))
+
+    async def aclose(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def summary(self, group_by: str = "caller", since_hours: Optional[float] = 24) -> List[dict]:
+        """Totals per `group_by` (caller, model, rfp or user), most expensive first."""
+        await self.flush()
+        column = USAGE_GROUPS[group_by]
+        query = select(
+            column.label("key"),
+            func.count(LLMUsageRecord.id),
+            func.sum(LLMUsageRecord.input_tokens),
+            func.sum(LLMUsageRecord.output_tokens),
+            func.sum(LLMUsageRecord.cost_usd),
+            func.avg(LLMUsageRecord.latency_ms),
+            func.max(LLMUsageRecord.latency_ms),
+            func.avg(LLMUsageRecord.total_ms),
+            func.sum(LLMUsageRecord.attempts - 1),
+            func.sum(case((LLMUsageRecord.cached == True, 1), else_=0)),
+            func.sum(case((LLMUsageRecord.success == False, 1), else_=0)),
+        ).group_by(column)
+        if since_hours:
+            query = query.filter(LLMUsageRecord.created_at >= datetime.utcnow() - timedelta(hours=since_hours))
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+
+        result = [
+            {
+                group_by: key,
+                "calls": calls,
+                "input_tokens": input_tokens or 0,
+                "output_tokens": output_tokens or 0,
+                "cost_usd": round(cost, 4) if cost is not None else None,
+                "avg_latency_ms": round(avg_latency) if avg_latency is not None else None,
+                "max_latency_ms": max_latency,
+                "avg_total_ms": round(avg_total) if avg_total is not None else None,
+                "fallbacks": fallbacks or 0,
+                "cache_hits": cache_hits or 0,
+                "failures": failures or 0,
+            }
+            for key, calls, input_tokens, output_tokens, cost, avg_latency, max_latency,
+                avg_total, fallbacks, cache_hits, failures in rows
+        ]
+        result.sort(key=lambda row: (row["cost_usd"] or 0, row["input_tokens"] + row["output_tokens"]), reverse=True)
+        return result
+
+
+llm_usage = LLMUsageRecorder()
@@ -0,0 +1,65 @@
+def document_parts_text(parts: list, label: str = "PART") -> str:
+    """Consecutive partial results, numbered, as one text for a merge prompt."""
+    total = len(parts)
+    return "\n\n".join(
+        f"===== {label} {index} OF {total} =====\n{part.strip()}"
+        for index, part in enumerate(parts, start=1)
+    )
+
+
+def partial_extractions_text(partials: list) -> str:
+    """
+    Per-part extractions of a long RFP, passed as the RFP text to
+    summary_and_analysis_prompt so the merge produces the same three sections.
+    """
+    return f"""
+The RFP was too long to read in one pass. Below are extractions made
+separately from each consecutive part of the SAME RFP, in document order.
+Treat them together as the RFP text: combine what each part found, keep
+every detail verbatim, drop duplicates, and only write "No information
+available" for an element that no part found.
+
+{document_parts_text(partials)}
+"""
+
+
+def search_queries_reduce_prompt(candidates: list) -> str:
+    candidate_list = "\n".join(f"- {query}" for query in candidates)
+    return f"""
+    You are an expert market intelligence researcher.
+
+    The candidate Google search queries below were generated separately from
+    consecutive parts of ONE RFP document.
+
+    Your task: Select or merge them into exactly 12 search queries that together
+    best profile the issuing organization and this RFP.
+
+    The queries must:
+    - Remove duplicates and near-duplicates.
+    - Keep the unique identifiers (company name, product names, technologies, industries).
+    - Still cover company history, products and services, markets, partners, locations,
+      awards, financials, competitors, technology, news, submission requirements and
+      submission deadlines.
+
+    Format:
+    - Output as a bullet list, one query per line.
+    - Do not add explanations — only the search queries.
+
+    Candidate queries:
+    {candidate_list}
+    """
+
+
+def summary_chunk_prompt(text: str, part: int, total: int) -> str:
+    return (
+        f"The following is part {part} of {total} of a long RFP. Summarize what this part "
+        f"covers in 1-2 paragraphs, keeping names, dates, amounts and requirements:\n\n{text}"
+    )
+
+
+def summary_reduce_prompt(partials: list) -> str:
+    return (
+        "The following are summaries of consecutive parts of one RFP. Combine them into a "
+        "single summary of the whole RFP in 3-5 paragraphs:\n\n"
+        f"{document_parts_text(partials, label='SUMMARY OF PART')}"
+    )
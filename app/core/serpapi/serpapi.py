@@ -1,23 +1,190 @@
+import asyncio
+import re
+import unicodedata
+from typing import Optional
 
-import requests
-from app.config import SERPAPI_KEY
+import httpx
 
-def search_with_serpapi(query: str):
-    url = "https://serpapi.com/search"
-    params = {
-        "engine": "google",
-        "q": query,
-        "api_key": SERPAPI_KEY
-    }
-    res = requests.get(url, params=params)
-    data = res.json()
+from app.config import (
+    SERPAPI_KEY,
+    SERPAPI_BASE_URL,
+    SERPAPI_CONCURRENCY,
+    SERPAPI_TIMEOUT_SECONDS,
+    SERPAPI_MAX_RETRIES,
+    SERPAPI_CACHE_ENABLED,
+    SERPAPI_CACHE_TTL_SECONDS,
+    SERPAPI_CACHE_MAX_ENTRIES,
+)
+from app.core.cache import PersistentCache, make_cache_key
 
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class SerpAPIError(Exception):
+    """Raised when SerpAPI answers with an error status."""
+
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        super().__init__(f"SerpAPI returned HTTP {status_code}")
+
+
+def normalize_query(query: str) -> str:
+    """Fold case, unicode forms, quotes and whitespace so equivalent searches share a cache entry."""
+    query = unicodedata.normalize("NFKC", query or "").lower()
+    query = query.replace('"', " ").replace("'", " ")
+    query = re.sub(r"\s+", " ", query)
+    return query.strip(" -•.,;:")
+
+
+def parse_serpapi_results(data: dict, limit: int = 5) -> list:
     results = []
     if "organic_results" in data:
-        for item in data["organic_results"][:5]:
+        for item in data["organic_results"][:limit]:
             results.append({
                 "title": item.get("title"),
                 "link": item.get("link"),
                 "snippet": item.get("snippet")
             })
-    return results
\ No newline at end of file
+    return results
+
+
+class SerpAPIClient:
+    """
+    Async SerpAPI client sharing one pooled httpx.AsyncClient.
+
+    `base_url` and `transport` make the backend pluggable: point base_url at a
+    local stub server (SERPAPI_BASE_URL) to benchmark, or pass an
+    httpx.MockTransport to run without a network.
+
+    With a `cache`, search_many looks every normalized query up first and
+    only sends the misses to SerpAPI.
+    """
+
+    def __init__(
+        self,
+        api_key: str = SERPAPI_KEY,
+        base_url: str = SERPAPI_BASE_URL,
+        concurrency: int = SERPAPI_CONCURRENCY,
+        timeout: float = SERPAPI_TIMEOUT_SECONDS,
+        max_retries: int = SERPAPI_MAX_RETRIES,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[PersistentCache] = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.concurrency = max(concurrency, 1)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.transport = transport
+        self.cache = cache
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency,
+                ),
+                transport=self.transport,
+            )
+        return self._client
+
+    async def search(self, query: str) -> list:
+        params = {
+            "engine": "google",
+            "q": query,
+            "api_key": self.api_key
+        }
+        client = self._get_client()
+        last_exception = None
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                # httpx's timeout is per phase; a slowly trickling body would
+                # run past it, so the whole request gets the deadline too
+                res = await asyncio.wait_for(client.get("/search", params=params), timeout=self.timeout)
+                if res.status_code >= 400:
+                    raise SerpAPIError(res.status_code)
+                return parse_serpapi_results(res.json())
+
+            except (httpx.TransportError, asyncio.TimeoutError, SerpAPIError) as e:
+                last_exception = e
+                retryable = not isinstance(e, SerpAPIError) or e.status_code in RETRYABLE_STATUS_CODES
+                if not retryable or attempt == self.max_retries:
+                    break
+                await asyncio.sleep(0.5 * (2 ** attempt))
+
+        raise last_exception
+
+    async def search_cached(self, query: str) -> list:
+        """`search` behind the cache; unlike `search_many`, a failure is raised."""
+        if self.cache is None:
+            return await self.search(query)
+        key = make_cache_key(normalize_query(query))
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+        results = await self.search(query)
+        if results:
+            await self.cache.set(key, results)
+        return results
+
+    async def search_many(self, queries: list[str]) -> list[list]:
+        """
+        Run every query concurrently, at most `concurrency` in flight.
+
+        Results come back in query order; a query that still fails after its
+        retries yields an empty list so one bad query never sinks the batch.
+        """
+        keys = [make_cache_key(normalize_query(q)) for q in queries]
+        cached = await self.cache.get_many(keys) if self.cache else {}
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        fresh = {}
+
+        async def _run(query: str, key: str) -> list:
+            if key in cached:
+                return cached[key]
+            async with semaphore:
+                try:
+                    results = await self.search(query)
+                except Exception as e:
+                    print(f"[SERP ERROR] '{query}': {str(e) or type(e).__name__}")
+                    return []
+            if results:
+                fresh[key] = results
+            return results
+
+        # Queries that normalize to the same key are only sent once
+        unique = dict(zip(keys, queries))
+        unique_results = await asyncio.gather(*[_run(q, k) for k, q in unique.items()])
+        by_key = dict(zip(unique, unique_results))
+
+        if self.cache and fresh:
+            await self.cache.set_many(fresh)
+        return [by_key[k] for k in keys]
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+serpapi_cache = PersistentCache(
+    "serpapi",
+    ttl_seconds=SERPAPI_CACHE_TTL_SECONDS,
+    max_entries=SERPAPI_CACHE_MAX_ENTRIES,
+) if SERPAPI_CACHE_ENABLED else None
+
+serpapi_client = SerpAPIClient(cache=serpapi_cache)
+
+
+async def search_with_serpapi(query: str) -> list:
+    return await serpapi_client.search_cached(query)
+
+
+async def search_many_with_serpapi(queries: list[str]) -> list[list]:
+    return await serpapi_client.search_many(queries)
@@ -0,0 +1,30 @@
+"""
+Token estimates for budgeting prompts and embedding batches.
+
+Uses tiktoken when it is installed; otherwise falls back to the usual
+~4 characters per token heuristic, which is close enough for budgeting.
+"""
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=8)
+def _encoding(name: str):
+    return tiktoken.get_encoding(name)
+
+
+def estimate_tokens(text: str, encoding: str = "cl100k_base") -> int:
+    if not text:
+        return 0
+    if tiktoken is not None:
+        try:
+            return len(_encoding(encoding).encode(text, disallowed_special=()))
+        except Exception:
+            pass
+    return len(text) // CHARS_PER_TOKEN + 1
@@ -0,0 +1,20 @@
+from .base import BaseVectorStore, normalize_records
+from .local_store import LocalVectorStore
+from .pinecone_store import PineconeVectorStore
+
+from app.config import VECTOR_STORE_BACKEND
+
+BACKENDS = {
+    "pinecone": PineconeVectorStore,
+    "local": LocalVectorStore,
+}
+
+
+def get_vector_store(backend: str = VECTOR_STORE_BACKEND) -> BaseVectorStore:
+    backend = backend.lower().strip()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown vector store '{backend}'. Choose from: {list(BACKENDS.keys())}")
+    return BACKENDS[backend]()
+
+
+vector_store = get_vector_store()
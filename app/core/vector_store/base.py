@@ -0,0 +1,68 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+# Either a Pinecone-style dict {"id", "values", "metadata"} or an
+# (id, values, metadata) tuple, as the ingestion paths already build them.
+VectorRecord = Union[dict, tuple]
+
+
+def normalize_records(vectors: Sequence[VectorRecord]) -> List[dict]:
+    records = []
+    for vector in vectors:
+        if isinstance(vector, dict):
+            records.append({
+                "id": vector["id"],
+                "values": vector["values"],
+                "metadata": vector.get("metadata") or {},
+            })
+        else:
+            vector_id, values, *rest = vector
+            records.append({
+                "id": vector_id,
+                "values": values,
+                "metadata": rest[0] if rest else {},
+            })
+    return records
+
+
+class BaseVectorStore(ABC):
+    """
+    Async vector store used by every ingestion and retrieval path.
+
+    Matches come back as plain dicts {"id", "score", "metadata"}, best first.
+    """
+
+    @abstractmethod
+    async def upsert(self, vectors: Sequence[VectorRecord], namespace: str) -> int:
+        pass
+
+    @abstractmethod
+    async def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        namespace: str,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[dict]:
+        pass
+
+    @abstractmethod
+    async def delete(
+        self,
+        namespace: str,
+        ids: Optional[List[str]] = None,
+        delete_all: bool = False,
+    ):
+        pass
+
+    @abstractmethod
+    async def vector_count(self, namespace: str) -> int:
+        pass
+
+    @abstractmethod
+    async def fetch_all(self, namespace: str) -> List[dict]:
+        """Every record in `namespace` as {"id", "values", "metadata"}, in no particular order."""
+        pass
+
+    async def aclose(self):
+        pass
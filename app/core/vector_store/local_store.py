@@ -0,0 +1,386 @@
+import json
+import os
+import re
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.config import EMBEDDING_DIMENSION, VECTOR_STORE_PATH
+from .base import BaseVectorStore, VectorRecord, normalize_records
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def matches_filter(metadata: dict, filter: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate the subset of Pinecone's metadata filter language the app uses."""
+    if not filter:
+        return True
+
+    for field, condition in filter.items():
+        value = metadata.get(field)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        for op, expected in condition.items():
+            if op == "$eq" and value != expected:
+                return False
+            if op == "$ne" and value == expected:
+                return False
+            if op == "$in" and value not in expected:
+                return False
+            if op == "$nin" and value in expected:
+                return False
+    return True
+
+
+class _Namespace:
+    """Unit-normalized float32 rows plus their ids and metadata, grown by doubling."""
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.matrix = np.zeros((0, dimension), dtype=np.float32)
+        self.size = 0
+        self.ids: List[str] = []
+        self.metadata: List[dict] = []
+        self.positions: Dict[str, int] = {}
+
+    @contextmanager
+    def locked(self):
+        """Hold the namespace for one operation; in memory there is nobody to exclude."""
+        yield self
+
+    def _grow(self, capacity: int):
+        grown = np.zeros((capacity, self.dimension), dtype=np.float32)
+        grown[:self.size] = self.matrix[:self.size]
+        self.matrix = grown
+
+    def _reserve(self, rows: int):
+        capacity = self.matrix.shape[0]
+        if rows > capacity:
+            self._grow(max(rows, capacity * 2, 64))
+
+    def _put(self, vector_id: str, metadata: dict) -> int:
+        """Book a row for `vector_id` and return its position."""
+        position = self.positions.get(vector_id)
+        if position is None:
+            position = self.size
+            self.size += 1
+            self.ids.append(vector_id)
+            self.metadata.append(metadata)
+            self.positions[vector_id] = position
+        else:
+            self.metadata[position] = metadata
+        return position
+
+    def _remove(self, vector_id: str) -> Optional[tuple]:
+        """
+        Forget `vector_id`, moving the last live row into its slot so the
+        matrix stays dense. Returns (freed position, moved-from position).
+        """
+        position = self.positions.pop(vector_id, None)
+        if position is None:
+            return None
+        last = self.size - 1
+        if position != last:
+            self.ids[position] = self.ids[last]
+            self.metadata[position] = self.metadata[last]
+            self.positions[self.ids[position]] = position
+        self.ids.pop()
+        self.metadata.pop()
+        self.size -= 1
+        return position, last
+
+    def upsert(self, records: List[dict]):
+        values = _normalize_rows(np.asarray([r["values"] for r in records], dtype=np.float32))
+        self._reserve(self.size + len(records))
+        for record, row in zip(records, values):
+            self.matrix[self._put(record["id"], record["metadata"])] = row
+
+    def delete(self, ids: List[str]):
+        for vector_id in ids:
+            moved = self._remove(vector_id)
+            if moved and moved[0] != moved[1]:
+                self.matrix[moved[0]] = self.matrix[moved[1]]
+
+    def query(self, vector: List[float], top_k: int, filter: Optional[Dict[str, Any]]) -> List[dict]:
+        if self.size == 0 or top_k <= 0:
+            return []
+
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        scores = self.matrix[:self.size] @ query
+        if filter:
+            mask = np.fromiter(
+                (matches_filter(m, filter) for m in self.metadata), dtype=bool, count=self.size
+            )
+            scores = np.where(mask, scores, -np.inf)
+            top_k = min(top_k, int(mask.sum()))
+            if top_k == 0:
+                return []
+
+        top_k = min(top_k, self.size)
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        ranked = candidates[np.argsort(-scores[candidates])]
+        return [
+            {"id": self.ids[i], "score": float(scores[i]), "metadata": self.metadata[i]}
+            for i in ranked
+        ]
+
+
+class _MmapNamespace(_Namespace):
+    """
+    A namespace persisted as two files:
+
+    - `<name>.f32`: the float32 row matrix, memory-mapped, so only the pages
+      a query touches are read.
+    - `<name>.meta.jsonl`: an append-only log of puts and deletes. Replaying
+      it rebuilds ids, metadata and row positions; it is compacted to one put
+      per live row once it grows past twice the live row count.
+
+    Several processes may open the same namespace. Every operation holds an
+    exclusive lock on `<name>.lock` and first replays the log lines other
+    processes appended since this one last looked (all of it after a
+    compaction or a delete_all), so row positions agree across processes.
+    Without fcntl (Windows) there is no lock, and a namespace must only be
+    used by one process.
+
+    Rows are written to the matrix before their log line, so a crash can at
+    worst leave an unreferenced row behind.
+    """
+
+    def __init__(self, dimension: int, directory: str, name: str):
+        super().__init__(dimension)
+        self.vectors_path = os.path.join(directory, f"{name}.f32")
+        self.log_path = os.path.join(directory, f"{name}.meta.jsonl")
+        self.log_lines = 0
+        self.log_offset = 0
+        self.log_inode = None
+        self.matrix_inode = None
+        self._lock_file = open(os.path.join(directory, f"{name}.lock"), "a")
+
+    @contextmanager
+    def locked(self):
+        if fcntl is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            self._sync()
+            yield self
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _reset(self):
+        self.size = 0
+        self.ids = []
+        self.metadata = []
+        self.positions = {}
+        self.log_lines = 0
+        self.log_offset = 0
+
+    def _sync(self):
+        """Replay what other processes logged since the last look, then map the matrix."""
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            stat = None
+        # A rewritten (compacted) or removed log is replayed from scratch
+        if stat is None or stat.st_ino != self.log_inode or stat.st_size < self.log_offset:
+            self._reset()
+            self.log_inode = stat.st_ino if stat is not None else None
+
+        if stat is not None and stat.st_size > self.log_offset:
+            with open(self.log_path, "rb") as f:
+                f.seek(self.log_offset)
+                for line in f:
+                    self.log_offset += len(line)
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if "put" in entry:
+                        self._put(entry["put"], entry.get("metadata") or {})
+                    else:
+                        self._remove(entry["del"])
+                    self.log_lines += 1
+
+        try:
+            stat = os.stat(self.vectors_path)
+        except FileNotFoundError:
+            stat = None
+        capacity = stat.st_size // (self.dimension * 4) if stat is not None else 0
+        current = (
+            stat is not None
+            and stat.st_ino == self.matrix_inode
+            and self.matrix.shape[0] == capacity
+        )
+        if not current or capacity < self.size:
+            # np.memmap cannot map an empty file, so start with a minimum capacity
+            self._open_matrix(max(capacity, self.size, 64))
+
+    def _open_matrix(self, capacity: int):
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(capacity * self.dimension * 4)
+        self.matrix = np.memmap(
+            self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension)
+        )
+        self.matrix_inode = os.stat(self.vectors_path).st_ino
+
+    def _grow(self, capacity: int):
+        self.matrix.flush()
+        del self.matrix
+        self._open_matrix(capacity)
+
+    def _append_log(self, entries: List[dict]):
+        data = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries).encode("utf-8")
+        with open(self.log_path, "ab") as f:
+            f.write(data)
+        if self.log_inode is None:
+            self.log_inode = os.stat(self.log_path).st_ino
+        self.log_offset += len(data)
+        self.log_lines += len(entries)
+        if self.log_lines > 2 * self.size + 1000:
+            self._compact_log()
+
+    def _compact_log(self):
+        tmp_path = self.log_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for vector_id, metadata in zip(self.ids, self.metadata):
+                f.write((json.dumps({"put": vector_id, "metadata": metadata}, ensure_ascii=False) + "\n").encode("utf-8"))
+            offset = f.tell()
+        os.replace(tmp_path, self.log_path)
+        self.log_inode = os.stat(self.log_path).st_ino
+        self.log_offset = offset
+        self.log_lines = self.size
+
+    def upsert(self, records: List[dict]):
+        super().upsert(records)
+        self.matrix.flush()
+        self._append_log([{"put": r["id"], "metadata": r["metadata"]} for r in records])
+
+    def delete(self, ids: List[str]):
+        ids = [vector_id for vector_id in ids if vector_id in self.positions]
+        if not ids:
+            return
+        super().delete(ids)
+        self.matrix.flush()
+        self._append_log([{"del": vector_id} for vector_id in ids])
+
+    def destroy(self):
+        del self.matrix
+        for path in (self.vectors_path, self.log_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.matrix = np.zeros((0, self.dimension), dtype=np.float32)
+        self.matrix_inode = None
+        self.log_inode = None
+        self._reset()
+
+
+class LocalVectorStore(BaseVectorStore):
+    """
+    In-process vector store backed by NumPy.
+
+    Scores are cosine similarities (dot products of unit vectors), matching
+    the `cosine` metric of the Pinecone index, so either backend can serve
+    the same pipeline. Top-k uses argpartition, so a query over one RFP's
+    few thousand chunks is a single matrix-vector product with no network hop.
+
+    With `path`, every namespace is persisted under that directory as a
+    memory-mapped matrix plus a metadata log, loaded lazily on first use and
+    kept in step with other processes using the same directory; without it
+    everything stays in memory (tests, benchmarks).
+    """
+
+    def __init__(self, dimension: int = EMBEDDING_DIMENSION, path: Optional[str] = VECTOR_STORE_PATH):
+        self.dimension = dimension
+        self.path = path or None
+        self._namespaces: Dict[str, _Namespace] = {}
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+
+    def _file_name(self, namespace: str) -> str:
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", namespace) or "__default__"
+
+    def _namespace(self, namespace: str, create: bool = True) -> Optional[_Namespace]:
+        store = self._namespaces.get(namespace)
+        if store is not None:
+            return store
+
+        if self.path:
+            name = self._file_name(namespace)
+            if not create and not os.path.exists(os.path.join(self.path, f"{name}.meta.jsonl")):
+                return None
+            store = _MmapNamespace(self.dimension, self.path, name)
+        elif create:
+            store = _Namespace(self.dimension)
+        else:
+            return None
+
+        self._namespaces[namespace] = store
+        return store
+
+    async def upsert(self, vectors: Sequence[VectorRecord], namespace: str) -> int:
+        records = normalize_records(vectors)
+        if records:
+            with self._namespace(namespace).locked() as store:
+                store.upsert(records)
+        return len(records)
+
+    async def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        namespace: str,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[dict]:
+        store = self._namespace(namespace, create=False)
+        if store is None:
+            return []
+        with store.locked():
+            return store.query(vector, top_k, filter)
+
+    async def delete(
+        self,
+        namespace: str,
+        ids: Optional[List[str]] = None,
+        delete_all: bool = False,
+    ):
+        store = self._namespace(namespace, create=False)
+        if store is None:
+            return
+        with store.locked():
+            if delete_all:
+                self._namespaces.pop(namespace, None)
+                if isinstance(store, _MmapNamespace):
+                    store.destroy()
+            elif ids:
+                store.delete(list(ids))
+
+    async def vector_count(self, namespace: str) -> int:
+        store = self._namespace(namespace, create=False)
+        if store is None:
+            return 0
+        with store.locked():
+            return store.size
+
+    async def fetch_all(self, namespace: str) -> List[dict]:
+        store = self._namespace(namespace, create=False)
+        if store is None:
+            return []
+        with store.locked():
+            return [
+                {"id": store.ids[i], "values": store.matrix[i].tolist(), "metadata": store.metadata[i]}
+                for i in range(store.size)
+            ]
@@ -0,0 +1,168 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.config import (
+    PINECONE_API_KEY,
+    PINECONE_ENV,
+    PINECONE_INDEX,
+    PINECONE_POOL_THREADS,
+    EMBEDDING_DIMENSION,
+    VECTOR_UPSERT_BATCH_SIZE,
+    VECTOR_UPSERT_CONCURRENCY,
+)
+from .base import BaseVectorStore, VectorRecord, normalize_records
+
+
+class PineconeVectorStore(BaseVectorStore):
+    """
+    Pinecone index behind the async vector store interface.
+
+    The Pinecone SDK is synchronous, so every call runs on a dedicated pool of
+    `pool_threads` worker threads instead of blocking the event loop. The
+    index handle is created lazily, once, with an HTTP connection pool of the
+    same size, so each worker keeps a warm connection. Large upserts are
+    split into `upsert_batch_size` batches sent `upsert_concurrency` at a time.
+    Pass `index` to run against any object with the Pinecone Index API.
+    """
+
+    def __init__(
+        self,
+        api_key: str = PINECONE_API_KEY,
+        index_name: str = PINECONE_INDEX,
+        region: str = PINECONE_ENV,
+        dimension: int = EMBEDDING_DIMENSION,
+        pool_threads: int = PINECONE_POOL_THREADS,
+        upsert_batch_size: int = VECTOR_UPSERT_BATCH_SIZE,
+        upsert_concurrency: int = VECTOR_UPSERT_CONCURRENCY,
+        index=None,
+    ):
+        self.api_key = api_key
+        self.index_name = index_name
+        self.region = region
+        self.dimension = dimension
+        self.pool_threads = max(pool_threads, 1)
+        self.upsert_batch_size = max(upsert_batch_size, 1)
+        self.upsert_concurrency = max(upsert_concurrency, 1)
+        self._index = index
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_threads, thread_name_prefix="pinecone")
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def _get_index(self):
+        if self._index is not None:
+            return self._index
+
+        with self._lock:
+            if self._index is None:
+                from pinecone import Pinecone, ServerlessSpec
+
+                pc = Pinecone(api_key=self.api_key, pool_threads=self.pool_threads)
+                if self.index_name not in pc.list_indexes().names():
+                    pc.create_index(
+                        name=self.index_name,
+                        dimension=self.dimension,
+                        metric="cosine",
+                        spec=ServerlessSpec(cloud="aws", region=self.region),
+                    )
+                self._index = pc.Index(
+                    self.index_name,
+                    pool_threads=self.pool_threads,
+                    connection_pool_maxsize=self.pool_threads,
+                )
+        return self._index
+
+    async def upsert(self, vectors: Sequence[VectorRecord], namespace: str) -> int:
+        records = normalize_records(vectors)
+        if not records:
+            return 0
+
+        index = await self._run(self._get_index)
+        semaphore = asyncio.Semaphore(self.upsert_concurrency)
+
+        async def _upsert_batch(batch: List[dict]):
+            async with semaphore:
+                await self._run(index.upsert, vectors=batch, namespace=namespace)
+
+        batches = [
+            records[i:i + self.upsert_batch_size]
+            for i in range(0, len(records), self.upsert_batch_size)
+        ]
+        await asyncio.gather(*[_upsert_batch(batch) for batch in batches])
+        return len(records)
+
+    async def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        namespace: str,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[dict]:
+        index = await self._run(self._get_index)
+        kwargs = {"filter": filter} if filter else {}
+        results = await self._run(
+            index.query,
+            vector=vector,
+            top_k=top_k,
+            namespace=namespace,
+            include_metadata=True,
+            **kwargs,
+        )
+        return [
+            {
+                "id": match["id"],
+                "score": match["score"],
+                "metadata": match.get("metadata") or {},
+            }
+            for match in results["matches"]
+        ]
+
+    async def delete(
+        self,
+        namespace: str,
+        ids: Optional[List[str]] = None,
+        delete_all: bool = False,
+    ):
+        index = await self._run(self._get_index)
+        if delete_all:
+            await self._run(index.delete, delete_all=True, namespace=namespace)
+        elif ids:
+            await self._run(index.delete, ids=list(ids), namespace=namespace)
+
+    async def vector_count(self, namespace: str) -> int:
+        index = await self._run(self._get_index)
+        stats = await self._run(index.describe_index_stats)
+        summary = (stats.get("namespaces") or {}).get(namespace)
+        return int(summary["vector_count"]) if summary else 0
+
+    async def fetch_all(self, namespace: str) -> List[dict]:
+        index = await self._run(self._get_index)
+
+        def _list_ids():
+            ids = []
+            for page in index.list(namespace=namespace):
+                ids.extend(page)
+            return ids
+
+        ids = await self._run(_list_ids)
+        semaphore = asyncio.Semaphore(self.upsert_concurrency)
+
+        async def _fetch(batch: List[str]) -> List[dict]:
+            async with semaphore:
+                response = await self._run(index.fetch, ids=batch, namespace=namespace)
+            return [
+                {"id": vector_id, "values": list(vector.values), "metadata": vector.metadata or {}}
+                for vector_id, vector in response.vectors.items()
+            ]
+
+        batches = [ids[i:i + self.upsert_batch_size] for i in range(0, len(ids), self.upsert_batch_size)]
+        results = await asyncio.gather(*[_fetch(batch) for batch in batches])
+        return [record for batch in results for record in batch]
+
+    async def aclose(self):
+        self._executor.shutdown(wait=False)
@@ -4,7 +4,8 @@ from app.models.rfp_models import (
     RFPQuestion,
     User,
     Reviewer,
-    ReviewerAnswerVersion
+    ReviewerAnswerVersion,
+    BackgroundJob
 )
 
 __all__ = [
@@ -14,4 +15,5 @@ __all__ = [
     "User",
     "Reviewer",
     "ReviewerAnswerVersion",
+    "BackgroundJob",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey,ForeignKeyConstraint,Boolean,LargeBinary
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey,ForeignKeyConstraint,Boolean,LargeBinary,JSON,Float
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from sqlalchemy.sql import func
@@ -180,3 +180,56 @@ class GeneratedRFPDocument(Base):
     deleted_at = Column(DateTime, nullable=True)
     rfp = relationship("RFPDocument",back_populates="generated_docs")
     user = relationship("User")
+
+class BackgroundJob(Base):
+    __tablename__ = "background_jobs"
+    id = Column(String, primary_key=True, index=True)
+    job_type = Column(String, nullable=False, index=True)
+    admin_id = Column(Integer, nullable=True)
+    dedupe_key = Column(String, nullable=True, index=True)
+    payload = Column(JSON, nullable=False, default=dict)
+    state = Column(JSON, nullable=False, default=dict)
+    stages = Column(JSON, nullable=False, default=dict)
+    current_stage = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="queued", index=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+
+class CacheEntry(Base):
+    __tablename__ = "cache_entries"
+    namespace = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    value = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=True, index=True)
+    last_accessed_at = Column(DateTime, default=datetime.utcnow, index=True)
+    hit_count = Column(Integer, default=0)
+
+class LLMUsageRecord(Base):
+    __tablename__ = "llm_usage"
+    id = Column(Integer, primary_key=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    caller = Column(String, nullable=False, index=True)
+    requested_model = Column(String, nullable=True)
+    model = Column(String, nullable=True, index=True)
+    provider = Column(String, nullable=True)
+    rfp_id = Column(Integer, nullable=True, index=True)
+    user_id = Column(Integer, nullable=True, index=True)
+    input_tokens = Column(Integer, default=0)
+    output_tokens = Column(Integer, default=0)
+    cost_usd = Column(Float, nullable=True)
+    # Provider call only, and end to end including queueing and fallbacks
+    latency_ms = Column(Integer, nullable=True)
+    total_ms = Column(Integer, nullable=True)
+    attempts = Column(Integer, default=1)
+    failed_models = Column(JSON, nullable=False, default=list)
+    cached = Column(Boolean, default=False)
+    streamed = Column(Boolean, default=False)
+    success = Column(Boolean, default=True)
+    error = Column(Text, nullable=True)
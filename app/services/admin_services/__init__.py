@@ -21,7 +21,8 @@ from app.services.admin_services.reviewer_service import (
     get_assign_user_status_service,
     remove_user_service,
     reassign_reviewer_service,
-    regenerate_answer_with_chat_service)
+    regenerate_answer_with_chat_service,
+    stream_regenerate_answer_with_chat_service)
 
 from app.services.admin_services.user_service import (
     get_all_users,
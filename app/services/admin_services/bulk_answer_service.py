@@ -0,0 +1,225 @@
+"""
+Bulk answer generation: answer every question of an RFP in one background job.
+
+All questions share one AnswerSession, so retrieval runs in memory after a
+single batched embedding call. Questions are answered concurrently
+(BULK_ANSWER_CONCURRENCY) at bulk priority in the LLM scheduler, and each
+one is retried with backoff before it is counted as failed. Each answer is
+written as a ReviewerAnswerVersion for every reviewer assigned to the
+question, in batched commits of BULK_ANSWER_COMMIT_EVERY questions. A
+question nobody is assigned to has no reviewer row to hang a version on and
+is skipped.
+"""
+import asyncio
+import time
+from typing import List
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.api.routes.utils import clean_answer
+from app.config import BULK_ANSWER_CONCURRENCY, BULK_ANSWER_MAX_RETRIES, BULK_ANSWER_COMMIT_EVERY
+from app.core.llm_client.telemetry import llm_attribution, llm_usage_meter
+from app.db.database import AsyncSessionLocal
+from app.models.rfp_models import RFPDocument, RFPQuestion, ReviewerAnswerVersion
+from app.services.job_services.job_queue import (
+    JobContext,
+    STAGE_COMPLETED,
+    STAGE_RUNNING,
+    enqueue_job,
+    find_active_job,
+    register_job_handler,
+    serialize_job,
+)
+from app.services.llm_services.answer_session import AnswerSession, get_answer_session
+from app.services.llm_services.llm_service import generate_answer_with_context
+
+BULK_ANSWER_JOB = "bulk_answers"
+BULK_ANSWER_STAGES = ["prepare", "generate"]
+
+
+async def enqueue_bulk_answers(
+    rfp_id: int,
+    db: AsyncSession,
+    current_user,
+    provider: str = "gpt-4o-mini",
+    overwrite: bool = False,
+    question_ids: List[int] = None,
+):
+    if current_user.role.lower() != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Only admins can generate answers in bulk."
+        )
+
+    rfp = await db.get(RFPDocument, rfp_id)
+    if not rfp or rfp.is_deleted:
+        raise HTTPException(status_code=404, detail="RFP not found")
+
+    dedupe_key = f"{BULK_ANSWER_JOB}:{rfp_id}"
+    active = await find_active_job(db, BULK_ANSWER_JOB, dedupe_key)
+    if active:
+        return {**serialize_job(active), "already_queued": True}
+
+    job = await enqueue_job(
+        db,
+        BULK_ANSWER_JOB,
+        payload={
+            "rfp_id": rfp_id,
+            "admin_id": current_user.id,
+            "provider": provider,
+            "overwrite": overwrite,
+            "question_ids": question_ids,
+        },
+        admin_id=current_user.id,
+        stage_names=BULK_ANSWER_STAGES,
+        dedupe_key=dedupe_key,
+    )
+    return {"status": "queued", **serialize_job(job)}
+
+
+async def _answer_question(question: RFPQuestion, session: AnswerSession, provider: str, use_cache: bool = True) -> dict:
+    last_exception = None
+
+    for attempt in range(BULK_ANSWER_MAX_RETRIES + 1):
+        try:
+            context, _ = await session.build_context(question.question_text)
+
+            with llm_usage_meter() as usage:
+                answer = await generate_answer_with_context(
+                    question.question_text,
+                    context,
+                    session.short_name,
+                    provider=provider,
+                    use_cache=use_cache,
+                )
+            answer = clean_answer(answer)
+            # As reported by the provider; cache hits count as no tokens
+            return {"answer": answer, "tokens": usage.total_tokens}
+        except Exception as e:
+            last_exception = e
+            if attempt < BULK_ANSWER_MAX_RETRIES:
+                await asyncio.sleep(2 * (2 ** attempt))
+
+    raise last_exception
+
+
+@register_job_handler(BULK_ANSWER_JOB)
+async def run_bulk_answer_job(ctx: JobContext) -> dict:
+    # LLM usage is attributed to the RFP being answered
+    with llm_attribution(rfp_id=ctx.payload["rfp_id"]):
+        return await _answer_rfp(ctx)
+
+
+async def _answer_rfp(ctx: JobContext) -> dict:
+    payload = ctx.payload
+    provider = payload.get("provider") or "gpt-4o-mini"
+    overwrite = payload.get("overwrite", False)
+    answered = set(ctx.state.get("answered", []))
+    failed = dict(ctx.state.get("failed", {}))
+
+    async with AsyncSessionLocal() as db:
+        await ctx.stage("prepare", STAGE_RUNNING)
+        query = (
+            select(RFPQuestion)
+            .options(selectinload(RFPQuestion.reviewers))
+            .filter(RFPQuestion.rfp_id == payload["rfp_id"])
+            .order_by(RFPQuestion.id)
+        )
+        if payload.get("question_ids"):
+            query = query.filter(RFPQuestion.id.in_(payload["question_ids"]))
+        questions = (await db.execute(query)).scalars().all()
+
+        unassigned = [q.id for q in questions if not q.reviewers]
+        pending = [
+            q for q in questions
+            if q.reviewers
+            and q.id not in answered
+            and (overwrite or any(not (r.ans or "").strip() for r in q.reviewers))
+        ]
+        # One session for the whole RFP; every pending question is embedded
+        # in a single batched request up front
+        session = await get_answer_session(db, payload["rfp_id"], payload["admin_id"])
+        await session.embed_questions([q.question_text for q in pending])
+
+        ctx.state.update({
+            "total": len(questions),
+            "pending": len(pending),
+            "unassigned": unassigned,
+        })
+        await ctx.stage("prepare", STAGE_COMPLETED)
+
+        await ctx.stage("generate", STAGE_RUNNING)
+        semaphore = asyncio.Semaphore(BULK_ANSWER_CONCURRENCY)
+        started = time.time()
+        tokens = 0
+        completed_now = 0
+        batch = []
+
+        async def _run(question):
+            async with semaphore:
+                try:
+                    # overwrite=true replaces existing answers, so skip cached ones
+                    answer = await _answer_question(question, session, provider, use_cache=not overwrite)
+                    return question, answer, None
+                except Exception as e:
+                    return question, None, e
+
+        async def _flush():
+            nonlocal batch
+            if not batch:
+                return
+            for question, answer in batch:
+                for reviewer in question.reviewers:
+                    if not overwrite and (reviewer.ans or "").strip():
+                        continue
+                    db.add(ReviewerAnswerVersion(user_id=reviewer.user_id, ques_id=question.id, answer=answer))
+                    reviewer.ans = answer
+            await db.commit()
+            answered.update(question.id for question, _ in batch)
+            batch = []
+
+            elapsed = max(time.time() - started, 1e-6)
+            ctx.state.update({
+                "answered": sorted(answered),
+                "failed": failed,
+                "questions_per_min": round(completed_now / elapsed * 60, 2),
+                "tokens_per_s": round(tokens / elapsed, 1),
+                "elapsed_seconds": round(elapsed, 1),
+            })
+            await ctx.save_state()
+
+        tasks = [asyncio.create_task(_run(q)) for q in pending]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                question, result, error = await next_done
+                if error is not None:
+                    print(f"[BULK ANSWERS] Question {question.id} failed: {error}")
+                    failed[str(question.id)] = str(error)
+                    continue
+                failed.pop(str(question.id), None)
+                batch.append((question, result["answer"]))
+                tokens += result["tokens"]
+                completed_now += 1
+                if len(batch) >= BULK_ANSWER_COMMIT_EVERY:
+                    await _flush()
+            await _flush()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        await ctx.stage("generate", STAGE_COMPLETED)
+
+    elapsed = max(time.time() - started, 1e-6)
+    return {
+        "rfp_id": payload["rfp_id"],
+        "total_questions": len(questions),
+        "answered": len(answered),
+        "failed": failed,
+        "unassigned": unassigned,
+        "questions_per_min": round(completed_now / elapsed * 60, 2),
+        "tokens_per_s": round(tokens / elapsed, 1),
+        "elapsed_seconds": round(elapsed, 1),
+    }
@@ -1,17 +1,17 @@
 import os
-import shutil
-import hashlib
+import logging
 from datetime import datetime
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from app.config import UPLOAD_FOLDER, index
+from app.config import UPLOAD_FOLDER
+from app.core.vector_store import vector_store
 from app.models.rfp_models import RFPDocument,RFPQuestion
 from app.services.llm_services.llm_service import (
-    extract_text_from_file,
     generate_summary,
     # get_embedding
 )
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from app.services.file_services.extraction import extract_document_text
+from app.services.file_services.uploads import staged_upload
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml import OxmlElement, ns
 from docx import Document
@@ -19,9 +19,36 @@ from docx.shared import Inches, Pt
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.llm_client.openai import OpenAIEmbeddingClient
+from app.services.llm_services.retrieval_service import (
+    document_chunk_record,
+    document_namespace,
+    document_summary_record,
+    embed_and_upsert,
+    split_document_text,
+)
 
 import re
 
+logger = logging.getLogger(__name__)
+
+
+async def embed_and_upsert_chunks(
+    doc: RFPDocument,
+    chunks: list[str],
+    extra_metadata: dict = None,
+    embedding_client: OpenAIEmbeddingClient = None,
+) -> int:
+    """
+    Embed a document's chunks in token-budgeted batches and upsert each batch
+    into the document's namespace as soon as its vectors arrive.
+    """
+    return await embed_and_upsert(
+        document_namespace(doc.id),
+        chunks,
+        lambda i, text, vector: document_chunk_record(doc, i, text, vector, extra_metadata),
+        embedding_client=embedding_client,
+    )
+
 
 async def upload_documents(files, project_name, category, current_user, db: Session,custom_message: str = None):
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -37,14 +64,10 @@ async def upload_documents(files, project_name, category, current_user, db: Sess
 
         timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
         saved_filename = f"{timestamp}_{file.filename}"
-        file_path = os.path.join(UPLOAD_FOLDER, saved_filename)
-
-        with open(file_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
 
-        with open(file_path, "rb") as f:
-            file_bytes = f.read()
-            file_hash = hashlib.sha256(file_bytes).hexdigest()
+        async with staged_upload(file) as upload:
+            file_path = upload.commit(os.path.join(UPLOAD_FOLDER, saved_filename))
+        file_hash = upload.sha256
 
         new_doc = RFPDocument(
             filename=file.filename,
@@ -59,54 +82,30 @@ async def upload_documents(files, project_name, category, current_user, db: Sess
         await db.commit()
         await db.refresh(new_doc)
 
-        text = extract_text_from_file(file_path)
+        text = await extract_document_text(file_path, sha256=file_hash)
         if not text:
             continue
 
         summary = await generate_summary(text)
         embedding_client = OpenAIEmbeddingClient()
         summary_vector = await embedding_client.embed(summary)
-        index.upsert(
-            vectors=[(
-                f"summary_{new_doc.id}",
+        await vector_store.upsert(
+            vectors=[document_summary_record(
+                new_doc,
+                summary,
                 summary_vector,
-                {
-                    "document_id": str(new_doc.id),
-                    "filename": new_doc.filename,
-                    "category": new_doc.category,
-                    "project_name": new_doc.project_name,
-                    "type": "summary",
-                    "text": summary,
-                    "custom_message": custom_message or ""
-                }
+                extra_metadata={"custom_message": custom_message or ""}
             )],
-            namespace=f"rfp_{new_doc.id}"
+            namespace=document_namespace(new_doc.id)
         )
 
-        splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-        chunks = splitter.split_text(text)
-        vectors = []
-
-        for i, chunk in enumerate(chunks):
-            # vector = get_embedding(chunk)
-            vector = await embedding_client.embed(chunk)
-            vectors.append((
-                f"{new_doc.id}_{i}",
-                vector,
-                {
-                    "document_id": str(new_doc.id),
-                    "filename": new_doc.filename,
-                    "category": new_doc.category,
-                    "project_name": new_doc.project_name,
-                    "type": "chunk",
-                    "chunk_id": i,
-                    "text": chunk,
-                    "custom_message": custom_message or ""
-                }
-            ))
-
-        if vectors:
-            index.upsert(vectors=vectors, namespace=f"rfp_{new_doc.id}")
+        chunks = split_document_text(text)
+        await embed_and_upsert_chunks(
+            new_doc,
+            chunks,
+            extra_metadata={"custom_message": custom_message or ""},
+            embedding_client=embedding_client,
+        )
 
         uploaded_docs.append({
             "document_id": new_doc.id,
@@ -130,16 +129,12 @@ async def upload_background_document(file, project_name, category, current_user,
 
     timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
     saved_filename = f"{timestamp}_{file.filename}"
-    file_path = os.path.join(UPLOAD_FOLDER, saved_filename)
-
-    with open(file_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
 
-    with open(file_path, "rb") as f:
-        file_bytes = f.read()
-        file_hash = hashlib.sha256(file_bytes).hexdigest()
+    async with staged_upload(file) as upload:
+        file_path = upload.commit(os.path.join(UPLOAD_FOLDER, saved_filename))
+    file_hash = upload.sha256
 
-    extracted_text = extract_text_from_file(file_path)
+    extracted_text = await extract_document_text(file_path, sha256=file_hash)
     if not extracted_text:
         raise HTTPException(
             status_code=400,
@@ -165,46 +160,19 @@ async def upload_background_document(file, project_name, category, current_user,
     # summary_vector = get_embedding(summary)
     embedding_client = OpenAIEmbeddingClient()
     summary_vector = await embedding_client.embed(summary)
-    index.upsert(
-        vectors=[(
-            f"clint_background_summaries_{new_doc.id}",
+    await vector_store.upsert(
+        vectors=[document_summary_record(
+            new_doc,
+            summary,
             summary_vector,
-            {
-                "document_id": str(new_doc.id),
-                "filename": new_doc.filename,
-                "category": new_doc.category,
-                "project_name": new_doc.project_name,
-                "type": "summary",
-                "text": summary
-            }
+            id_prefix="clint_background_summaries"
         )],
-        namespace=f"rfp_{new_doc.id}"
+        namespace=document_namespace(new_doc.id)
     )
 
-    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    chunks = splitter.split_text(extracted_text)
-    vectors = []
-    for i, chunk in enumerate(chunks):
-        # vector = get_embedding(chunk)
-        vector = await embedding_client.embed(chunk)
-        vectors.append((
-            f"{new_doc.id}_{i}",
-            vector,
-            {
-                "document_id": str(new_doc.id),
-                "filename": new_doc.filename,
-                "category": new_doc.category,
-                "project_name": new_doc.project_name,
-                "type": "chunk",
-                "chunk_id": i,
-                "text": chunk
-            }
-        ))
-
-    print(f"Upserting {len(vectors)} vectors for document ID {new_doc.id}")    
-
-    if vectors:
-        index.upsert(vectors=vectors, namespace=f"rfp_{new_doc.id}")
+    chunks = split_document_text(extracted_text)
+    upserted = await embed_and_upsert_chunks(new_doc, chunks, embedding_client=embedding_client)
+    logger.info("Upserted %d vectors for document ID %s", upserted, new_doc.id)
 
     uploaded_docs.append({
         "document_id": new_doc.id,
@@ -6,6 +6,12 @@ from fastapi.responses import FileResponse
 from app.models.rfp_models import User,KeystoneFile
 from fastapi import UploadFile, HTTPException, status
 from app.services.llm_services.llm_service import extract_xls_text
+from app.services.llm_services.retrieval_service import (
+    delete_keystone_embeddings,
+    index_keystone,
+)
+from app.services.llm_services.keystone_cache import keystone_cache
+from app.services.file_services.uploads import staged_upload
 
 # async def upload_keystone_file(
 #     file: UploadFile,
@@ -77,16 +83,13 @@ async def upload_keystone_file(
             detail="Only Excel files are allowed"
         )
 
-    file_bytes = await file.read()
-    if not file_bytes:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Uploaded file is empty"
-        )
-
-    path = f"uploads/{uuid.uuid4()}_{file.filename}"
-    with open(path, "wb") as f:
-        f.write(file_bytes)
+    async with staged_upload(file, "uploads") as upload:
+        if not upload.size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded file is empty"
+            )
+        path = upload.commit(f"uploads/{uuid.uuid4()}_{file.filename}")
 
     extracted_text = extract_xls_text(path)
 
@@ -102,11 +105,24 @@ async def upload_keystone_file(
     await db.commit()
     await db.refresh(keystone_file)
 
+    keystone_cache.invalidate(current_user.id)
+    snapshot = keystone_cache.put(keystone_file, latest=True)
+
+    # Rows are embedded once here so answers can retrieve only what they need.
+    # A failed or partial index is dropped; the first answer re-indexes it.
+    try:
+        indexed_rows = await index_keystone(snapshot)
+    except Exception as e:
+        print(f"[KEYSTONE] Row indexing failed for keystone {keystone_file.id}: {e}")
+        await delete_keystone_embeddings(keystone_file.id)
+        indexed_rows = 0
+
     return {
         "status": "success",
         "file_id": keystone_file.id,
         "filename": keystone_file.filename,
-        "uploaded_at": keystone_file.uploaded_at
+        "uploaded_at": keystone_file.uploaded_at,
+        "indexed_rows": indexed_rows
     }
 
 # def delete_keystone_file(
@@ -180,8 +196,11 @@ async def delete_keystone_file(
     except Exception:
         pass
 
+    await delete_keystone_embeddings(keystone.id)
+
     await db.delete(keystone)
     await db.commit()
+    keystone_cache.invalidate(current_user.id, keystone_id)
 
     return {
         "status": "success",
@@ -8,13 +8,20 @@ from app.models.rfp_models import KeystoneFile, User, Reviewer, RFPQuestion, Rev
 from app.services.llm_services.llm_service import (
     _sanitize_short_name,
     get_short_name,
-    get_similar_context,
     _complete_with_fallback,
+    _stream_with_fallback,
 )
+from app.services.llm_services.retrieval_service import get_similar_context, get_keystone_context
+from app.services.llm_services.keystone_cache import get_active_keystone
 from app.schemas.schema import AssignReviewer, ReviewerOut, ReassignReviewerRequest
 from app.config import mail_config,  LOGIN_URL
 from sqlalchemy.orm import selectinload
 from app.core.prompts import regenerate_answer_prompt
+from app.core.llm_client.scheduler import PRIORITY_INTERACTIVE, llm_priority
+from app.core.llm_client.telemetry import llm_attribution
+from app.db.database import AsyncSessionLocal
+
+CHAT_FALLBACK_MODELS = ["gpt-5.4", "claude-sonnet-4-6"]
 
 async def assign_multiple_review(request: AssignReviewer, db: AsyncSession, current_user: User):
     try:
@@ -369,11 +376,11 @@ async def reassign_reviewer_service(request: ReassignReviewerRequest, db: AsyncS
         "submit_status": existing.submit_status
     }
 
-async def regenerate_answer_with_chat_service(request, db: AsyncSession):
+async def _chat_regeneration_prompts(request, db: AsyncSession):
+    """Validate a chat regeneration request; returns (rfp_id, system_prompt, user_prompt)."""
     user_id = request.user_id
     ques_id = request.ques_id
     chat_message = request.chat_message
-    provider = request.provider
 
     # Fetch reviewer
     reviewer_result = await db.execute(
@@ -412,18 +419,11 @@ async def regenerate_answer_with_chat_service(request, db: AsyncSession):
     short_name = _sanitize_short_name(get_short_name(raw_filename)) if raw_filename else "the City"
 
     # Fetch Keystone data
-    keystone_result = await db.execute(
-        select(KeystoneFile)
-        .where(KeystoneFile.admin_id == question.admin_id)
-        .order_by(KeystoneFile.uploaded_at.desc())
+    keystone = await get_active_keystone(db, question.admin_id)
+    keystone_text = await get_keystone_context(
+        f"{question.question_text}\n{chat_message}",
+        keystone
     )
-    keystone = keystone_result.scalars().first()
-    if not keystone:
-        raise HTTPException(
-            status_code=400,
-            detail="Keystone Data not uploaded. Please upload Keystone XLS."
-        )
-    keystone_text = keystone.extracted_text
 
      # Fetch RFP context 
     rfp_context, _ = await get_similar_context(
@@ -442,14 +442,11 @@ async def regenerate_answer_with_chat_service(request, db: AsyncSession):
         question=question.question_text,
         base_answer=base_answer,
         rfp_context=rfp_context
-    )    
-
-    refined_answer = await _complete_with_fallback(
-        provider=provider or "gpt-4o-mini",
-        prompt=user_prompt,
-        system_prompt=system_prompt,
-        fallback_providers=["gpt-5.4", "claude-sonnet-4-6"],
     )
+    return question.rfp_id, system_prompt, user_prompt
+
+
+async def _save_regenerated_answer(db: AsyncSession, user_id: int, ques_id: int, refined_answer: str):
     refined_answer = refined_answer.strip()
     refined_answer = re.sub(r"(\*\*|##+|\*)", "", refined_answer)
 
@@ -461,6 +458,7 @@ async def regenerate_answer_with_chat_service(request, db: AsyncSession):
     )
     db.add(new_version)
 
+    reviewer = await db.get(Reviewer, (user_id, ques_id))
     reviewer.ans = refined_answer
     await db.commit()
     await db.refresh(new_version)
@@ -476,3 +474,57 @@ async def regenerate_answer_with_chat_service(request, db: AsyncSession):
             "generated_at": new_version.generated_at,
         }
     }
+
+
+async def regenerate_answer_with_chat_service(request, db: AsyncSession):
+    rfp_id, system_prompt, user_prompt = await _chat_regeneration_prompts(request, db)
+
+    with llm_priority(PRIORITY_INTERACTIVE), llm_attribution(rfp_id=rfp_id, user_id=request.user_id):
+        refined_answer = await _complete_with_fallback(
+            provider=request.provider or "gpt-4o-mini",
+            prompt=user_prompt,
+            system_prompt=system_prompt,
+            fallback_providers=CHAT_FALLBACK_MODELS,
+            caller="regenerate_answer_with_chat_service",
+            # Regenerating must not hand back the answer it replaces
+            use_cache=False,
+        )
+    return await _save_regenerated_answer(db, request.user_id, request.ques_id, refined_answer)
+
+
+async def stream_regenerate_answer_with_chat_service(request, db: AsyncSession):
+    """
+    Streaming variant of regenerate_answer_with_chat_service. Validation and
+    retrieval happen before this returns; the generator yields ("token",
+    {"text"}) per delta, then saves the version and yields ("done", result)
+    with the non-streaming response body, or ("error", {"message"}).
+    """
+    rfp_id, system_prompt, user_prompt = await _chat_regeneration_prompts(request, db)
+
+    async def events():
+        parts = []
+        try:
+            async for delta in _stream_with_fallback(
+                provider=request.provider or "gpt-4o-mini",
+                prompt=user_prompt,
+                system_prompt=system_prompt,
+                fallback_providers=CHAT_FALLBACK_MODELS,
+                caller="regenerate_answer_with_chat_service",
+                use_cache=False,
+                priority=PRIORITY_INTERACTIVE,
+                attribution={"rfp_id": rfp_id, "user_id": request.user_id},
+            ):
+                parts.append(delta)
+                yield "token", {"text": delta}
+
+            # The request's session may already be closed while streaming
+            async with AsyncSessionLocal() as session:
+                result = await _save_regenerated_answer(session, request.user_id, request.ques_id, "".join(parts))
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            yield "error", {"message": str(detail)}
+            return
+
+        yield "done", result
+
+    return events()
@@ -1,17 +1,14 @@
 import os
-import uuid
-import hashlib
 import asyncio
+import time
 from sqlalchemy import func
 from datetime import datetime
 from app.core.timer import Timer
 from sqlalchemy.orm import Session
 from fastapi import UploadFile, HTTPException, status
 from fastapi.responses import FileResponse
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from app.models.rfp_models import RFPDocument, RFPQuestion, CompanySummary,GeneratedRFPDocument
 from app.services.llm_services.llm_service import (
-    extract_text_from_pdf,
     extract_company_background_from_rfp,
     # extract_questions_with_llm,
     questions_grouped_function,
@@ -19,43 +16,71 @@ from app.services.llm_services.llm_service import (
     generate_search_queries,
     parse_rfp_summary,
     clean_extracted_text,
-    delete_rfp_embeddings
 )
 # from app.core.prompts.question_grouped_function import questions_grouped_function
-from app.config import pc, index, UPLOAD_FOLDER
-from app.core.serpapi.serpapi import search_with_serpapi
-from app.core.llm_client.openai import OpenAIEmbeddingClient
+from app.config import UPLOAD_FOLDER
+from app.core.llm_client.telemetry import llm_attribution
+from app.core.serpapi.serpapi import search_many_with_serpapi
+from app.services.llm_services.answer_session import drop_answer_sessions
+from app.services.llm_services.retrieval_service import (
+    delete_rfp_embeddings,
+    document_namespace,
+    embed_and_upsert,
+    rfp_chunk_record,
+    split_rfp_text,
+    RFP_CATEGORY,
+)
 from pathlib import Path
-from app.services.file_services.file_extracter import extract_text_from_file, SUPPORTED_EXTENSIONS
+from app.services.file_services.extraction import extract_document_text
+from app.services.file_services.uploads import staged_upload
 from app.services.llm_services.llm_service import classification_QaI
+from app.db.database import AsyncSessionLocal
+from app.services.job_services.job_queue import (
+    JobContext,
+    enqueue_job,
+    find_active_job,
+    register_job_handler,
+    serialize_job,
+)
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+RFP_PROCESSING_JOB = "rfp_processing"
+
 class RFPExtractionError(Exception):
     """Raised when file reading or text extraction fails unexpectedly."""
     pass
 
-async def process_rfp_file(
-    file: UploadFile,
-    project_name: str,
-    db: AsyncSession,
-    current_user,
-    provider: str = "gpt-4o-mini",
-    custom_message: str = None,
-    fallback_providers: list[str] = None
-):
-    timer = Timer()
-
-    try:
+# Pipeline stages in execution order. The names double as Timer step names,
+# so job progress and the synchronous "timing" block use the same vocabulary.
+RFP_PIPELINE_STAGES = [
+    "pdf_extraction",
+    "text_cleaning",
+    "db_insert",
+    "llm_parallel_process",
+    "serp_search",
+    "final_summary",
+    "summary_parsing",
+    "questions_save",
+    "embedding",
+]
+
+# Stages whose output only lives in memory; they are redone on resume
+# unless the text has already been persisted by db_insert.
+_TRANSIENT_STAGES = {"pdf_extraction", "text_cleaning"}
+
+
+async def _save_rfp_upload(file: UploadFile, db: AsyncSession, timer: Timer) -> dict:
+    """Stream, de-duplicate and store an uploaded RFP. Returns the pipeline params for it."""
+    async with staged_upload(file) as upload:
         # FILE READ
-        file_bytes = await file.read()
         timer.log("file_read")
 
-        if not file_bytes:
+        if not upload.size:
             raise HTTPException(status_code=400, detail="Uploaded file is empty.")
 
         # DUPLICATE CHECK
-        file_hash = hashlib.md5(file_bytes).hexdigest()
+        file_hash = upload.md5
         existing_rfp = await db.execute(
             select(RFPDocument).filter(RFPDocument.file_hash == file_hash)
         )
@@ -70,6 +95,18 @@ async def process_rfp_file(
                     "existing_rfp_id": existing_rfp.id
                 }
             )
+
+        active_job = await find_active_job(db, RFP_PROCESSING_JOB, file_hash)
+        if active_job:
+            raise HTTPException(
+                status_code=208,
+                detail={
+                    "status": "duplicate",
+                    "message": "This RFP is already being processed.",
+                    "job_id": active_job.id,
+                    "job_status": active_job.status
+                }
+            )
         timer.log("duplicate_check")
 
         # SAVE FILE
@@ -77,170 +114,311 @@ async def process_rfp_file(
         safe_original_name = os.path.basename(file.filename) if file.filename else "uploaded.pdf"
         dummy_filename = f"rfp_{timestamp}.pdf"
 
-        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-        file_path = os.path.join(UPLOAD_FOLDER, dummy_filename)
-
-        with open(file_path, "wb") as f:
-            f.write(file_bytes)
-
+        file_path = upload.commit(os.path.join(UPLOAD_FOLDER, dummy_filename))
         timer.log("file_save")
 
-        # TEXT EXTRACTION
-        rfp_text = await asyncio.to_thread(extract_text_from_pdf, file_bytes)
-        timer.log("pdf_extraction\n")
-        # print("\nrfp_text lenth",len(rfp_text))
-        # print("\nHere is the rfp text--------------------------",rfp_text)
-
-        if not rfp_text.strip():
-            raise HTTPException(status_code=422, detail="PDF has no readable text")
-
-        # CLEAN TEXT
-        rfp_text = clean_extracted_text(rfp_text)
-        timer.log("text_cleaning")
-
-        # SAVE TO DB
-        new_rfp = RFPDocument(
-            filename=safe_original_name,
-            file_path=file_path,
-            file_hash=file_hash,
-            extracted_text=rfp_text,
-            admin_id=current_user.id,
-            category="history",
-            project_name=project_name
-        )
-
-        db.add(new_rfp)
-        await db.commit()
-        await db.refresh(new_rfp)
-
-        timer.log("db_insert")
+    return {
+        "file_path": file_path,
+        "file_hash": file_hash,
+        "file_sha256": upload.sha256,
+        "filename": safe_original_name,
+    }
 
 
-        # search_queries = generate_search_queries(rfp_text, provider)
-        # timer.log("search_query_generation")
+async def _load_rfp_text(db: AsyncSession, state: dict, runtime: dict) -> str:
+    if "rfp_text" not in runtime:
+        rfp = await db.get(RFPDocument, state["rfp_id"])
+        if not rfp or not rfp.extracted_text:
+            raise RFPExtractionError(f"Extracted text for RFP {state['rfp_id']} is missing")
+        runtime["rfp_text"] = rfp.extracted_text
+    return runtime["rfp_text"]
+
+
+async def _stage_pdf_extraction(db, params, state, runtime):
+    # Jobs queued before uploads were hashed with sha256 have no file_sha256
+    rfp_text = await extract_document_text(params["file_path"], sha256=params.get("file_sha256"))
+    if not rfp_text.strip():
+        raise HTTPException(status_code=422, detail="PDF has no readable text")
+    runtime["rfp_text"] = rfp_text
+
+
+async def _stage_text_cleaning(db, params, state, runtime):
+    runtime["rfp_text"] = clean_extracted_text(runtime["rfp_text"])
+
+
+async def _stage_db_insert(db, params, state, runtime):
+    # A resumed job may have committed the row before its state was saved
+    existing = await db.execute(
+        select(RFPDocument).filter(RFPDocument.file_hash == params["file_hash"])
+    )
+    existing = existing.scalar()
+    if existing:
+        state["rfp_id"] = existing.id
+        return
+
+    new_rfp = RFPDocument(
+        filename=params["filename"],
+        file_path=params["file_path"],
+        file_hash=params["file_hash"],
+        extracted_text=runtime["rfp_text"],
+        admin_id=params["admin_id"],
+        category=RFP_CATEGORY,
+        project_name=params["project_name"]
+    )
+
+    db.add(new_rfp)
+    await db.commit()
+    await db.refresh(new_rfp)
+
+    state["rfp_id"] = new_rfp.id
+
+
+async def _stage_llm_parallel_process(db, params, state, runtime):
+    rfp_text = await _load_rfp_text(db, state, runtime)
+    provider = params["provider"]
+    fallback_providers = params.get("fallback_providers")
+
+    search_queries, questions_grouped, company_rfp_text = await asyncio.gather(
+        generate_search_queries(rfp_text, provider, fallback_providers),
+        questions_grouped_function(rfp_text, params.get("custom_message"), provider, fallback_providers),
+        extract_company_background_from_rfp(rfp_text, provider, fallback_providers)
+    )
+
+    state["search_queries"] = search_queries
+    state["questions_grouped"] = questions_grouped
+    state["company_rfp_text"] = company_rfp_text
+
+
+async def _stage_serp_search(db, params, state, runtime):
+    all_snippets = []
+    results_per_query = await search_many_with_serpapi(state["search_queries"])
+    for results in results_per_query:
+        for item in results:
+            snippet = item.get("snippet")
+            if snippet:
+                all_snippets.append(snippet)
+
+    state["all_snippets"] = all_snippets
+
+
+async def _stage_final_summary(db, params, state, runtime):
+    state["raw_summary"] = await summarize_results_with_llm(
+        state["all_snippets"],
+        rfp_company_text=state["company_rfp_text"],
+        provider=params["provider"],
+        fallback_providers=params.get("fallback_providers"),
+    )
+
+
+async def _stage_summary_parsing(db, params, state, runtime):
+    state["structured_summary"] = parse_rfp_summary(state["raw_summary"])
+
+
+async def _stage_questions_save(db, params, state, runtime):
+    rfp_id = state["rfp_id"]
+
+    existing_summary = await db.execute(
+        select(CompanySummary).filter(CompanySummary.rfp_id == rfp_id)
+    )
+    if existing_summary.scalars().first():
+        return
+
+    db.add(CompanySummary(
+        rfp_id=rfp_id,
+        summary_text=state["raw_summary"],
+        admin_id=params["admin_id"]
+    ))
+
+    for group_number, data in state["questions_grouped"].items():
+        section_name = data.get("section", f"Section {group_number}")
+        for q in data.get("questions", []):
+            if q:
+                db.add(RFPQuestion(
+                    rfp_id=rfp_id,
+                    question_text=q,
+                    section=section_name,
+                    admin_id=params["admin_id"]
+                ))
+
+    await db.commit()
+
+
+async def _stage_embedding(db, params, state, runtime):
+    rfp_id = state["rfp_id"]
+    rfp_text = await _load_rfp_text(db, state, runtime)
+    chunks = split_rfp_text(rfp_text)
+    failed_indices = []
+
+    def _record_failure(indices, error):
+        print(f"[Embedding Error]: chunks {indices[0]}..{indices[-1]} of RFP {rfp_id}: {error}")
+        failed_indices.extend(indices)
+
+    embedded = await embed_and_upsert(
+        document_namespace(rfp_id),
+        chunks,
+        lambda i, text, vector: rfp_chunk_record(rfp_id, i, text, vector),
+        on_failure=_record_failure,
+    )
+
+    drop_answer_sessions(rfp_id)
+
+    state["total_chunks"] = len(chunks)
+    state["embedded_chunks"] = embedded
+    state["failed_chunks"] = len(failed_indices)
+    state["failed_chunk_indices"] = sorted(failed_indices)
+
 
-        # questions_grouped = questions_grouped_function(
-        #     rfp_text, custom_message, provider
-        # )
-        # timer.log("question_generation")
-        # company_rfp_text = extract_company_background_from_rfp(
-        #     rfp_text, provider
-        # )
-        # timer.log("company_extraction")
-
-        search_queries, questions_grouped, company_rfp_text = await asyncio.gather(
-            generate_search_queries(rfp_text, provider, fallback_providers),
-            questions_grouped_function(rfp_text, custom_message, provider, fallback_providers),
-            extract_company_background_from_rfp(rfp_text, provider, fallback_providers)
-        )
+_STAGE_FUNCTIONS = {
+    "pdf_extraction": _stage_pdf_extraction,
+    "text_cleaning": _stage_text_cleaning,
+    "db_insert": _stage_db_insert,
+    "llm_parallel_process": _stage_llm_parallel_process,
+    "serp_search": _stage_serp_search,
+    "final_summary": _stage_final_summary,
+    "summary_parsing": _stage_summary_parsing,
+    "questions_save": _stage_questions_save,
+    "embedding": _stage_embedding,
+}
+
+
+async def run_rfp_pipeline(
+    db: AsyncSession,
+    params: dict,
+    state: dict = None,
+    timer: Timer = None,
+    on_stage=None,
+) -> dict:
+    """
+    Run the processing stages for an already stored RFP file.
+
+    `state` holds the persisted output of every completed stage; stages listed
+    in state["completed_stages"] are skipped, so a failed run resumes at the
+    stage that failed. `on_stage(name, status, duration=None, error=None)` is
+    awaited around every stage for progress reporting. LLM calls made by the
+    stages are attributed to params["admin_id"] and, from db_insert on, to
+    the RFP.
+    """
+    state = state if state is not None else {}
+    timer = timer or Timer()
+    runtime = {}
+
+    completed = state.setdefault("completed_stages", [])
+    if "db_insert" not in completed:
+        completed[:] = [s for s in completed if s not in _TRANSIENT_STAGES]
+
+    for stage_name in RFP_PIPELINE_STAGES:
+        if stage_name in completed:
+            continue
+
+        if on_stage:
+            await on_stage(stage_name, "running")
+        started = time.time()
 
-        # Temporary debug
-        print(type(search_queries), type(questions_grouped), type(company_rfp_text))
+        try:
+            # LLM usage is attributed to the RFP once db_insert has created it
+            with llm_attribution(rfp_id=state.get("rfp_id"), user_id=params.get("admin_id")):
+                await _STAGE_FUNCTIONS[stage_name](db, params, state, runtime)
+        except Exception as e:
+            await db.rollback()
+            if on_stage:
+                await on_stage(stage_name, "failed", error=str(getattr(e, "detail", None) or e))
+            raise
+
+        timer.log(stage_name)
+        completed.append(stage_name)
+        if on_stage:
+            await on_stage(stage_name, "completed", duration=round(time.time() - started, 3))
+
+    return state
+
+
+def _rfp_pipeline_response(state: dict, timer: Timer) -> dict:
+    for k, v in timer.steps.items():
+        print(f"{k}: {v} sec")
+
+    total_time = timer.total()
+    print(f"TOTAL TIME: {total_time} sec\n")
+
+    return {
+        "status": "new",
+        "rfp_id": state["rfp_id"],
+        "summary": state["structured_summary"],
+        "total_questions": state["questions_grouped"],
+        "embedded_chunks": state["embedded_chunks"],
+        "failed_chunks": state["failed_chunks"],
+        "total_chunks": state["total_chunks"],
+        "timing": {
+            "steps": timer.steps,
+            "total_time": total_time
+        }
+    }
 
-        timer.log("llm_parallel_process")
-        
 
-        all_snippets = []
-        for query in search_queries:
-            try:
-                results = search_with_serpapi(query)
-                for item in results:
-                    snippet = item.get("snippet")
-                    if snippet:
-                        all_snippets.append(snippet)
-            except Exception as e:
-                print(f"[SERP ERROR]: {e}")
-
-        timer.log("serp_search")
-
-
-        raw_summary = await summarize_results_with_llm(
-            all_snippets,
-            rfp_company_text=company_rfp_text,
-            provider=provider,
-            fallback_providers=fallback_providers,
-        )
-        timer.log("final_summary")
+async def process_rfp_file(
+    file: UploadFile,
+    project_name: str,
+    db: AsyncSession,
+    current_user,
+    provider: str = "gpt-4o-mini",
+    custom_message: str = None,
+    fallback_providers: list[str] = None
+):
+    timer = Timer()
 
-        structured_summary = parse_rfp_summary(raw_summary)
-        timer.log("summary_parsing")
+    try:
+        params = await _save_rfp_upload(file, db, timer)
+        params.update({
+            "project_name": project_name,
+            "admin_id": current_user.id,
+            "provider": provider,
+            "custom_message": custom_message,
+            "fallback_providers": fallback_providers,
+        })
+
+        state = await run_rfp_pipeline(db, params, timer=timer)
+        return _rfp_pipeline_response(state, timer)
 
-        new_summary = CompanySummary(
-            rfp_id=new_rfp.id,
-            summary_text=raw_summary,
-            admin_id=current_user.id
-        )
-        db.add(new_summary)
-
-        for group_number, data in questions_grouped.items():
-            section_name = data.get("section", f"Section {group_number}")
-            for q in data.get("questions", []):
-                if q:
-                    db.add(RFPQuestion(
-                        rfp_id=new_rfp.id,
-                        question_text=q,
-                        section=section_name,
-                        admin_id=current_user.id
-                    ))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        await db.commit()
-        timer.log("questions_save")
 
+async def enqueue_rfp_file(
+    file: UploadFile,
+    project_name: str,
+    db: AsyncSession,
+    current_user,
+    provider: str = "gpt-4o-mini",
+    custom_message: str = None,
+    fallback_providers: list[str] = None
+):
+    """Store the upload and queue the rest of process_rfp_file as a background job."""
+    timer = Timer()
 
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=100
+    try:
+        params = await _save_rfp_upload(file, db, timer)
+        params.update({
+            "project_name": project_name,
+            "admin_id": current_user.id,
+            "provider": provider,
+            "custom_message": custom_message,
+            "fallback_providers": fallback_providers,
+        })
+
+        job = await enqueue_job(
+            db,
+            RFP_PROCESSING_JOB,
+            payload=params,
+            admin_id=current_user.id,
+            stage_names=RFP_PIPELINE_STAGES,
+            dedupe_key=params["file_hash"],
         )
-        chunks = splitter.split_text(rfp_text)
-
-        try:
-            client = OpenAIEmbeddingClient()
-            
-            # Single API call for ALL chunks at once
-            embedding_vectors = await client.embed(chunks)
-
-            # Build all vectors
-            vectors = [
-                {
-                    "id": str(uuid.uuid4()),
-                    "values": embedding_vector,
-                    "metadata": {
-                        "file_id": "rfp_" +str(new_rfp.id),
-                        "chunk_index": i,
-                        "text": chunk
-                    }
-                }
-                for i, (chunk, embedding_vector) in enumerate(zip(chunks, embedding_vectors))
-            ]
-
-            # Batch upsert to Pinecone (100 at a time)
-            BATCH_SIZE = 100
-            for i in range(0, len(vectors), BATCH_SIZE):
-                index.upsert(vectors[i:i + BATCH_SIZE], namespace=f"rfp_{new_rfp.id}")
-
-        except Exception as e:
-            print(f"[Embedding Error]: {e}")
-
-        timer.log("embedding")
-
-
-        # print("\n⏱️ TIMING BREAKDOWN:")
-        for k, v in timer.steps.items():
-            print(f"{k}: {v} sec")
-
-        total_time = timer.total()
-        print(f"TOTAL TIME: {total_time} sec\n")
 
         return {
-            "status": "new",
-            "rfp_id": new_rfp.id,
-            "summary": structured_summary,
-            "total_questions": questions_grouped,
-            "embedded_chunks": len(chunks),
-            "timing": {
-                "steps": timer.steps,
-                "total_time": total_time
-            }
+            "status": "queued",
+            **serialize_job(job),
+            "upload_timing": timer.steps,
         }
 
     except HTTPException:
@@ -248,6 +426,29 @@ async def process_rfp_file(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@register_job_handler(RFP_PROCESSING_JOB)
+async def run_rfp_processing_job(ctx: JobContext) -> dict:
+    timer = Timer()
+
+    async def on_stage(name, status, duration=None, error=None):
+        await ctx.stage(name, status, duration=duration, error=error)
+
+    async with AsyncSessionLocal() as db:
+        state = await run_rfp_pipeline(db, ctx.payload, state=ctx.state, timer=timer, on_stage=on_stage)
+
+    return {
+        "rfp_id": state["rfp_id"],
+        "summary": state["structured_summary"],
+        "total_questions": state["questions_grouped"],
+        "embedded_chunks": state["embedded_chunks"],
+        "failed_chunks": state["failed_chunks"],
+        "total_chunks": state["total_chunks"],
+        "timing": {
+            "steps": {name: (ctx.stages.get(name) or {}).get("duration") for name in RFP_PIPELINE_STAGES},
+        }
+    }
+
 async def fetch_file_details(db: AsyncSession):
     try:
         documents = await db.execute(
@@ -389,7 +590,8 @@ async def permanent_delete_rfp(rfp_id: int, db: AsyncSession, current_user):
             if rfp.file_path and os.path.exists(rfp.file_path):
                 os.remove(rfp.file_path)
 
-            delete_rfp_embeddings(rfp_id)
+            await delete_rfp_embeddings(rfp_id)
+            drop_answer_sessions(rfp_id)
 
             await db.delete(rfp)   
             await db.commit()
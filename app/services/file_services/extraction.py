@@ -0,0 +1,108 @@
+"""
+Document text extraction for every ingestion path.
+
+RFP uploads, library documents, client background documents and the vector
+backfill all extract through `stream_document_pages`, which yields a
+document page by page: PDF pages, PPTX slides, spreadsheet sheets and
+blocks of DOCX paragraphs. It consults the extraction store first, so
+identical bytes are extracted once, and re-uploads, job retries and
+re-processing stream the stored pages instead.
+
+On a miss PDFs go through the page-parallel engine with OCR and the other
+formats through `file_extracter.iter_pages` in a worker thread. Either way
+pages are written to the store as they are produced, and only the page in
+hand is held, so callers that consume the stream incrementally (chunking
+for embeddings) never need the whole document in memory.
+"""
+import asyncio
+import os
+from typing import AsyncIterator, Callable, Iterator, Optional, Tuple
+
+from app.services.file_services.extraction_store import extraction_store
+from app.services.file_services.file_extracter import iter_pages
+from app.services.file_services.pdf_extraction import (
+    OCR_VERSION,
+    sha256_of,
+    stream_pdf_page_records,
+)
+
+# Part of the store key; bump an extractor's version when its output changes
+EXTRACTOR_VERSIONS = {
+    ".pdf": f"pdf1-ocr{OCR_VERSION}",
+    ".docx": "docx2",
+    ".pptx": "pptx2",
+    ".xls": "excel2",
+    ".xlsx": "excel2",
+}
+
+_DONE = object()
+
+
+def _extractor(file_path: str) -> Tuple[str, str]:
+    ext = os.path.splitext(file_path)[1].lower()
+    extractor = EXTRACTOR_VERSIONS.get(ext)
+    if extractor is None:
+        raise ValueError(
+            f"Unsupported file extension '{ext}'. "
+            f"Supported: {', '.join(sorted(EXTRACTOR_VERSIONS))}"
+        )
+    return ext, extractor
+
+
+async def _iterate_in_thread(make_iterator: Callable[[], Iterator[dict]]) -> AsyncIterator[dict]:
+    """Drive a blocking iterator from a worker thread, one item per hop."""
+    iterator = make_iterator()
+    try:
+        while True:
+            item = await asyncio.to_thread(next, iterator, _DONE)
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await asyncio.to_thread(close)
+
+
+async def stream_document_pages(file_path: str, sha256: Optional[str] = None) -> AsyncIterator[dict]:
+    """Pages of the file at `file_path` in order, from the store when it has been extracted before."""
+    ext, extractor = _extractor(file_path)
+    if sha256 is None:
+        sha256 = await asyncio.to_thread(sha256_of, file_path)
+
+    if await asyncio.to_thread(extraction_store.contains, sha256, extractor):
+        yielded = False
+        try:
+            async for page in _iterate_in_thread(lambda: extraction_store.iter_pages(sha256, extractor)):
+                yielded = True
+                yield page
+            return
+        except Exception as e:
+            # A damaged entry is a miss, unless pages already went out
+            extraction_store.read_failed(sha256, extractor, e)
+            if yielded:
+                raise
+
+    if ext == ".pdf":
+        pages = stream_pdf_page_records(file_path, sha256)
+    else:
+        pages = _iterate_in_thread(lambda: iter_pages(file_path))
+
+    entry = await asyncio.to_thread(extraction_store.open_entry, sha256, extractor)
+    try:
+        async for page in pages:
+            if entry is not None:
+                entry.write(page)
+            yield page
+        if entry is not None:
+            await asyncio.to_thread(entry.commit)
+    finally:
+        # Closing the stream early or a failed extraction leaves no entry
+        await pages.aclose()
+        if entry is not None:
+            entry.discard()
+
+
+async def extract_document_text(file_path: str, sha256: Optional[str] = None) -> str:
+    texts = [page["text"] async for page in stream_document_pages(file_path, sha256)]
+    return "".join(texts).strip()
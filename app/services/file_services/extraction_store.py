@@ -0,0 +1,147 @@
+"""
+Content-addressed store of extracted document text.
+
+An extraction is keyed by the file's sha256 and the extractor version that
+produced it, so identical bytes are extracted once no matter which upload
+path they arrive through, and an extractor change simply misses the old
+entries. Each entry is one file,
+
+    {EXTRACTION_STORE_PATH}/{sha[:2]}/{sha}.{extractor}.jsonl.zst
+
+holding one JSON line per page (text plus layout metadata such as page
+size and whether it was OCR'd), zstd-compressed. Entries are written to a
+temporary file and renamed into place, so readers never see a partial one
+and concurrent writers of the same entry are harmless. Store failures are
+logged and treated as misses.
+"""
+import io
+import json
+import os
+import tempfile
+from typing import Iterator, Optional
+
+import zstandard
+
+from app.config import EXTRACTION_STORE_ENABLED, EXTRACTION_STORE_PATH
+
+ZSTD_LEVEL = 3
+
+
+class ExtractionStore:
+    def __init__(self, root: str = EXTRACTION_STORE_PATH, enabled: bool = EXTRACTION_STORE_ENABLED):
+        self.root = root
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    def path(self, sha256: str, extractor: str) -> str:
+        return os.path.join(self.root, sha256[:2], f"{sha256}.{extractor}.jsonl.zst")
+
+    def iter_pages(self, sha256: str, extractor: str) -> Iterator[dict]:
+        """Stream an entry's pages; raises FileNotFoundError when there is none."""
+        with open(self.path(sha256, extractor), "rb") as raw:
+            reader = zstandard.ZstdDecompressor().stream_reader(raw)
+            for line in io.TextIOWrapper(reader, encoding="utf-8"):
+                if line.strip():
+                    yield json.loads(line)
+
+    def contains(self, sha256: str, extractor: str) -> bool:
+        """Whether the entry exists, counted as a hit or a miss; streaming readers check this first."""
+        if not self.enabled:
+            return False
+        found = os.path.exists(self.path(sha256, extractor))
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found
+
+    def read_failed(self, sha256: str, extractor: str, e: Exception):
+        self.errors += 1
+        print(f"[EXTRACTION STORE] Could not read {sha256[:12]} ({extractor}): {e}")
+
+    def open_entry(self, sha256: str, extractor: str) -> Optional["EntryWriter"]:
+        """A writer that adds pages to a new entry as they are produced; None when disabled."""
+        if not self.enabled:
+            return None
+        try:
+            return EntryWriter(self, sha256, extractor)
+        except Exception as e:
+            self.errors += 1
+            print(f"[EXTRACTION STORE] Could not write {sha256[:12]} ({extractor}): {e}")
+            return None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "path": self.root,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "writes": self.writes,
+            "errors": self.errors,
+        }
+
+
+class EntryWriter:
+    """
+    Compresses pages into a temporary file next to the entry; `commit`
+    renames it into place and `discard` drops it. A failed write discards the
+    entry and turns the remaining calls into no-ops, so extraction never fails
+    because of the store.
+    """
+
+    def __init__(self, store: ExtractionStore, sha256: str, extractor: str):
+        self.store = store
+        self.sha256 = sha256
+        self.extractor = extractor
+        self.path = store.path(sha256, extractor)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        self.raw = os.fdopen(fd, "wb")
+        self.writer = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(self.raw)
+        self.closed = False
+
+    def _fail(self, e: Exception):
+        self.store.errors += 1
+        print(f"[EXTRACTION STORE] Could not write {self.sha256[:12]} ({self.extractor}): {e}")
+        self.discard()
+
+    def write(self, page: dict):
+        if self.closed:
+            return
+        try:
+            self.writer.write((json.dumps(page, ensure_ascii=False) + "\n").encode("utf-8"))
+        except Exception as e:
+            self._fail(e)
+
+    def commit(self):
+        if self.closed:
+            return
+        try:
+            self.writer.close()
+            os.replace(self.tmp_path, self.path)
+        except Exception as e:
+            self._fail(e)
+            return
+        self.closed = True
+        self.store.writes += 1
+
+    def discard(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+        try:
+            os.unlink(self.tmp_path)
+        except OSError:
+            pass
+
+
+extraction_store = ExtractionStore()
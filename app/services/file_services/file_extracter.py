@@ -1,16 +1,19 @@
 import os
 import logging
 from pathlib import Path
+from typing import Iterator
 
 import docx
 import pandas as pd
-from PyPDF2 import PdfReader
 from pptx import Presentation
 
 logger = logging.getLogger(__name__)
 
-# Supported extensions mapped to their handler
-SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".pptx", ".xls", ".xlsx"}
+# Supported extensions mapped to their handler; PDFs go through pdf_extraction
+SUPPORTED_EXTENSIONS = {".docx", ".pptx", ".xls", ".xlsx"}
+
+# DOCX has no pages; its paragraphs are yielded in blocks of this many
+DOCX_PARAGRAPHS_PER_BLOCK = 200
 
 
 class ExtractionError(Exception):
@@ -18,23 +21,7 @@ class ExtractionError(Exception):
     pass
 
 
-def extract_text_from_file(file_path: str) -> str:
-    """
-    Extract plain text from a supported file.
-
-    Supports: PDF, DOCX, PPTX, XLS, XLSX.
-
-    Args:
-        file_path: Absolute or relative path to the file.
-
-    Returns:
-        Extracted text as a single stripped string.
-
-    Raises:
-        FileNotFoundError: If the file does not exist.
-        ValueError: If the file extension is not supported.
-        ExtractionError: If extraction fails due to a corrupt or unreadable file.
-    """
+def _resolve(file_path: str) -> Path:
     path = Path(file_path).resolve()
 
     if not path.exists():
@@ -43,52 +30,60 @@ def extract_text_from_file(file_path: str) -> str:
     if not path.is_file():
         raise ValueError(f"Path is not a file: {path}")
 
-    ext = path.suffix.lower()
-
-    if ext not in SUPPORTED_EXTENSIONS:
+    if path.suffix.lower() not in SUPPORTED_EXTENSIONS:
         raise ValueError(
-            f"Unsupported file extension '{ext}'. "
+            f"Unsupported file extension '{path.suffix.lower()}'. "
             f"Supported: {', '.join(sorted(SUPPORTED_EXTENSIONS))}"
         )
+    return path
+
+
+def iter_pages(file_path: str) -> Iterator[dict]:
+    """
+    Stream a supported file's text one page at a time.
+
+    Pages are PPTX slides, spreadsheet sheets and blocks of DOCX paragraphs,
+    yielded as {"page": index, "text": ...} plus format-specific layout
+    fields. Each page's text ends with its separator, so joining the
+    texts with "" gives the whole document. Only one page is held at a time.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file extension is not supported.
+        ExtractionError: If extraction fails due to a corrupt or unreadable file.
+    """
+    path = _resolve(file_path)
 
     try:
-        text = _EXTRACTORS[ext](path)
-    except (FileNotFoundError, ValueError):
+        yield from _EXTRACTORS[path.suffix.lower()](path)
+    except (FileNotFoundError, ValueError, ExtractionError):
         raise
     except Exception as e:
         logger.exception("Failed to extract text from '%s'", path)
         raise ExtractionError(f"Could not extract text from '{path}': {e}") from e
 
-    return text.strip()
-
-
-
 
-def _extract_pdf(path: Path) -> str:
-    reader = PdfReader(str(path))
-
-    if reader.is_encrypted:
-        raise ExtractionError(f"PDF is encrypted and cannot be read: {path}")
-
-    pages: list[str] = []
-    for i, page in enumerate(reader.pages):
-        try:
-            page_text = page.extract_text() or ""
-            pages.append(page_text)
-        except Exception as e:
-            logger.warning("Skipping PDF page %d in '%s': %s", i, path, e)
-
-    return "\n".join(pages)
+def _extract_docx(path: Path) -> Iterator[dict]:
+    doc = docx.Document(str(path))
+    block: list[str] = []
+    number = 0
 
+    for p in doc.paragraphs:
+        if not p.text.strip():
+            continue
+        block.append(p.text)
+        if len(block) >= DOCX_PARAGRAPHS_PER_BLOCK:
+            yield {"page": number, "text": "\n".join(block) + "\n"}
+            block = []
+            number += 1
 
-def _extract_docx(path: Path) -> str:
-    doc = docx.Document(str(path))
-    return "\n".join(p.text for p in doc.paragraphs if p.text.strip())
+    if block:
+        yield {"page": number, "text": "\n".join(block) + "\n"}
 
 
-def _extract_pptx(path: Path) -> str:
+def _extract_pptx(path: Path) -> Iterator[dict]:
     prs = Presentation(str(path))
-    chunks: list[str] = []
+    number = 0
 
     for slide_num, slide in enumerate(prs.slides, start=1):
         slide_texts: list[str] = []
@@ -100,14 +95,14 @@ def _extract_pptx(path: Path) -> str:
                 slide_texts.append(shape_text)
 
         if slide_texts:
-            chunks.append(f"[Slide {slide_num}]\n" + "\n".join(slide_texts))
+            text = f"[Slide {slide_num}]\n" + "\n".join(slide_texts) + "\n\n"
+            yield {"page": number, "text": text, "slide": slide_num}
+            number += 1
 
-    return "\n\n".join(chunks)
 
-
-def _extract_excel(path: Path) -> str:
+def _extract_excel(path: Path) -> Iterator[dict]:
     xls = pd.ExcelFile(str(path))
-    sheet_chunks: list[str] = []
+    number = 0
 
     for sheet_name in xls.sheet_names:
         df: pd.DataFrame = xls.parse(sheet_name)
@@ -125,16 +120,15 @@ def _extract_excel(path: Path) -> str:
         row_lines = non_empty_rows.agg(" ".join, axis=1).tolist()
 
         if row_lines:
-            sheet_chunks.append(f"[Sheet: {sheet_name}]\n" + "\n".join(row_lines))
-
-    return "\n\n".join(sheet_chunks)
+            text = f"[Sheet: {sheet_name}]\n" + "\n".join(row_lines) + "\n\n"
+            yield {"page": number, "text": text, "sheet": sheet_name}
+            number += 1
 
 
 # Dispatch table — avoids if/elif chains and makes adding formats trivial
 _EXTRACTORS = {
-    ".pdf":  _extract_pdf,
     ".docx": _extract_docx,
     ".pptx": _extract_pptx,
     ".xls":  _extract_excel,
     ".xlsx": _extract_excel,
-}
\ No newline at end of file
+}
@@ -0,0 +1,184 @@
+"""
+Page-parallel PDF text extraction.
+
+A PDF is cut into ranges of PDF_PAGES_PER_TASK pages that worker processes
+extract concurrently. Pages with a text layer come back as text; as soon as
+a range is done, its pages without one are sent to a separate OCR pool of
+PDF_OCR_WORKERS processes, since tesseract is by far the most expensive
+step and would otherwise starve text extraction. Pages are streamed back in
+document order as the ranges complete. Only enough ranges to keep both
+pools busy are in flight at once; the next one is started as each range
+is handed to the consumer, so a slow consumer holds a bounded number of
+extracted pages rather than the whole document.
+
+Workers open the document themselves, from its path or from the bytes they
+are given, so with a path only page numbers and text cross process
+boundaries. The pools use spawned processes; forking the threaded server
+process is not safe.
+
+OCR output is cached per (file sha256, page, OCR settings) in the shared
+`pdf_ocr` cache, so re-processing a scanned document skips tesseract.
+"""
+import asyncio
+import hashlib
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.config import (
+    PDF_EXTRACT_WORKERS,
+    PDF_OCR_WORKERS,
+    PDF_PAGES_PER_TASK,
+    PDF_OCR_DPI,
+    PDF_OCR_MIN_DPI,
+    PDF_OCR_MAX_DPI,
+    PDF_OCR_TARGET_LINE_PX,
+    PDF_OCR_CACHE_ENABLED,
+    PDF_OCR_CACHE_TTL_SECONDS,
+    PDF_OCR_CACHE_MAX_ENTRIES,
+)
+from app.core.cache import PersistentCache, make_cache_key
+from app.services.file_services.pdf_pages import (
+    OcrSettings,
+    PdfSource,
+    extract_page_range,
+    ocr_page,
+    page_count,
+)
+
+# Bump when OCR changes in a way that should invalidate cached pages
+OCR_VERSION = 3
+
+OCR_SETTINGS = OcrSettings(
+    target_line_px=PDF_OCR_TARGET_LINE_PX,
+    min_dpi=PDF_OCR_MIN_DPI,
+    max_dpi=PDF_OCR_MAX_DPI,
+    default_dpi=PDF_OCR_DPI,
+)
+
+pdf_ocr_cache = PersistentCache(
+    "pdf_ocr",
+    ttl_seconds=PDF_OCR_CACHE_TTL_SECONDS,
+    max_entries=PDF_OCR_CACHE_MAX_ENTRIES,
+) if PDF_OCR_CACHE_ENABLED else None
+
+_pools: Dict[str, ProcessPoolExecutor] = {}
+
+
+def _pool(name: str, workers: int) -> ProcessPoolExecutor:
+    if name not in _pools:
+        _pools[name] = ProcessPoolExecutor(
+            max_workers=max(workers, 1),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pools[name]
+
+
+def shutdown_pdf_pools():
+    for pool in _pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _pools.clear()
+
+
+def sha256_of(source: PdfSource) -> str:
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    with open(source, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _ocr_cache_key(sha256: str, number: int) -> str:
+    return make_cache_key("pdf_ocr", OCR_VERSION, sha256, number, OCR_SETTINGS)
+
+
+async def stream_pdf_page_records(
+    source: PdfSource, sha256: Optional[str] = None
+) -> AsyncIterator[dict]:
+    """
+    Every page in order as {"page", "text", "ocr", "width", "height"}, OCR'd
+    where the page has no text layer. Up to a window of ranges is extracted
+    concurrently and each is yielded as soon as it and the ranges before it
+    are done, which starts the next one. `sha256`
+    of the file keys the OCR cache; it is computed when not given and a page
+    needs OCR.
+    """
+    loop = asyncio.get_running_loop()
+    count = await asyncio.to_thread(page_count, source)
+    ranges = [
+        (start, min(start + PDF_PAGES_PER_TASK, count))
+        for start in range(0, count, PDF_PAGES_PER_TASK)
+    ]
+    digest_lock = asyncio.Lock()
+
+    async def _sha256() -> str:
+        nonlocal sha256
+        async with digest_lock:
+            if sha256 is None:
+                sha256 = await asyncio.to_thread(sha256_of, source)
+        return sha256
+
+    async def _ocr(numbers: List[int]) -> Dict[int, str]:
+        keys = {}
+        cached = {}
+        if pdf_ocr_cache is not None:
+            file_sha256 = await _sha256()
+            keys = {number: _ocr_cache_key(file_sha256, number) for number in numbers}
+            found = await pdf_ocr_cache.get_many(keys.values())
+            cached = {number: found[key] for number, key in keys.items() if key in found}
+
+        missing = [number for number in numbers if number not in cached]
+        texts = await asyncio.gather(*(
+            loop.run_in_executor(_pool("ocr", PDF_OCR_WORKERS), ocr_page, source, number, OCR_SETTINGS)
+            for number in missing
+        ))
+        fresh = dict(zip(missing, texts))
+        if pdf_ocr_cache is not None and fresh:
+            await pdf_ocr_cache.set_many({keys[number]: text for number, text in fresh.items()})
+        return {**cached, **fresh}
+
+    async def _range(start: int, end: int) -> List[dict]:
+        if len(ranges) == 1:
+            # Not worth a round trip to the pool
+            records = await asyncio.to_thread(extract_page_range, source, start, end)
+        else:
+            records = await loop.run_in_executor(
+                _pool("text", PDF_EXTRACT_WORKERS), extract_page_range, source, start, end
+            )
+
+        for record in records:
+            record["ocr"] = record["text"] is None
+
+        needs_ocr = [record for record in records if record["ocr"]]
+        if needs_ocr:
+            texts = await _ocr([record["page"] for record in needs_ocr])
+            for record in needs_ocr:
+                record["text"] = texts[record["page"]]
+        return records
+
+    # A range waiting on OCR no longer occupies a text worker, so the window
+    # covers both pools
+    window = max(PDF_EXTRACT_WORKERS, 1) + max(PDF_OCR_WORKERS, 0)
+    not_started = iter(ranges)
+    tasks = deque()
+
+    def _start_ranges():
+        for start, end in itertools.islice(not_started, window - len(tasks)):
+            tasks.append(asyncio.ensure_future(_range(start, end)))
+
+    _start_ranges()
+    try:
+        while tasks:
+            records = await tasks.popleft()
+            _start_ranges()
+            for record in records:
+                yield record
+    finally:
+        # The consumer stopped early or a range failed
+        for task in tasks:
+            task.cancel()
+
@@ -0,0 +1,163 @@
+"""
+Per-page PDF work that runs inside the extraction pools.
+
+Kept free of app imports so spawned workers start quickly; every setting a
+worker needs is passed in with the call.
+
+OCR only rasterizes what needs it. The regions to OCR are the page's image
+blocks, or the whole page when images cover most of it, when it has none,
+or when anything is drawn outside them (e.g. text drawn as vector paths
+next to a photo). Each region's DPI is chosen from the
+height of its text lines, measured on a cheap low-resolution probe, so that
+lines reach about `target_line_px` pixels: small print gets more than the
+old fixed 300 DPI, large print much less. Regions are rendered in grayscale
+and their raw samples handed to tesseract as an uncompressed PGM, with no
+PNG encode and decode in between.
+"""
+from typing import List, NamedTuple, Optional, Union
+
+import fitz
+import numpy as np
+import pytesseract
+from PIL import Image
+
+PdfSource = Union[str, bytes]
+
+PROBE_DPI = 100
+# Image blocks smaller than this share of the page are logos and rules, not text
+MIN_REGION_SHARE = 0.01
+# Above this share of the page covered by images, OCR the page as a whole
+FULL_PAGE_SHARE = 0.8
+# Inked probe pixels outside the images beyond which the page is OCR'd whole;
+# a handful is anti-aliasing at the image edges
+MAX_STRAY_INK_PIXELS = 40
+
+
+class OcrSettings(NamedTuple):
+    target_line_px: int
+    min_dpi: int
+    max_dpi: int
+    default_dpi: int
+
+
+def open_pdf(source: PdfSource):
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+def page_count(source: PdfSource) -> int:
+    with open_pdf(source) as doc:
+        return doc.page_count
+
+
+def extract_page_range(source: PdfSource, start: int, end: int) -> List[dict]:
+    """
+    Records of pages [start, end): page number, size in points and text,
+    which is None for a page without a text layer.
+    """
+    pages = []
+    with open_pdf(source) as doc:
+        for number in range(start, end):
+            page = doc[number]
+            text = page.get_text()
+            pages.append({
+                "page": number,
+                "text": text if text and text.strip() else None,
+                "width": round(page.rect.width, 1),
+                "height": round(page.rect.height, 1),
+            })
+    return pages
+
+
+def _merge_overlapping(rects: List[fitz.Rect]) -> List[fitz.Rect]:
+    merged = []
+    for rect in rects:
+        rect = fitz.Rect(rect)
+        changed = True
+        while changed:
+            changed = False
+            for other in merged:
+                if rect.intersects(other):
+                    merged.remove(other)
+                    rect |= other
+                    changed = True
+                    break
+        merged.append(rect)
+    return merged
+
+
+def _ink_outside(page, rects: List[fitz.Rect]) -> bool:
+    """Whether anything is drawn outside `rects`, from a low-DPI render with them blanked."""
+    probe = page.get_pixmap(dpi=PROBE_DPI, colorspace=fitz.csGRAY, alpha=False)
+    pixels = np.frombuffer(probe.samples_mv, dtype=np.uint8).reshape(probe.height, probe.stride)
+    inked = pixels[:, :probe.width] < 128
+    scale = PROBE_DPI / 72.0
+    for rect in rects:
+        x0 = max(int((rect.x0 - page.rect.x0) * scale) - 1, 0)
+        y0 = max(int((rect.y0 - page.rect.y0) * scale) - 1, 0)
+        x1 = int((rect.x1 - page.rect.x0) * scale) + 2
+        y1 = int((rect.y1 - page.rect.y0) * scale) + 2
+        inked[y0:y1, x0:x1] = False
+    return int(inked.sum()) > MAX_STRAY_INK_PIXELS
+
+
+def ocr_regions(page) -> List[fitz.Rect]:
+    """Areas of the page to OCR, in reading order."""
+    page_area = page.rect.width * page.rect.height
+    images = []
+    for info in page.get_image_info():
+        rect = fitz.Rect(info["bbox"]) & page.rect
+        if not rect.is_empty:
+            images.append(rect)
+
+    rects = _merge_overlapping([r for r in images if r.width * r.height >= page_area * MIN_REGION_SHARE])
+    if not rects or sum(r.width * r.height for r in rects) >= page_area * FULL_PAGE_SHARE:
+        return [page.rect]
+    # Cropping to the images would drop vector-drawn text around them
+    if _ink_outside(page, images):
+        return [page.rect]
+    return sorted(rects, key=lambda r: (round(r.y0), r.x0))
+
+
+def line_height_points(page, clip: fitz.Rect) -> Optional[float]:
+    """Median height of the text lines in `clip`, from the ink rows of a low-DPI render."""
+    probe = page.get_pixmap(dpi=PROBE_DPI, clip=clip, colorspace=fitz.csGRAY, alpha=False)
+    if not probe.width or not probe.height:
+        return None
+    pixels = np.frombuffer(probe.samples_mv, dtype=np.uint8).reshape(probe.height, probe.stride)
+    inked = (pixels[:, :probe.width] < 128).mean(axis=1) > 0.005
+
+    # Runs of consecutive inked rows are text lines
+    edges = np.diff(np.concatenate(([0], inked.astype(np.int8), [0])))
+    heights = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+    heights = heights[heights >= 2]
+    if not len(heights):
+        return None
+    return float(np.median(heights)) * 72.0 / PROBE_DPI
+
+
+def choose_dpi(page, clip: fitz.Rect, settings: OcrSettings) -> int:
+    line_points = line_height_points(page, clip)
+    if not line_points:
+        return settings.default_dpi
+    dpi = settings.target_line_px * 72.0 / line_points
+    return int(min(max(dpi, settings.min_dpi), settings.max_dpi))
+
+
+def _tesseract(pix) -> str:
+    image = Image.frombuffer("L", (pix.width, pix.height), pix.samples_mv, "raw", "L", pix.stride, 1)
+    # pytesseract writes the image in this format for the tesseract CLI; PGM is the raw samples
+    image.format = "PPM"
+    return pytesseract.image_to_string(image)
+
+
+def ocr_page(source: PdfSource, number: int, settings: OcrSettings) -> str:
+    with open_pdf(source) as doc:
+        page = doc[number]
+        texts = []
+        for clip in ocr_regions(page):
+            dpi = choose_dpi(page, clip, settings)
+            pix = page.get_pixmap(dpi=dpi, clip=clip, colorspace=fitz.csGRAY, alpha=False)
+            texts.append(_tesseract(pix))
+    return "\n".join(text for text in texts if text.strip())
@@ -0,0 +1,82 @@
+"""
+Streaming upload ingest.
+
+An upload is copied to a temporary file next to its destination in
+UPLOAD_CHUNK_SIZE pieces, and hashed as each piece is written, so neither
+the whole upload nor a second pass over the saved file is ever needed.
+Callers run their checks (empty file, duplicate hash) against the staged
+file and then move it into place with an atomic rename; anything that is
+not committed is deleted when the `staged_upload` block exits.
+
+    async with staged_upload(file) as upload:
+        if await is_duplicate(upload.sha256):
+            raise HTTPException(...)
+        upload.commit(file_path)
+
+Extraction then works from the saved path.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import UploadFile
+
+from app.config import UPLOAD_FOLDER
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class StagedUpload:
+    def __init__(self, tmp_path: str):
+        self.tmp_path = tmp_path
+        self.path = None
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._md5 = hashlib.md5()
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    @property
+    def md5(self) -> str:
+        return self._md5.hexdigest()
+
+    def _write(self, out, chunk: bytes):
+        out.write(chunk)
+        self._sha256.update(chunk)
+        self._md5.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self, path: str) -> str:
+        """Move the staged file to `path`, replacing whatever is there."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        os.replace(self.tmp_path, path)
+        self.path = path
+        return path
+
+    def discard(self):
+        if self.path is None:
+            try:
+                os.unlink(self.tmp_path)
+            except FileNotFoundError:
+                pass
+
+
+@asynccontextmanager
+async def staged_upload(file: UploadFile, directory: str = UPLOAD_FOLDER) -> AsyncIterator[StagedUpload]:
+    """Stream `file` to a temporary file in `directory`, hashing it on the way."""
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+    upload = StagedUpload(tmp_path)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                # Writing and hashing a chunk both release the GIL
+                await asyncio.to_thread(upload._write, out, chunk)
+        yield upload
+    finally:
+        upload.discard()
@@ -0,0 +1,10 @@
+from app.services.job_services.job_queue import (
+    enqueue_job,
+    find_active_job,
+    get_job,
+    retry_job,
+    serialize_job,
+    register_job_handler,
+    worker_pool,
+    JobContext,
+    TERMINAL_STATUSES)
@@ -0,0 +1,9 @@
+"""
+Importing this module registers every background job handler.
+
+Handlers live next to the services they run; they register themselves
+through `register_job_handler` when their module is imported.
+"""
+from app.services.admin_services import rfp_service  # noqa: F401
+from app.services.llm_services import retrieval_service  # noqa: F401
+from app.services.admin_services import bulk_answer_service  # noqa: F401
@@ -0,0 +1,348 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import (
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_POLL_INTERVAL_SECONDS,
+    JOB_WORKER_CONCURRENCY,
+)
+from app.core.llm_client.scheduler import PRIORITY_BULK, llm_priority
+from app.core.llm_client.telemetry import llm_attribution
+from app.db.database import AsyncSessionLocal
+from app.models.rfp_models import BackgroundJob
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+STAGE_PENDING = "pending"
+STAGE_RUNNING = "running"
+STAGE_COMPLETED = "completed"
+STAGE_FAILED = "failed"
+
+TERMINAL_STATUSES = {JOB_COMPLETED, JOB_FAILED}
+
+JobHandler = Callable[["JobContext"], Awaitable[dict]]
+
+# job_type -> coroutine that runs the job and returns its result payload
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+_wakeup = asyncio.Event()
+
+
+def register_job_handler(job_type: str):
+    def decorator(func: JobHandler) -> JobHandler:
+        JOB_HANDLERS[job_type] = func
+        return func
+    return decorator
+
+
+class JobContext:
+    """
+    Handed to a job handler while it runs.
+
+    Stage and state updates are written through short-lived sessions of their
+    own, so a handler rolling back its work session never loses progress.
+    """
+
+    def __init__(self, job: BackgroundJob):
+        self.job_id = job.id
+        self.job_type = job.job_type
+        self.admin_id = job.admin_id
+        self.payload = dict(job.payload or {})
+        self.state = dict(job.state or {})
+        self.stages = dict(job.stages or {})
+
+    async def _write(self, **values):
+        values["updated_at"] = datetime.utcnow()
+        values["locked_at"] = values["updated_at"]
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == self.job_id)
+                .values(**values)
+            )
+            await session.commit()
+
+    async def stage(self, name: str, status: str, duration: float = None, error: str = None):
+        entry = dict(self.stages.get(name) or {})
+        entry["status"] = status
+        if duration is not None:
+            entry["duration"] = duration
+        if error is not None:
+            entry["error"] = error
+        elif "error" in entry and status != STAGE_FAILED:
+            entry.pop("error")
+        self.stages[name] = entry
+        await self._write(stages=dict(self.stages), current_stage=name, state=dict(self.state))
+
+    async def save_state(self):
+        await self._write(state=dict(self.state))
+
+
+def _pending_stages(stage_names: List[str]) -> dict:
+    return {name: {"status": STAGE_PENDING} for name in stage_names}
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    job_type: str,
+    payload: dict,
+    admin_id: int = None,
+    stage_names: List[str] = None,
+    dedupe_key: str = None,
+) -> BackgroundJob:
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job type '{job_type}'")
+
+    job = BackgroundJob(
+        id=uuid.uuid4().hex,
+        job_type=job_type,
+        admin_id=admin_id,
+        dedupe_key=dedupe_key,
+        payload=payload,
+        state={},
+        stages=_pending_stages(stage_names or []),
+        status=JOB_QUEUED,
+        attempts=0,
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+
+    _wakeup.set()
+    return job
+
+
+async def find_active_job(db: AsyncSession, job_type: str, dedupe_key: str) -> Optional[BackgroundJob]:
+    """
+    Return a queued or running job for the same input, if any. A failed job
+    does not block a new one; the new upload simply supersedes it.
+    """
+    result = await db.execute(
+        select(BackgroundJob)
+        .filter(
+            BackgroundJob.job_type == job_type,
+            BackgroundJob.dedupe_key == dedupe_key,
+            BackgroundJob.status.in_([JOB_QUEUED, JOB_RUNNING]),
+        )
+        .order_by(BackgroundJob.created_at.desc())
+    )
+    return result.scalars().first()
+
+
+async def get_job(db: AsyncSession, job_id: str) -> Optional[BackgroundJob]:
+    result = await db.execute(select(BackgroundJob).filter(BackgroundJob.id == job_id))
+    return result.scalars().first()
+
+
+async def retry_job(db: AsyncSession, job: BackgroundJob) -> BackgroundJob:
+    """Requeue a failed job. Completed stages are kept, so it resumes where it failed."""
+    if job.status != JOB_FAILED:
+        raise ValueError(f"Only failed jobs can be retried (status is '{job.status}')")
+
+    job.status = JOB_QUEUED
+    job.error = None
+    job.attempts = 0
+    job.finished_at = None
+    job.updated_at = datetime.utcnow()
+    await db.commit()
+    await db.refresh(job)
+
+    _wakeup.set()
+    return job
+
+
+def serialize_job(job: BackgroundJob) -> dict:
+    stages = job.stages or {}
+    completed = sum(1 for s in stages.values() if s.get("status") == STAGE_COMPLETED)
+
+    return {
+        "job_id": job.id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "current_stage": job.current_stage,
+        "stages": stages,
+        "progress": round(completed / len(stages), 3) if stages else None,
+        "attempts": job.attempts,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "updated_at": job.updated_at,
+    }
+
+
+async def claim_next_job() -> Optional[BackgroundJob]:
+    """
+    Atomically move the oldest queued job to running.
+
+    SKIP LOCKED lets several worker coroutines, or several app processes,
+    poll the same table without handing out a job twice.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(BackgroundJob)
+            .filter(BackgroundJob.status == JOB_QUEUED)
+            .order_by(BackgroundJob.created_at.asc())
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = result.scalars().first()
+        if not job:
+            return None
+
+        now = datetime.utcnow()
+        job.status = JOB_RUNNING
+        job.attempts = (job.attempts or 0) + 1
+        job.started_at = job.started_at or now
+        job.locked_at = now
+        job.updated_at = now
+        await session.commit()
+        await session.refresh(job)
+        return job
+
+
+async def requeue_stale_jobs() -> int:
+    """
+    Jobs whose worker stopped heart-beating (crash, redeploy) go back to the
+    queue. One that has already been claimed JOB_MAX_ATTEMPTS times is
+    failed instead, so a job that kills its worker cannot loop forever.
+    """
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=JOB_LEASE_SECONDS)
+    stale = (BackgroundJob.status == JOB_RUNNING, BackgroundJob.locked_at < cutoff)
+    async with AsyncSessionLocal() as session:
+        failed = await session.execute(
+            update(BackgroundJob)
+            .where(*stale, BackgroundJob.attempts >= JOB_MAX_ATTEMPTS)
+            .values(
+                status=JOB_FAILED,
+                error=f"Worker stopped responding on each of {JOB_MAX_ATTEMPTS} attempts",
+                finished_at=now,
+                updated_at=now,
+            )
+        )
+        if failed.rowcount:
+            print(f"[JOB WORKER] Failed {failed.rowcount} job(s) after {JOB_MAX_ATTEMPTS} lost attempts")
+
+        result = await session.execute(
+            update(BackgroundJob)
+            .where(*stale)
+            .values(status=JOB_QUEUED, updated_at=now)
+        )
+        await session.commit()
+        return result.rowcount or 0
+
+
+async def _heartbeat(ctx: JobContext, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await ctx._write()
+        except Exception as e:
+            print(f"[JOB HEARTBEAT ERROR] {ctx.job_id}: {e}")
+
+
+async def run_job(job: BackgroundJob):
+    handler = JOB_HANDLERS.get(job.job_type)
+    ctx = JobContext(job)
+
+    if handler is None:
+        await ctx._write(status=JOB_FAILED, error=f"No handler for job type '{job.job_type}'",
+                         finished_at=datetime.utcnow())
+        return
+
+    heartbeat = asyncio.create_task(_heartbeat(ctx, max(JOB_LEASE_SECONDS / 3, 5)))
+    try:
+        # Background work queues behind interactive LLM calls; its usage is
+        # attributed to the admin who started it
+        with llm_priority(PRIORITY_BULK), llm_attribution(user_id=job.admin_id):
+            result = await handler(ctx)
+        await ctx._write(
+            status=JOB_COMPLETED,
+            result=result,
+            state=dict(ctx.state),
+            stages=dict(ctx.stages),
+            finished_at=datetime.utcnow(),
+        )
+    except Exception as e:
+        detail = getattr(e, "detail", None) or str(e)
+        print(f"[JOB FAILED] {job.id} ({job.job_type}): {detail}")
+        await ctx._write(
+            status=JOB_FAILED,
+            error=str(detail),
+            state=dict(ctx.state),
+            stages=dict(ctx.stages),
+            finished_at=datetime.utcnow(),
+        )
+    finally:
+        heartbeat.cancel()
+
+
+class JobWorkerPool:
+    """Polls the job table from a fixed number of worker coroutines."""
+
+    def __init__(self, concurrency: int = JOB_WORKER_CONCURRENCY, poll_interval: float = JOB_POLL_INTERVAL_SECONDS):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    def start(self):
+        # Handlers register themselves on import
+        from app.services.job_services import handlers  # noqa: F401
+
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._worker_loop(i))
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        self._stopping = True
+        _wakeup.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker_loop(self, worker_id: int):
+        last_reclaim = 0.0
+        loop = asyncio.get_running_loop()
+
+        while not self._stopping:
+            try:
+                if worker_id == 0 and loop.time() - last_reclaim > JOB_LEASE_SECONDS / 2:
+                    reclaimed = await requeue_stale_jobs()
+                    if reclaimed:
+                        print(f"[JOB WORKER] Requeued {reclaimed} stale job(s)")
+                    last_reclaim = loop.time()
+
+                job = await claim_next_job()
+                if job:
+                    await run_job(job)
+                    continue
+
+                _wakeup.clear()
+                try:
+                    await asyncio.wait_for(_wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[JOB WORKER {worker_id}] error: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+
+worker_pool = JobWorkerPool()
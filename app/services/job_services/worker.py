@@ -0,0 +1,31 @@
+"""
+Run background job workers outside the API process:
+
+    python -m app.services.job_services.worker --concurrency 4
+
+Workers share the job table with any in-process workers started by the app,
+so API replicas can run with JOB_WORKER_CONCURRENCY=0 and leave the heavy
+pipelines to dedicated worker processes.
+"""
+import argparse
+import asyncio
+
+from app.config import JOB_WORKER_CONCURRENCY
+from app.services.job_services.job_queue import JobWorkerPool
+
+
+async def main(concurrency: int):
+    pool = JobWorkerPool(concurrency=concurrency)
+    pool.start()
+    print(f"[JOB WORKER] Started {pool.concurrency} worker(s)")
+    try:
+        await asyncio.gather(*pool._tasks)
+    finally:
+        await pool.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=max(JOB_WORKER_CONCURRENCY, 1))
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency))
@@ -0,0 +1,128 @@
+"""
+Per-RFP answer sessions.
+
+Answering a question needs the RFP's chunks, the admin's Keystone and the
+client's short name. A session loads all of it once: the RFP namespace is
+fetched into an in-memory, unit-normalized matrix, and the Keystone
+snapshot gets its row vectors. After that, retrieval for any number of
+questions is a matrix-vector product, and question texts can be embedded
+together in one batched call. Sessions are cached per (RFP, Keystone
+version), so interactive answers for the same RFP reuse them too.
+"""
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import ANSWER_SESSION_ENTRIES, ANSWER_SESSION_TTL_SECONDS
+from app.core.cache import LRUCache
+from app.core.vector_store import vector_store
+from app.models.rfp_models import RFPDocument
+from app.services.llm_services.embedding_service import BatchEmbedder
+from app.services.llm_services.keystone_cache import KeystoneSnapshot, get_active_keystone
+from app.services.llm_services.llm_service import get_short_name
+from app.services.llm_services.retrieval_service import (
+    document_namespace,
+    get_keystone_context,
+    load_keystone_vectors,
+)
+from app.services.user_services.user_business_logic import format_enhanced_context
+
+
+class AnswerSession:
+    def __init__(self, rfp: RFPDocument, keystone: KeystoneSnapshot, records: List[dict]):
+        self.rfp_id = rfp.id
+        self.short_name = get_short_name(rfp.filename)
+        self.keystone = keystone
+
+        # Chunk order does not matter for ranking; keep it stable for ties
+        records = sorted(records, key=lambda r: r["metadata"].get("chunk_index", 0))
+        self.chunks = [record["metadata"] for record in records]
+        matrix = np.asarray([record["values"] for record in records], dtype=np.float32)
+        if len(records):
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix = matrix / norms
+        self.chunk_matrix = matrix
+        self._question_vectors: Dict[str, List[float]] = {}
+        self._embedder = BatchEmbedder()
+
+    @classmethod
+    async def load(cls, rfp: RFPDocument, keystone: KeystoneSnapshot) -> "AnswerSession":
+        records, _ = await asyncio.gather(
+            vector_store.fetch_all(document_namespace(rfp.id)),
+            load_keystone_vectors(keystone),
+        )
+        return cls(rfp, keystone, records)
+
+    async def embed_questions(self, texts: List[str]) -> List[List[float]]:
+        """Embed every text not seen yet in one batched request; returns vectors in order."""
+        missing = list(dict.fromkeys(t for t in texts if t not in self._question_vectors))
+        if missing:
+            vectors = await self._embedder.embed_all(missing)
+            self._question_vectors.update(zip(missing, vectors))
+        return [self._question_vectors[t] for t in texts]
+
+    def rfp_context(self, vector: List[float], top_k: int = 5) -> Tuple[str, List[dict]]:
+        if not self.chunks or top_k <= 0:
+            return "", []
+
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        scores = self.chunk_matrix @ query
+        top_k = min(top_k, len(scores))
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        ranked = candidates[np.argsort(-scores[candidates])]
+
+        context_texts = [self.chunks[i].get("text", "") for i in ranked]
+        sources = [
+            {
+                "score": float(scores[i]),
+                "file_id": self.chunks[i].get("file_id"),
+                "chunk_index": self.chunks[i].get("chunk_index"),
+                "snippet": self.chunks[i].get("text", "")[:300],
+            }
+            for i in ranked
+        ]
+        return "\n".join(context_texts), sources
+
+    async def build_context(self, question_text: str, top_k: int = 5) -> Tuple[str, List[str]]:
+        """The enhanced (Keystone + RFP) context for one question."""
+        vector = (await self.embed_questions([question_text]))[0]
+        rfp_context, _ = self.rfp_context(vector, top_k)
+        keystone_text = await get_keystone_context(question_text, self.keystone, embedding=vector)
+        return format_enhanced_context(keystone_text, rfp_context), ["keystone", "rfp"]
+
+
+_sessions = LRUCache(max_entries=ANSWER_SESSION_ENTRIES, ttl_seconds=ANSWER_SESSION_TTL_SECONDS)
+
+
+async def get_answer_session(db: AsyncSession, rfp_id: int, admin_id: int) -> AnswerSession:
+    keystone = await get_active_keystone(db, admin_id)
+    key = (rfp_id, keystone.key)
+    session: Optional[AnswerSession] = _sessions.get(key)
+    if session is not None:
+        return session
+
+    rfp = await db.get(RFPDocument, rfp_id)
+    if not rfp:
+        raise HTTPException(status_code=404, detail="RFP Document not found")
+
+    session = await AnswerSession.load(rfp, keystone)
+    # An RFP answered before its chunks are embedded has an empty namespace;
+    # caching that would hide the chunks for the whole TTL
+    if session.chunks:
+        _sessions.set(key, session)
+    return session
+
+
+def drop_answer_sessions(rfp_id: int):
+    """Forget cached sessions of an RFP, e.g. after its vectors changed."""
+    for key in _sessions.keys():
+        if key[0] == rfp_id:
+            _sessions.pop(key)
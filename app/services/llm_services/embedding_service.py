@@ -0,0 +1,119 @@
+import asyncio
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from app.config import (
+    EMBEDDING_BATCH_MAX_TOKENS,
+    EMBEDDING_BATCH_MAX_INPUTS,
+    EMBEDDING_CONCURRENCY,
+    EMBEDDING_MAX_RETRIES,
+)
+from app.core.llm_client.openai import OpenAIEmbeddingClient
+from app.core.tokens import estimate_tokens
+
+
+class BatchEmbedder:
+    """
+    Embeds many texts in token-budgeted batches.
+
+    Texts are packed in order into requests of at most `max_batch_tokens`
+    estimated tokens and `max_batch_inputs` inputs. Up to `concurrency`
+    requests are in flight at once, and `embed_batches` yields each batch as
+    soon as it returns, so callers can upsert while later batches are still
+    embedding.
+
+    A failing request is retried `max_retries` times with backoff, then split
+    in half and each half retried, so one rejected chunk only costs itself.
+    """
+
+    def __init__(
+        self,
+        client: Optional[OpenAIEmbeddingClient] = None,
+        max_batch_tokens: int = EMBEDDING_BATCH_MAX_TOKENS,
+        max_batch_inputs: int = EMBEDDING_BATCH_MAX_INPUTS,
+        concurrency: int = EMBEDDING_CONCURRENCY,
+        max_retries: int = EMBEDDING_MAX_RETRIES,
+    ):
+        self.client = client or OpenAIEmbeddingClient()
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_inputs = max_batch_inputs
+        self.concurrency = max(concurrency, 1)
+        self.max_retries = max_retries
+
+    def make_batches(self, texts: List[str]) -> List[List[int]]:
+        """Group text indices into batches that respect the token and input limits."""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+
+        for i, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if current and (
+                current_tokens + tokens > self.max_batch_tokens
+                or len(current) >= self.max_batch_inputs
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _embed_with_retry(self, texts: List[str], batch: List[int]):
+        last_exception = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                return [(batch, await self.client.embed([texts[i] for i in batch]))], []
+            except Exception as e:
+                last_exception = e
+                if attempt < self.max_retries:
+                    await asyncio.sleep(0.5 * (2 ** attempt))
+
+        if len(batch) == 1:
+            return [], [(batch, last_exception)]
+
+        print(f"[EMBEDDING] Batch of {len(batch)} failed ({last_exception}); splitting")
+        middle = len(batch) // 2
+        left_ok, left_failed = await self._embed_with_retry(texts, batch[:middle])
+        right_ok, right_failed = await self._embed_with_retry(texts, batch[middle:])
+        return left_ok + right_ok, left_failed + right_failed
+
+    async def embed_batches(
+        self,
+        texts: List[str],
+        on_failure: Optional[Callable[[List[int], Exception], None]] = None,
+    ) -> AsyncIterator[Tuple[List[int], List[List[float]]]]:
+        """
+        Yield (indices, vectors) per batch in completion order.
+
+        Without `on_failure` the first chunk that cannot be embedded raises;
+        with it, failed indices are handed to the callback and skipped.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _run(batch: List[int]):
+            async with semaphore:
+                return await self._embed_with_retry(texts, batch)
+
+        tasks = [asyncio.create_task(_run(batch)) for batch in self.make_batches(texts)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                succeeded, failed = await next_done
+                for indices, error in failed:
+                    if on_failure is None:
+                        raise error
+                    on_failure(indices, error)
+                for indices, vectors in succeeded:
+                    yield indices, vectors
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def embed_all(self, texts: List[str]) -> List[List[float]]:
+        """Embed every text and return the vectors in input order."""
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        async for indices, batch_vectors in self.embed_batches(texts):
+            for i, vector in zip(indices, batch_vectors):
+                vectors[i] = vector
+        return vectors
@@ -0,0 +1,191 @@
+"""
+In-process cache of Keystone versions and everything derived from them.
+
+A Keystone version is identified by (admin_id, keystone id, uploaded_at) and
+never changes once uploaded, so its text, parsed rows, token counts and row
+embeddings can be kept for as long as it is the admin's latest upload.
+Which version is latest is itself cached for KEYSTONE_VERSION_TTL_SECONDS,
+so other processes pick up a new upload within that window; uploads and
+deletes in this process invalidate it immediately.
+"""
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import KEYSTONE_CACHE_ENTRIES, KEYSTONE_VERSION_TTL_SECONDS
+from app.core.cache import LRUCache
+from app.core.tokens import estimate_tokens
+from app.models.rfp_models import KeystoneFile
+
+_SHEET_HEADER = re.compile(r"^=== (.*) ===$")
+
+
+def keystone_rows(extracted_text: str) -> List[dict]:
+    """
+    Split the text `extract_xls_text` produced back into rows, each tagged
+    with its sheet. Works for every Keystone already stored, without
+    re-reading the workbook.
+    """
+    rows = []
+    sheet = ""
+    for line in (extracted_text or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        header = _SHEET_HEADER.match(line)
+        if header:
+            sheet = header.group(1)
+            continue
+        rows.append({"row_index": len(rows), "sheet": sheet, "text": line})
+    return rows
+
+
+def render_keystone_rows(rows: List[dict]) -> str:
+    """Lay rows out the way extract_xls_text does, in workbook order."""
+    output = []
+    sheet = None
+    for row in sorted(rows, key=lambda r: r["row_index"]):
+        if row["sheet"] != sheet:
+            sheet = row["sheet"]
+            output.append(f"\n=== {sheet} ===\n")
+        output.append(row["text"])
+    return "\n".join(output)
+
+
+class KeystoneSnapshot:
+    """One Keystone version with its derived artifacts, computed on first use."""
+
+    def __init__(self, keystone: KeystoneFile):
+        self.id = keystone.id
+        self.admin_id = keystone.admin_id
+        self.filename = keystone.filename
+        self.uploaded_at = keystone.uploaded_at
+        self.extracted_text = keystone.extracted_text
+        self._rows: Optional[List[dict]] = None
+        self._token_count: Optional[int] = None
+        self._row_vectors: Optional[np.ndarray] = None
+
+    @property
+    def key(self) -> Tuple:
+        return (self.admin_id, self.id, self.uploaded_at)
+
+    @property
+    def rows(self) -> List[dict]:
+        if self._rows is None:
+            self._rows = keystone_rows(self.extracted_text)
+            for row in self._rows:
+                row["tokens"] = estimate_tokens(row["text"])
+        return self._rows
+
+    @property
+    def token_count(self) -> int:
+        if self._token_count is None:
+            self._token_count = estimate_tokens(self.extracted_text)
+        return self._token_count
+
+    @property
+    def has_row_vectors(self) -> bool:
+        return self._row_vectors is not None
+
+    def set_row_vectors(self, vectors: List[List[float]]):
+        """Keep the row embeddings (in row order) for in-memory retrieval."""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._row_vectors = matrix / norms
+
+    def nearest_rows(self, vector: List[float], top_k: int) -> List[dict]:
+        """Rows ranked by cosine similarity to `vector`, best first."""
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        scores = self._row_vectors @ query
+        top_k = min(top_k, len(scores))
+        if top_k <= 0:
+            return []
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        return [self.rows[i] for i in candidates[np.argsort(-scores[candidates])]]
+
+
+class KeystoneCache:
+    def __init__(
+        self,
+        max_entries: int = KEYSTONE_CACHE_ENTRIES,
+        version_ttl_seconds: int = KEYSTONE_VERSION_TTL_SECONDS,
+    ):
+        self._snapshots = LRUCache(max_entries=max_entries)
+        self._latest = LRUCache(max_entries=max_entries * 4, ttl_seconds=version_ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+        self.version_checks = 0
+
+    def put(self, keystone: KeystoneFile, latest: bool = False) -> KeystoneSnapshot:
+        snapshot = KeystoneSnapshot(keystone)
+        self._snapshots.set(snapshot.key, snapshot)
+        if latest:
+            self._latest.set(snapshot.admin_id, snapshot.key)
+        return snapshot
+
+    async def get_latest(self, db: AsyncSession, admin_id: int) -> Optional[KeystoneSnapshot]:
+        key = self._latest.get(admin_id)
+        if key is None:
+            self.version_checks += 1
+            result = await db.execute(
+                select(KeystoneFile.id, KeystoneFile.uploaded_at)
+                .where(KeystoneFile.admin_id == admin_id)
+                .order_by(KeystoneFile.uploaded_at.desc())
+                .limit(1)
+            )
+            latest = result.first()
+            if latest is None:
+                return None
+            key = (admin_id, latest.id, latest.uploaded_at)
+            self._latest.set(admin_id, key)
+
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+
+        self.misses += 1
+        keystone = await db.get(KeystoneFile, key[1])
+        if keystone is None:
+            self._latest.pop(admin_id)
+            return None
+        return self.put(keystone)
+
+    def invalidate(self, admin_id: int, keystone_id: int = None):
+        """Forget the admin's latest version and, if given, one Keystone's snapshots."""
+        self._latest.pop(admin_id)
+        for key in self._snapshots.keys():
+            if key[0] == admin_id and (keystone_id is None or key[1] == keystone_id):
+                self._snapshots.pop(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "snapshots": len(self._snapshots),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "version_checks": self.version_checks,
+        }
+
+
+keystone_cache = KeystoneCache()
+
+
+async def get_active_keystone(db: AsyncSession, admin_id: int) -> KeystoneSnapshot:
+    keystone = await keystone_cache.get_latest(db, admin_id)
+    if not keystone:
+        raise HTTPException(
+            status_code=400,
+            detail="Keystone Data not uploaded. Please upload Keystone XLS."
+        )
+    return keystone
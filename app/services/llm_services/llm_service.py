@@ -1,22 +1,19 @@
-import os,fitz,requests,re,math,docx,json,io,pytesseract,asyncio
-from typing import Optional
+import requests,re,math,json,asyncio,time
+from typing import AsyncIterator, Optional
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
-from app.models.rfp_models import User,KeystoneFile
-from app.config import client, index
-from pptx import Presentation
-from PyPDF2 import PdfReader
+from app.models.rfp_models import User
 from fastapi import HTTPException
 from app.models import * 
 import pandas as pd
-from PIL import Image
 from sqlalchemy import select
 
 load_dotenv()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-from app.core.llm_client import get_llm_client
+from app.core.llm_client import MODEL_REGISTRY, get_llm_client
+from app.core.llm_client.base import LLMResponse
 from app.core.prompts import (question_prompt,
                             #   mode_block_prompt,
                             #   answer_generation_prompt, 
@@ -27,65 +24,376 @@ from app.core.prompts import (question_prompt,
                               generate_score_prompt, 
                               classification_prompt,
                               build_user_prompt,
-                              build_mode_block)
-from app.core.llm_client.openai import OpenAIEmbeddingClient
+                              build_mode_block,
+                              partial_extractions_text,
+                              search_queries_reduce_prompt,
+                              summary_chunk_prompt,
+                              summary_reduce_prompt)
+from app.core.llm_client.response_cache import llm_response_cache
+from app.core.llm_client.scheduler import (
+    estimate_request_tokens,
+    is_rate_limit_error,
+    llm_scheduler,
+    retry_after_seconds,
+)
+from app.core.llm_client.health import model_health
+from app.core.llm_client.profiles import DEFAULT_PROFILE, GenerationProfile, profile_for
+from app.core.llm_client.telemetry import llm_usage
+from app.config import (
+    LLM_RATE_LIMIT_RETRIES,
+    LLM_MAX_RETRY_AFTER_SECONDS,
+    LLM_HEDGE_AFTER_SECONDS,
+    LLM_EXPECTED_OUTPUT_TOKENS,
+)
+from app.services.llm_services.keystone_cache import get_active_keystone
+from app.services.llm_services.long_document import (
+    chunk_text,
+    map_chunks,
+    merge_question_groups,
+    reduce_texts,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
 
+def _cached_response(model: str, content: str) -> LLMResponse:
+    return LLMResponse(
+        content=content,
+        provider=MODEL_REGISTRY.get(model, {}).get("provider"),
+        model=model,
+        cached=True,
+    )
+
+
+async def _call_model(
+    model: str,
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    profile: GenerationProfile = DEFAULT_PROFILE,
+    caller: str = "unknown",
+    progress: Optional[dict] = None,
+) -> LLMResponse:
+    """
+    One completion through the model's scheduler slot.
+
+    A 429/529 pauses the model for the provider's Retry-After (or an
+    exponential delay) and the call is retried on the same model, up to
+    LLM_RATE_LIMIT_RETRIES times, before the error reaches the fallback chain.
+    When the request is sent, its start time is written to
+    `progress["started"]`.
+    """
+    client = get_llm_client(model)
+    scheduler = llm_scheduler.for_model(model)
+    health = model_health.for_model(model)
+    tokens = estimate_request_tokens(prompt, system_prompt, profile.max_tokens or LLM_EXPECTED_OUTPUT_TOKENS)
+
+    for attempt in range(LLM_RATE_LIMIT_RETRIES + 1):
+        started = None
+        try:
+            async with scheduler.slot(tokens):
+                started = time.monotonic()
+                if progress is not None:
+                    progress["started"] = started
+                if system_prompt is None:
+                    response = await client.complete(prompt=prompt, profile=profile)
+                else:
+                    response = await client.complete(prompt=prompt, system=system_prompt, profile=profile)
+            response.latency_seconds = time.monotonic() - started
+            health.record_success(response.latency_seconds, caller)
+            return response
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt == LLM_RATE_LIMIT_RETRIES:
+                if started is not None:
+                    health.record_failure(time.monotonic() - started, e)
+                raise
+            delay = retry_after_seconds(e) or min(2 ** attempt, LLM_MAX_RETRY_AFTER_SECONDS)
+            print(f"[LLM RATE LIMIT] '{model}' rate limited; retrying in {delay:.1f}s")
+            scheduler.pause(delay)
+
+
+async def _stream_model(
+    model: str,
+    prompt: str,
+    system_prompt: Optional[str],
+    profile: GenerationProfile,
+    priority: Optional[int],
+    usage: dict,
+    caller: str = "unknown",
+) -> AsyncIterator[str]:
+    """
+    Streaming counterpart of _call_model. The scheduler slot is held until
+    the stream ends. A 429/529 before the first delta is retried on the same
+    model the way _call_model does; after it, errors are raised. Token
+    counts and the provider latency are written into `usage`.
+    """
+    client = get_llm_client(model)
+    scheduler = llm_scheduler.for_model(model)
+    health = model_health.for_model(model)
+    tokens = estimate_request_tokens(prompt, system_prompt, profile.max_tokens or LLM_EXPECTED_OUTPUT_TOKENS)
+
+    for attempt in range(LLM_RATE_LIMIT_RETRIES + 1):
+        started = None
+        yielded = False
+        try:
+            async with scheduler.slot(tokens, priority):
+                started = time.monotonic()
+                async for delta in client.stream(prompt=prompt, system=system_prompt, profile=profile, usage=usage):
+                    yielded = True
+                    yield delta
+            usage["latency_seconds"] = time.monotonic() - started
+            health.record_success(usage["latency_seconds"], caller)
+            return
+        except Exception as e:
+            if yielded or not is_rate_limit_error(e) or attempt == LLM_RATE_LIMIT_RETRIES:
+                if started is not None:
+                    health.record_failure(time.monotonic() - started, e)
+                raise
+            delay = retry_after_seconds(e) or min(2 ** attempt, LLM_MAX_RETRY_AFTER_SECONDS)
+            print(f"[LLM RATE LIMIT] '{model}' rate limited; retrying in {delay:.1f}s")
+            scheduler.pause(delay)
+
+
+def _hedge_loser_response(
+    model: str, seconds: float, winner: LLMResponse, prompt: str, system_prompt: Optional[str]
+) -> LLMResponse:
+    """
+    Estimated usage of a hedged call cancelled after `seconds` in flight: the
+    prompt is billed in full, and output is assumed to have been produced at
+    the winner's rate.
+    """
+    progress = min(seconds / winner.latency_seconds, 1.0) if winner.latency_seconds else 0.0
+    return LLMResponse(
+        content="",
+        provider=MODEL_REGISTRY.get(model, {}).get("provider"),
+        model=model,
+        input_tokens=winner.input_tokens or estimate_request_tokens(prompt, system_prompt, 0),
+        output_tokens=int(winner.output_tokens * progress),
+        latency_seconds=seconds,
+    )
+
+
+async def _hedged(attempt, primary: str, remaining: list[str], caller: str, on_lost) -> LLMResponse:
+    """
+    Run `attempt(primary, progress)`; if it is still running after the
+    primary's p95 latency for `caller` (LLM_HEDGE_AFTER_SECONDS until it has
+    one), also run the next model of `remaining` (popping it) and return
+    whichever succeeds first.
+
+    The loser is cancelled. If its request had been sent it was billed, so
+    `on_lost(model, seconds, winner, response)` is called with its response,
+    or None when it was cancelled after `seconds` in flight.
+    """
+    delay = model_health.for_model(primary).hedge_delay(caller, LLM_HEDGE_AFTER_SECONDS)
+    progress = {primary: {}}
+    primary_task = asyncio.create_task(attempt(primary, progress[primary]))
+    done, _ = await asyncio.wait({primary_task}, timeout=delay)
+    if done:
+        return primary_task.result()
+
+    backup = remaining.pop(0)
+    print(f"[LLM HEDGE] '{primary}' slower than {delay:.1f}s; also trying '{backup}'")
+    progress[backup] = {}
+    models = {primary_task: primary, asyncio.create_task(attempt(backup, progress[backup])): backup}
+    pending = set(models)
+    winner = None
+    last_exception = None
+    try:
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    last_exception = task.exception()
+                elif winner is None:
+                    winner = task.result()
+                else:
+                    # Both finished together
+                    on_lost(models[task], task.result().latency_seconds, winner, task.result())
+        if winner is None:
+            raise last_exception
+        return winner
+    finally:
+        for task in pending:
+            task.cancel()
+            started = progress[models[task]].get("started")
+            if winner is not None and started is not None:
+                on_lost(models[task], time.monotonic() - started, winner, None)
+
+
 async def _complete_with_fallback(
     provider: str,
     prompt: str,
     system_prompt: Optional[str] = None,
     fallback_providers: list[str] = None,
+    caller: str = "unknown",
+    use_cache: bool = True,
+    profile: Optional[GenerationProfile] = None,
 ) -> str:
     """
     Try primary model first, then fallback models in order.
+
+    When the LLM response cache is enabled, each model is looked up in the
+    cache before it is called. `caller` names the call site for cache metrics
+    and LLM_CACHE_BYPASS_CALLERS. `use_cache=False` (a regeneration) skips
+    the lookup for one call but still writes its response, so the entry is
+    replaced.
+
+    Calls are admitted by the model's scheduler at the priority set with
+    `llm_priority`, and rate limits are waited out before falling back.
+    Models whose circuit breaker is open are skipped and ones slow for
+    `caller` are tried last; with LLM_HEDGE_AFTER_SECONDS set, a call that
+    outlasts the model's p95 for `caller` is hedged on the next model, and a
+    cancelled loser's estimated spend is recorded too.
+
+    `profile` (max tokens, temperature, stop sequences) defaults to the one
+    registered for `caller` in GENERATION_PROFILES.
+
+    Every call is recorded in llm_usage (tokens, cost, latency, fallbacks)
+    under `caller` and the current `llm_attribution`.
     """
     all_providers = [provider] + (fallback_providers or ["gpt-4o-mini", "gpt-5.4"])
     last_exception = None
+    cache_enabled = llm_response_cache.should_use(caller)
+    profile = profile or profile_for(caller)
+    started = time.monotonic()
+    failed_models = []
+
+    async def _attempt(current_provider: str, progress: Optional[dict] = None) -> LLMResponse:
+        cache_key = None
+        if cache_enabled:
+            cache_key = llm_response_cache.make_key(
+                current_provider, system_prompt, prompt, profile.cache_params()
+            )
+            cached = await llm_response_cache.get(cache_key, caller, refresh=not use_cache)
+            if cached is not None:
+                return _cached_response(current_provider, cached)
 
-    for current_provider in all_providers:
         try:
-            client = get_llm_client(current_provider)
+            response = await _call_model(current_provider, prompt, system_prompt, profile, caller, progress)
+        except Exception:
+            failed_models.append(current_provider)
+            raise
+
+        if cache_key is not None:
+            await llm_response_cache.set(cache_key, response.content, caller)
+        return response
+
+    def _record_hedge_loser(model: str, seconds: float, winner: LLMResponse, response: Optional[LLMResponse]):
+        response = response or _hedge_loser_response(model, seconds, winner, prompt, system_prompt)
+        llm_usage.record(
+            caller, provider, response, time.monotonic() - started,
+            error=RuntimeError(f"Lost hedge to '{winner.model}'"),
+        )
 
-            if system_prompt is None:
-                return await client.complete(prompt=prompt)
+    remaining = model_health.route(all_providers, caller)
+    while remaining:
+        current_provider = remaining.pop(0)
+        try:
+            if LLM_HEDGE_AFTER_SECONDS > 0 and remaining:
+                response = await _hedged(_attempt, current_provider, remaining, caller, _record_hedge_loser)
             else:
-                return await client.complete(
-                    prompt=prompt,
-                    system=system_prompt
-                )
+                response = await _attempt(current_provider)
 
         except Exception as e:
             last_exception = e
             print(f"[WARNING] Provider '{current_provider}' failed: {e}. Trying next...")
             continue
 
+        response.failed_models = list(failed_models)
+        llm_usage.record(caller, provider, response, time.monotonic() - started)
+        return response.content
+
+    llm_usage.record(
+        caller, provider, None, time.monotonic() - started,
+        error=last_exception, failed_models=failed_models,
+    )
     raise RuntimeError(
         f"All providers failed. Last error: {last_exception}"
     ) from last_exception
 
 
-def extract_text_from_pdf(pdf_file: bytes) -> str:
-    text = ""
-    with fitz.open(stream=pdf_file, filetype="pdf") as doc:
-        for page in doc:
-            extracted_text = page.get_text()
+async def _stream_with_fallback(
+    provider: str,
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    fallback_providers: list[str] = None,
+    caller: str = "unknown",
+    use_cache: bool = True,
+    priority: Optional[int] = None,
+    profile: Optional[GenerationProfile] = None,
+    attribution: Optional[dict] = None,
+) -> AsyncIterator[str]:
+    """
+    Streaming counterpart of _complete_with_fallback: yields text deltas.
+
+    A model that fails before its first delta falls through to the next one;
+    once text has been yielded the stream is committed to that model and a
+    failure is raised to the caller. Rate limits before the first delta are
+    waited out on the same model, as in _call_model. A cache hit is yielded
+    as a single delta, and a completed stream is written to the cache.
+    `priority` and `attribution` are explicit here because a generator is
+    resumed from its consumer's context, not its creator's.
+    """
+    all_providers = [provider] + (fallback_providers or ["gpt-4o-mini", "gpt-5.4"])
+    last_exception = None
+    cache_enabled = llm_response_cache.should_use(caller)
+    profile = profile or profile_for(caller)
+    started_stream = time.monotonic()
+    failed_models = []
+
+    def _record(response: Optional[LLMResponse], error: Optional[Exception] = None):
+        llm_usage.record(
+            caller, provider, response, time.monotonic() - started_stream,
+            attribution=attribution, streamed=True, error=error, failed_models=failed_models,
+        )
 
-            if extracted_text and extracted_text.strip():
-                text += extracted_text
-            else:
-                pix = page.get_pixmap(dpi=300)
-                img_data = pix.tobytes("png")
-                image = Image.open(io.BytesIO(img_data))
-                ocr_text = pytesseract.image_to_string(image)
-                text += ocr_text
+    for current_provider in model_health.route(all_providers, caller):
+        cache_key = None
+        if cache_enabled:
+            cache_key = llm_response_cache.make_key(
+                current_provider, system_prompt, prompt, profile.cache_params()
+            )
+            cached = await llm_response_cache.get(cache_key, caller, refresh=not use_cache)
+            if cached is not None:
+                response = _cached_response(current_provider, cached)
+                response.failed_models = list(failed_models)
+                _record(response)
+                yield cached
+                return
+
+        parts = []
+        usage = {}
+        try:
+            async for delta in _stream_model(current_provider, prompt, system_prompt, profile, priority, usage, caller):
+                parts.append(delta)
+                yield delta
 
-    if not text.strip():
-        raise ValueError("Unable to extract text from PDF: possibly fully scanned or corrupted.")
+        except Exception as e:
+            failed_models.append(current_provider)
+            if parts:
+                _record(None, e)
+                raise
+            last_exception = e
+            print(f"[WARNING] Provider '{current_provider}' failed: {e}. Trying next...")
+            continue
 
-    return text
+        content = "".join(parts)
+        _record(LLMResponse(
+            content=content,
+            provider=MODEL_REGISTRY.get(current_provider, {}).get("provider"),
+            model=current_provider,
+            input_tokens=usage.get("input_tokens", 0),
+            output_tokens=usage.get("output_tokens", 0),
+            latency_seconds=usage.get("latency_seconds", 0.0),
+            failed_models=list(failed_models),
+        ))
+        if cache_key is not None:
+            await llm_response_cache.set(cache_key, content, caller)
+        return
+
+    _record(None, last_exception)
+    raise RuntimeError(
+        f"All providers failed. Last error: {last_exception}"
+    ) from last_exception
 
 
 async def generate_search_queries(
@@ -95,12 +403,25 @@ async def generate_search_queries(
 ) -> list:
     """
     Generate exactly 12 highly targeted Google search queries based on RFP text.
+    A long RFP gets queries per part, which are then narrowed down to 12.
     """
-    prompt = search_queries_prompt(rfp_text)
     system_prompt = "You generate Google search queries to build complete company profiles from RFPs."
 
-    content = await _complete_with_fallback(provider, prompt, system_prompt, fallback_providers)
-    return [line.strip(" -•") for line in content.split("\n") if line.strip()]
+    async def _queries(prompt: str, caller: str) -> list:
+        content = await _complete_with_fallback(
+            provider, prompt, system_prompt, fallback_providers, caller=caller
+        )
+        return [line.strip(" -•") for line in content.split("\n") if line.strip()]
+
+    chunks = await chunk_text(rfp_text)
+    if len(chunks) == 1:
+        return await _queries(search_queries_prompt(rfp_text), "generate_search_queries")
+
+    per_chunk = await map_chunks(
+        chunks, lambda chunk: _queries(search_queries_prompt(chunk), "generate_search_queries")
+    )
+    candidates = list(dict.fromkeys(query for queries in per_chunk for query in queries))
+    return await _queries(search_queries_reduce_prompt(candidates), "generate_search_queries_reduce")
 
 async def extract_company_background_from_rfp(
     rfp_text: str,
@@ -112,10 +433,10 @@ async def extract_company_background_from_rfp(
     1. Purpose of the RFP (including Scope of Work, Buyer Priorities & Win Themes)
     2. Company Background
     3. Submission Details & Requirements
-    """
-
-    prompt = summary_and_analysis_prompt(rfp_text)
 
+    A long RFP is extracted part by part and the extractions merged with
+    the same prompt.
+    """
     system_prompt = (
         "You are a meticulous RFP extraction specialist with perfect attention to detail. "
         "Your extractions are comprehensive, accurate, and complete. You NEVER add information "
@@ -127,9 +448,19 @@ async def extract_company_background_from_rfp(
         "Your Section 3 extractions are especially thorough, capturing every single submission "
         "requirement. You work methodically through checklists to ensure nothing is overlooked."
     )
-    content = await _complete_with_fallback(provider, prompt, system_prompt, fallback_providers)
 
-    return content
+    async def _extract(text: str) -> str:
+        return await _complete_with_fallback(
+            provider, summary_and_analysis_prompt(text), system_prompt, fallback_providers,
+            caller="extract_company_background_from_rfp"
+        )
+
+    chunks = await chunk_text(rfp_text)
+    if len(chunks) == 1:
+        return await _extract(rfp_text)
+
+    partials = await map_chunks(chunks, _extract)
+    return await reduce_texts(partials, lambda parts: _extract(partial_extractions_text(parts)))
 
 async def questions_grouped_function(
     rfp_text: str,
@@ -145,22 +476,32 @@ async def questions_grouped_function(
     CUSTOM INSTRUCTION GUIDELINES:
     - If admin provides specific instructions, use them to guide question generation.
     - Tailor questions to align with admin's focus areas and priorities.
-    - If admin narrows scope, exclude irrelevant questions and focus on specified topics."""
-    
-    prompt = questions_grouped_prompt(rfp_text, custom_instruction)
-    system_prompt = "Return ONLY valid JSON."
+    - If admin narrows scope, exclude irrelevant questions and focus on specified topics.
 
-    content = await _complete_with_fallback(provider, prompt, system_prompt, fallback_providers)
+    A long RFP is processed part by part; the sections found in each part
+    are merged and renumbered."""
+    system_prompt = "Return ONLY valid JSON."
 
-    content = content.strip().replace("```json", "").replace("```", "").strip()
-    try:
-        return json.loads(content)
-    except Exception:
-        raise HTTPException(
-            status_code=500,
-            detail="AI returned invalid JSON in custom question generation"
+    async def _grouped(text: str) -> dict:
+        prompt = questions_grouped_prompt(text, custom_instruction)
+        content = await _complete_with_fallback(
+            provider, prompt, system_prompt, fallback_providers, caller="questions_grouped_function"
         )
 
+        content = content.strip().replace("```json", "").replace("```", "").strip()
+        try:
+            return json.loads(content)
+        except Exception:
+            raise HTTPException(
+                status_code=500,
+                detail="AI returned invalid JSON in custom question generation"
+            )
+
+    chunks = await chunk_text(rfp_text)
+    if len(chunks) == 1:
+        return await _grouped(rfp_text)
+    return merge_question_groups(await map_chunks(chunks, _grouped))
+
 async def summarize_results_with_llm(
     all_snippets: list,
     rfp_company_text: str,
@@ -183,7 +524,9 @@ async def summarize_results_with_llm(
         "to win — never generic advice. "
         "Your output is comprehensive, accurate, and properly formatted for any RFP document."
     )
-    content = await _complete_with_fallback(provider, prompt, system_prompt, fallback_providers)
+    content = await _complete_with_fallback(
+        provider, prompt, system_prompt, fallback_providers, caller="summarize_results_with_llm"
+    )
     return content
 
 async def extract_questions_with_llm(
@@ -194,7 +537,9 @@ async def extract_questions_with_llm(
     
     prompt = question_prompt(classification_QaI_results)
     system_prompt = "Return ONLY strict valid JSON. No markdown. No commentary."
-    content = await _complete_with_fallback(provider, prompt, system_prompt, fallback_providers)
+    content = await _complete_with_fallback(
+        provider, prompt, system_prompt, fallback_providers, caller="extract_questions_with_llm"
+    )
     # print("Raw LLM output for question extraction:", content)
 
     content = content.strip()
@@ -229,41 +574,6 @@ def verify_password(plain_password, hashed_password):
 def hash_password(password):
     return pwd_context.hash(password)
 
-async def get_similar_context(question: str, rfp_id: int, top_k: int = 5):
-    """
-    Retrieve RFP-specific chunks from Pinecone using file_id metadata filter.
-    """
-    try:
-        # embedding = client.embeddings.create(
-        #     input=[question],
-        #     model="text-embedding-3-small"
-        # ).data[0].embedding
-        embedding = await OpenAIEmbeddingClient().embed(question)
-        
-        results = index.query(
-            vector=embedding,
-            top_k=top_k,
-            include_metadata=True,
-            filter={"file_id": str(rfp_id)}
-        )
-
-        context_texts = [match["metadata"]["text"] for match in results["matches"]]
-        sources = [
-            {
-                "score": match["score"],
-                "file_id": match["metadata"].get("file_id"),
-                "chunk_index": match["metadata"].get("chunk_index"),
-                "snippet": match["metadata"].get("text")[:300],
-            }
-            for match in results["matches"]
-        ]
-
-        return "\n".join(context_texts), sources
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Pinecone retrieval failed: {str(e)}")
-
-
 def _sanitize_short_name(short_name: str) -> str:
     """
     Validate that short_name is a human-readable client name.
@@ -299,29 +609,14 @@ def _sanitize_short_name(short_name: str) -> str:
     return name
 
 
-async def generate_answer_with_context(
+def _answer_prompts(
     question: str,
     context: str,
     short_name: str,
     existing_answer: str = None,
     edit_instruction: str = None,
-    provider: str = "gpt-4o-mini",
-    # fallback_providers: list[str] = None
-) -> str:
-    """
-    Generate a new proposal response OR apply a targeted edit to an existing one.
-
-    Parameters
-    ----------
-    question          : The RFP question being answered.
-    context           : RAG-retrieved context (RFP chunks + Keystone company data).
-    short_name        : Human-readable client name, e.g. "Duluth" or "McLean".
-                        Sanitized internally — UUID/hash values are rejected.
-    existing_answer   : Previously generated answer. Required for edit mode.
-    edit_instruction  : The specific change the user wants applied. Required for edit mode.
-                        Both existing_answer AND edit_instruction must be provided
-                        to activate edit mode. If either is missing, generate mode runs.
-    """
+) -> tuple[str, str]:
+    """(system prompt, user prompt) for generate_answer_with_context and its streaming twin."""
 
     # Sanitize client name before it ever touches the prompt
     short_name = _sanitize_short_name(short_name)
@@ -447,13 +742,66 @@ async def generate_answer_with_context(
         "Output the final answer only — no preamble, reasoning steps, or meta-commentary. "
         "Do not reference 'context', 'question', 'prompt', or 'instructions' in any response."
     )
+    return SYSTEM_PROMPT, prompt
+
+
+async def generate_answer_with_context(
+    question: str,
+    context: str,
+    short_name: str,
+    existing_answer: str = None,
+    edit_instruction: str = None,
+    provider: str = "gpt-4o-mini",
+    # fallback_providers: list[str] = None
+    use_cache: bool = True,
+) -> str:
+    """
+    Generate a new proposal response OR apply a targeted edit to an existing one.
+
+    Parameters
+    ----------
+    question          : The RFP question being answered.
+    context           : RAG-retrieved context (RFP chunks + Keystone company data).
+    short_name        : Human-readable client name, e.g. "Duluth" or "McLean".
+                        Sanitized internally — UUID/hash values are rejected.
+    existing_answer   : Previously generated answer. Required for edit mode.
+    edit_instruction  : The specific change the user wants applied. Required for edit mode.
+                        Both existing_answer AND edit_instruction must be provided
+                        to activate edit mode. If either is missing, generate mode runs.
+    use_cache         : Set False to force a fresh completion even when an identical
+                        request is in the LLM response cache; the fresh one
+                        replaces the cached entry.
+    """
+    SYSTEM_PROMPT, prompt = _answer_prompts(question, context, short_name, existing_answer, edit_instruction)
     try:
-        content = await _complete_with_fallback(provider, prompt, SYSTEM_PROMPT)
+        content = await _complete_with_fallback(
+            provider, prompt, SYSTEM_PROMPT, caller="generate_answer_with_context", use_cache=use_cache
+        )
         return content
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"LLM generation failed: {str(e)}")
 
+
+async def stream_answer_with_context(
+    question: str,
+    context: str,
+    short_name: str,
+    existing_answer: str = None,
+    edit_instruction: str = None,
+    provider: str = "gpt-4o-mini",
+    use_cache: bool = True,
+    priority: Optional[int] = None,
+    attribution: Optional[dict] = None,
+) -> AsyncIterator[str]:
+    """Same as generate_answer_with_context, yielding the answer as text deltas."""
+    SYSTEM_PROMPT, prompt = _answer_prompts(question, context, short_name, existing_answer, edit_instruction)
+    async for delta in _stream_with_fallback(
+        provider, prompt, SYSTEM_PROMPT, caller="generate_answer_with_context",
+        use_cache=use_cache, priority=priority, attribution=attribution,
+    ):
+        yield delta
+
 async def analyze_answer_score_only(
     question_text: str,
     answer_text: str,
@@ -463,7 +811,9 @@ async def analyze_answer_score_only(
     prompt = generate_score_prompt(question_text, answer_text)
 
     system_prompt = "You are a strict RFP evaluator who gives a numeric score based on how well the answer addresses the question. Return ONLY the numeric score as a float from 0.0 to 10.0, with no explanation or text."
-    content = await _complete_with_fallback(provider, prompt, system_prompt)
+    content = await _complete_with_fallback(
+        provider, prompt, system_prompt, caller="analyze_answer_score_only"
+    )
     score_text = content.strip()
     # print(type(score_text), score_text)
     try:
@@ -513,41 +863,33 @@ def parse_rfp_summary(summary_text: str):
         }
     }
 
-def extract_text_from_file(file_path: str) -> str:
-    ext = os.path.splitext(file_path)[1].lower()
-    text = ""
-
-    if ext == ".pdf":
-        reader = PdfReader(file_path)
-        text = " ".join([page.extract_text() for page in reader.pages if page.extract_text()])
-    elif ext == ".docx":
-        doc = docx.Document(file_path)
-        text = " ".join([p.text for p in doc.paragraphs])
-    elif ext == ".pptx":
-        prs = Presentation(file_path)
-        for slide in prs.slides:
-            for shape in slide.shapes:
-                if hasattr(shape, "text"):
-                    text += shape.text + " "
-    elif ext in [".xls", ".xlsx"]:
-            xls = pd.ExcelFile(file_path)
-            for sheet in xls.sheet_names:
-                df = xls.parse(sheet)
-                text += "\n".join(
-                    df.fillna("").astype(str).agg(" ".join, axis=1)
-                ) + "\n" 
-    return text.strip()
-
-
-
 async def generate_summary(
     text: str,
     provider: str = "gpt-4o-mini",
 ) -> str:
-    """Generate summary of an RFP using LLM."""
-    prompt = f"Summarize the following RFP in 3-5 paragraphs:\n\n{text[:8000]}"
+    """
+    Generate summary of an RFP using LLM. A long RFP is summarized part by
+    part and the part summaries combined.
+    """
     system_prompt = "You are an RFP summarizer."
-    content = await _complete_with_fallback(provider, prompt, system_prompt)
+
+    async def _summarize(prompt: str, caller: str = "generate_summary") -> str:
+        return await _complete_with_fallback(provider, prompt, system_prompt, caller=caller)
+
+    chunks = await chunk_text(text)
+    if len(chunks) == 1:
+        content = await _summarize(f"Summarize the following RFP in 3-5 paragraphs:\n\n{text}")
+        return content.strip()
+
+    total = len(chunks)
+    partials = await asyncio.gather(*(
+        _summarize(summary_chunk_prompt(chunk, part, total))
+        for part, chunk in enumerate(chunks, start=1)
+    ))
+    content = await reduce_texts(
+        list(partials),
+        lambda parts: _summarize(summary_reduce_prompt(parts), "generate_summary_reduce"),
+    )
     return content.strip()
 
 
@@ -633,16 +975,7 @@ def clean_extracted_text(text: str) -> str:
     return text.strip()
 
 async def get_active_keystone_text(db: AsyncSession, admin_id: int) -> str:
-    keystone_result = await db.execute(
-        select(KeystoneFile).filter(KeystoneFile.admin_id == admin_id).order_by(KeystoneFile.uploaded_at.desc())
-    )
-    keystone = keystone_result.scalars().first()
-    if not keystone:
-        raise HTTPException(
-            status_code=400,
-            detail="Keystone Data not uploaded. Please upload Keystone XLS."
-        )
-
+    keystone = await get_active_keystone(db, admin_id)
     return keystone.extracted_text
 
 def extract_xls_text(file_path: str) -> str:
@@ -660,18 +993,6 @@ def extract_xls_text(file_path: str) -> str:
 
     return "\n".join(output)
 
-def delete_rfp_embeddings(file_id: int):
-    try:
-        namespace = f"rfp_{file_id}"
-
-        # print("Deleting namespace:", namespace)
-        index.delete(delete_all=True, namespace=namespace)
-        print(f"Deleted embeddings for {namespace}")
-
-    except Exception as e:
-        print(f"Error: {e}")
-
-
 def classification_QaI(
     rfp_text: str,
     selected_sections: list,
@@ -690,7 +1011,9 @@ def classification_QaI(
     #     "You ALWAYS identify the first main verb as the key signal for classification. "
     #     "Your output is a single JSON object with detailed classification results and summary statistics, following the exact structure specified in the prompt."
     # )
-    content = _complete_with_fallback(provider, prompt, fallback_providers=fallback_providers)
+    content = _complete_with_fallback(
+        provider, prompt, fallback_providers=fallback_providers, caller="classification_QaI"
+    )
     print("Raw LLM output for classification:", content)
 
     try:
@@ -0,0 +1,167 @@
+"""
+Long-document mode for prompts that embed a whole RFP.
+
+A document that fits in LLM_DOC_CHUNK_TOKENS is sent in one call as before.
+A longer one is split at section boundaries (numbered headings, SECTION /
+ARTICLE / APPENDIX style headings, all-caps titles) into chunks of at most
+that many tokens, the prompt runs on every chunk concurrently, and the
+per-chunk results are merged. Latency then follows the longest chunk rather
+than the whole document, and no call exceeds the model's context.
+"""
+import asyncio
+import re
+from typing import Awaitable, Callable, List, TypeVar
+
+from app.config import LLM_DOC_CHUNK_TOKENS
+from app.core.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+T = TypeVar("T")
+
+_QUESTION_NUMBER = re.compile(r"^\s*\d+(?:\.\d+)*[.)]?\s+")
+
+_NAMED_HEADING = re.compile(
+    r"^\s*(?:section|article|part|chapter|appendix|exhibit|attachment|schedule)\b.{0,100}$",
+    re.IGNORECASE,
+)
+_NUMBERED_HEADING = re.compile(r"^\s*\d{1,2}(?:\.\d{1,2}){0,3}\.?\s+[A-Z].{0,100}$")
+_CAPS_HEADING = re.compile(r"^\s*[A-Z][A-Z0-9 &/,:()'.-]{3,80}$")
+
+
+def _is_heading(line: str) -> bool:
+    return bool(_NAMED_HEADING.match(line) or _CAPS_HEADING.match(line))
+
+
+def _split_before(text: str, is_boundary: Callable[[str], bool]) -> List[str]:
+    pieces, current = [], []
+    for line in text.splitlines(keepends=True):
+        if current and is_boundary(line):
+            pieces.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        pieces.append("".join(current))
+    return pieces
+
+
+def split_sections(text: str) -> List[str]:
+    """Split text before every top-level heading or page break; nothing is dropped."""
+    return _split_before(text, lambda line: "\f" in line or _is_heading(line))
+
+
+def _split_oversized(section: str, max_tokens: int) -> List[str]:
+    """
+    Split a section that alone exceeds the budget at numbered sub-headings,
+    then paragraphs, then lines, then characters.
+    """
+    pieces = _split_before(section, lambda line: bool(_NUMBERED_HEADING.match(line)))
+    if len(pieces) > 1:
+        return [part for piece in pieces for part in _fit(piece, max_tokens)]
+    for separator in ("\n\n", "\n"):
+        pieces = section.split(separator)
+        pieces = [piece + separator for piece in pieces[:-1]] + [pieces[-1]]
+        pieces = [piece for piece in pieces if piece]
+        if len(pieces) > 1:
+            return [part for piece in pieces for part in _fit(piece, max_tokens)]
+    size = max(max_tokens * CHARS_PER_TOKEN, 1)
+    return [section[start:start + size] for start in range(0, len(section), size)]
+
+
+def _fit(piece: str, max_tokens: int) -> List[str]:
+    if estimate_tokens(piece) <= max_tokens:
+        return [piece]
+    return _split_oversized(piece, max_tokens)
+
+
+def chunk_document(text: str, max_tokens: int = LLM_DOC_CHUNK_TOKENS) -> List[str]:
+    """
+    Chunks of at most `max_tokens` tokens, packed from whole sections in
+    document order. A text within the budget comes back as a single chunk.
+    """
+    if not text or estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    chunks, current, current_tokens = [], [], 0
+    for section in split_sections(text):
+        for piece in _fit(section, max_tokens):
+            tokens = estimate_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append("".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        chunks.append("".join(current))
+    return [chunk for chunk in chunks if chunk.strip()] or [text]
+
+
+async def map_chunks(chunks: List[str], fn: Callable[[str], Awaitable[T]]) -> List[T]:
+    """Run `fn` on every chunk concurrently; results are in chunk order."""
+    return list(await asyncio.gather(*(fn(chunk) for chunk in chunks)))
+
+
+async def reduce_texts(
+    parts: List[str],
+    reduce_fn: Callable[[List[str]], Awaitable[str]],
+    max_tokens: int = LLM_DOC_CHUNK_TOKENS,
+) -> str:
+    """
+    Merge partial results with `reduce_fn`. Parts that together exceed the
+    budget are merged in groups first, concurrently, and the groups' results
+    merged again until a single result remains.
+    """
+    while True:
+        groups, current, current_tokens = [], [], 0
+        for part in parts:
+            tokens = estimate_tokens(part)
+            if current and current_tokens + tokens > max_tokens:
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+
+        if len(groups) == 1:
+            return await reduce_fn(groups[0])
+        if len(groups) == len(parts):
+            # Every part fills a budget on its own; merge them pairwise
+            groups = [parts[index:index + 2] for index in range(0, len(parts), 2)]
+        parts = await map_chunks(groups, reduce_fn)
+
+
+def merge_question_groups(results: List[dict]) -> dict:
+    """
+    Merge per-chunk questions_grouped results: sections with the same name are
+    combined, repeated questions dropped, and sections and questions
+    renumbered in document order.
+    """
+    sections = {}
+    for result in results:
+        for key, group in result.items():
+            if not isinstance(group, dict):
+                continue
+            name = str(group.get("section") or f"Section {key}").strip()
+            entry = sections.setdefault(name.lower(), {"section": name, "questions": {}})
+            for question in group.get("questions") or []:
+                text = _QUESTION_NUMBER.sub("", str(question)).strip()
+                if text:
+                    entry["questions"].setdefault(text.lower(), text)
+
+    merged = {}
+    for entry in sections.values():
+        if not entry["questions"]:
+            continue
+        number = len(merged) + 1
+        merged[str(number)] = {
+            "section": entry["section"],
+            "questions": [
+                f"{number}.{index} {question}"
+                for index, question in enumerate(entry["questions"].values(), start=1)
+            ],
+        }
+    return merged
+
+
+async def chunk_text(text: str) -> List[str]:
+    """chunk_document off the event loop; token counting a large RFP takes a while."""
+    return await asyncio.to_thread(chunk_document, text)
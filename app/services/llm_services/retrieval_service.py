@@ -0,0 +1,454 @@
+"""
+Vector store conventions for every document the app indexes.
+
+RFPs, library documents and client background documents are all
+RFPDocument rows, and each row gets a namespace of its own, `rfp_{id}`.
+Keystone workbooks are indexed one row per vector under `keystone_{id}`.
+Retrieval queries these namespaces directly instead of filtering the whole
+index by metadata. Vector ids are deterministic, and re-indexing a document
+clears its namespace first, so vectors stored under the random ids of
+older ingestions are not left behind as duplicates.
+"""
+from typing import AsyncIterable, AsyncIterator, Callable, List, Optional
+
+from fastapi import HTTPException
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from sqlalchemy import select
+
+from app.config import KEYSTONE_TOP_K, KEYSTONE_CONTEXT_TOKENS
+from app.core.llm_client.openai import OpenAIEmbeddingClient
+from app.core.vector_store import vector_store
+from app.db.database import AsyncSessionLocal
+from app.models.rfp_models import RFPDocument
+from app.services.job_services.job_queue import (
+    JobContext,
+    STAGE_COMPLETED,
+    STAGE_RUNNING,
+    register_job_handler,
+)
+from app.services.llm_services.embedding_service import BatchEmbedder
+from app.services.llm_services.keystone_cache import KeystoneSnapshot, render_keystone_rows
+
+# Documents created by the RFP processing pipeline carry this category
+RFP_CATEGORY = "history"
+
+RFP_CHUNK_SIZE = 1000
+RFP_CHUNK_OVERLAP = 100
+DOCUMENT_CHUNK_SIZE = 500
+DOCUMENT_CHUNK_OVERLAP = 50
+# Streamed pages are split in windows of about this many chunks
+SPLIT_WINDOW_CHUNKS = 32
+
+VECTOR_BACKFILL_JOB = "vector_backfill"
+
+
+def document_namespace(document_id: int) -> str:
+    return f"rfp_{document_id}"
+
+
+def keystone_namespace(keystone_id: int) -> str:
+    return f"keystone_{keystone_id}"
+
+
+def split_rfp_text(text: str) -> List[str]:
+    splitter = RecursiveCharacterTextSplitter(chunk_size=RFP_CHUNK_SIZE, chunk_overlap=RFP_CHUNK_OVERLAP)
+    return splitter.split_text(text)
+
+
+def split_document_text(text: str) -> List[str]:
+    splitter = RecursiveCharacterTextSplitter(chunk_size=DOCUMENT_CHUNK_SIZE, chunk_overlap=DOCUMENT_CHUNK_OVERLAP)
+    return splitter.split_text(text)
+
+
+async def split_pages(
+    pages: AsyncIterable[dict],
+    chunk_size: int,
+    chunk_overlap: int,
+) -> AsyncIterator[str]:
+    """
+    Chunk a stream of extracted pages without joining the whole text.
+
+    Page texts are buffered until about SPLIT_WINDOW_CHUNKS chunks' worth,
+    the window is split, and every chunk but the last is yielded. The last
+    one may end mid-sentence, so it starts the next window instead.
+    """
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    window_size = chunk_size * SPLIT_WINDOW_CHUNKS
+    buffer = []
+    buffered = 0
+
+    async for page in pages:
+        buffer.append(page["text"])
+        buffered += len(page["text"])
+        if buffered < window_size:
+            continue
+        chunks = splitter.split_text("".join(buffer))
+        for chunk in chunks[:-1]:
+            yield chunk
+        # Pages end with their separator; the split stripped it from the tail
+        tail = chunks[-1] + "\n" if chunks else ""
+        buffer = [tail]
+        buffered = len(tail)
+
+    for chunk in splitter.split_text("".join(buffer)):
+        yield chunk
+
+
+def rfp_chunk_record(rfp_id: int, chunk_index: int, text: str, vector: List[float]) -> dict:
+    return {
+        "id": f"rfp_{rfp_id}_{chunk_index}",
+        "values": vector,
+        "metadata": {
+            "file_id": f"rfp_{rfp_id}",
+            "chunk_index": chunk_index,
+            "text": text,
+        },
+    }
+
+
+def _document_metadata(doc: RFPDocument) -> dict:
+    return {
+        "document_id": str(doc.id),
+        "filename": doc.filename,
+        "category": doc.category,
+        "project_name": doc.project_name,
+    }
+
+
+def document_chunk_record(
+    doc: RFPDocument,
+    chunk_index: int,
+    text: str,
+    vector: List[float],
+    extra_metadata: dict = None,
+) -> dict:
+    return {
+        "id": f"{doc.id}_{chunk_index}",
+        "values": vector,
+        "metadata": {
+            **_document_metadata(doc),
+            "type": "chunk",
+            "chunk_id": chunk_index,
+            "text": text,
+            **(extra_metadata or {}),
+        },
+    }
+
+
+def document_summary_record(
+    doc: RFPDocument,
+    summary: str,
+    vector: List[float],
+    id_prefix: str = "summary",
+    extra_metadata: dict = None,
+) -> dict:
+    return {
+        "id": f"{id_prefix}_{doc.id}",
+        "values": vector,
+        "metadata": {
+            **_document_metadata(doc),
+            "type": "summary",
+            "text": summary,
+            **(extra_metadata or {}),
+        },
+    }
+
+
+def keystone_row_record(keystone: KeystoneSnapshot, row: dict, vector: List[float]) -> dict:
+    return {
+        "id": f"keystone_{keystone.id}_{row['row_index']}",
+        "values": vector,
+        "metadata": {
+            "keystone_id": str(keystone.id),
+            "admin_id": str(keystone.admin_id),
+            "sheet": row["sheet"],
+            "row_index": row["row_index"],
+            "text": row["text"],
+        },
+    }
+
+
+async def embed_and_upsert(
+    namespace: str,
+    chunks: List[str],
+    make_record: Callable[[int, str, List[float]], dict],
+    embedding_client: OpenAIEmbeddingClient = None,
+    on_failure: Optional[Callable[[List[int], Exception], None]] = None,
+) -> int:
+    """
+    Embed `chunks` in token-budgeted batches and upsert each batch into
+    `namespace` as soon as its vectors arrive. Returns the number upserted.
+
+    With `on_failure`, chunks that fail to embed or upsert are reported and
+    skipped; without it the first failure raises.
+    """
+    embedder = BatchEmbedder(client=embedding_client)
+    upserted = 0
+
+    async for indices, vectors in embedder.embed_batches(chunks, on_failure=on_failure):
+        records = [make_record(i, chunks[i], vector) for i, vector in zip(indices, vectors)]
+        try:
+            upserted += await vector_store.upsert(records, namespace=namespace)
+        except Exception as e:
+            if on_failure is None:
+                raise
+            on_failure(list(indices), e)
+
+    return upserted
+
+
+async def get_similar_context(question: str, rfp_id: int, top_k: int = 5):
+    """
+    Retrieve the RFP chunks closest to `question` from the RFP's own namespace.
+    """
+    try:
+        embedding = await OpenAIEmbeddingClient().embed(question)
+        matches = await vector_store.query(
+            vector=embedding,
+            top_k=top_k,
+            namespace=document_namespace(rfp_id),
+        )
+
+        context_texts = [match["metadata"]["text"] for match in matches]
+        sources = [
+            {
+                "score": match["score"],
+                "file_id": match["metadata"].get("file_id"),
+                "chunk_index": match["metadata"].get("chunk_index"),
+                "snippet": match["metadata"].get("text", "")[:300],
+            }
+            for match in matches
+        ]
+
+        return "\n".join(context_texts), sources
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Vector retrieval failed: {str(e)}")
+
+
+async def delete_rfp_embeddings(file_id: int):
+    namespace = document_namespace(file_id)
+    try:
+        await vector_store.delete(namespace=namespace, delete_all=True)
+        print(f"Deleted embeddings for {namespace}")
+
+    except Exception as e:
+        print(f"Error: {e}")
+
+
+async def index_keystone(keystone: KeystoneSnapshot) -> int:
+    """
+    Embed every Keystone row into the Keystone's namespace and keep the
+    vectors on the snapshot, so this process can rank rows in memory.
+    """
+    rows = keystone.rows
+    vectors = [None] * len(rows)
+
+    def make_record(i, text, vector):
+        vectors[i] = vector
+        return keystone_row_record(keystone, rows[i], vector)
+
+    upserted = await embed_and_upsert(
+        keystone_namespace(keystone.id),
+        [row["text"] for row in rows],
+        make_record,
+    )
+    if rows:
+        keystone.set_row_vectors(vectors)
+    return upserted
+
+
+async def load_keystone_vectors(keystone: KeystoneSnapshot):
+    """
+    Give the snapshot its row vectors, fetched from the vector store, or
+    re-indexed when the stored rows do not match this version. Keystones
+    small enough to be sent whole need none.
+    """
+    if keystone.has_row_vectors or keystone.token_count <= KEYSTONE_CONTEXT_TOKENS:
+        return
+
+    rows = keystone.rows
+    records = await vector_store.fetch_all(keystone_namespace(keystone.id))
+    vectors = [None] * len(rows)
+    for record in records:
+        row_index = record["metadata"].get("row_index")
+        if isinstance(row_index, float):
+            row_index = int(row_index)
+        if row_index is not None and 0 <= row_index < len(rows):
+            vectors[row_index] = record["values"]
+
+    if rows and all(vector is not None for vector in vectors):
+        keystone.set_row_vectors(vectors)
+    else:
+        await index_keystone(keystone)
+
+
+async def delete_keystone_embeddings(keystone_id: int):
+    namespace = keystone_namespace(keystone_id)
+    try:
+        await vector_store.delete(namespace=namespace, delete_all=True)
+    except Exception as e:
+        print(f"Error: {e}")
+
+
+async def get_keystone_context(
+    query: str,
+    keystone: KeystoneSnapshot,
+    top_k: int = KEYSTONE_TOP_K,
+    token_budget: int = KEYSTONE_CONTEXT_TOKENS,
+    embedding: List[float] = None,
+) -> str:
+    """
+    Keystone text for a prompt, bounded by `token_budget`.
+
+    A workbook that fits the budget is returned whole. Otherwise the `top_k`
+    rows closest to `query` are taken best first until the budget is spent,
+    then laid out in workbook order under their sheet headers. Rows are
+    ranked in memory against the snapshot's row vectors; the first use of a
+    snapshot loads them through `load_keystone_vectors`, like every other
+    Keystone lookup, and a Keystone uploaded before row indexing existed is
+    indexed then. Pass `embedding` when the query is already embedded.
+    """
+    if keystone.token_count <= token_budget:
+        return keystone.extracted_text
+
+    if embedding is None:
+        embedding = await OpenAIEmbeddingClient().embed(query)
+    await load_keystone_vectors(keystone)
+    if not keystone.has_row_vectors:
+        # A budget below KEYSTONE_CONTEXT_TOKENS, which load_keystone_vectors skips
+        await index_keystone(keystone)
+    candidates = keystone.nearest_rows(embedding, top_k)
+
+    selected = []
+    used = 0
+    for row in candidates:
+        # +2 for the line break; the few sheet headers are not counted
+        cost = row["tokens"] + 2
+        if used + cost > token_budget:
+            continue
+        selected.append(row)
+        used += cost
+
+    return render_keystone_rows(selected)
+
+
+async def _document_chunks(doc: RFPDocument) -> List[str]:
+    rfp = doc.category == RFP_CATEGORY
+    if doc.extracted_text:
+        return split_rfp_text(doc.extracted_text) if rfp else split_document_text(doc.extracted_text)
+    if not doc.file_path:
+        return []
+
+    # Library uploads never stored their text; re-read the original file
+    from app.services.file_services.extraction import stream_document_pages
+    try:
+        pages = stream_document_pages(doc.file_path)
+        if rfp:
+            chunks = split_pages(pages, RFP_CHUNK_SIZE, RFP_CHUNK_OVERLAP)
+        else:
+            chunks = split_pages(pages, DOCUMENT_CHUNK_SIZE, DOCUMENT_CHUNK_OVERLAP)
+        return [chunk async for chunk in chunks]
+    except Exception as e:
+        print(f"[VECTOR CHECK] Could not re-extract document {doc.id}: {e}")
+        return []
+
+
+async def check_document_vectors(doc: RFPDocument) -> dict:
+    """Compare the chunks a document should have with what its namespace holds."""
+    namespace = document_namespace(doc.id)
+    chunks = await _document_chunks(doc)
+    stored = await vector_store.vector_count(namespace)
+
+    # Library and background namespaces also hold a summary vector, so
+    # stored may exceed the chunk count
+    expected = len(chunks)
+    if stored >= expected:
+        status = "ok"
+    elif stored == 0:
+        status = "missing"
+    else:
+        status = "partial"
+
+    return {
+        "document_id": doc.id,
+        "kind": "rfp" if doc.category == RFP_CATEGORY else "document",
+        "namespace": namespace,
+        "expected_chunks": expected,
+        "stored_vectors": stored,
+        "status": status,
+    }
+
+
+async def reindex_document(doc: RFPDocument) -> int:
+    """
+    Rebuild `doc`'s namespace from its chunks; safe to repeat.
+
+    The namespace is cleared first: documents indexed before ids became
+    deterministic hold uuid4 ids, which re-embedding would not overwrite
+    but duplicate. Summary vectors cannot be rebuilt from the text, so
+    they are carried over as stored.
+    """
+    chunks = await _document_chunks(doc)
+    if not chunks:
+        return 0
+
+    namespace = document_namespace(doc.id)
+    summaries = [
+        record for record in await vector_store.fetch_all(namespace)
+        if record["metadata"].get("type") == "summary"
+    ]
+    await vector_store.delete(namespace=namespace, delete_all=True)
+    if summaries:
+        await vector_store.upsert(vectors=summaries, namespace=namespace)
+
+    if doc.category == RFP_CATEGORY:
+        make_record = lambda i, text, vector: rfp_chunk_record(doc.id, i, text, vector)
+    else:
+        make_record = lambda i, text, vector: document_chunk_record(doc, i, text, vector)
+    return await embed_and_upsert(namespace, chunks, make_record)
+
+
+async def check_vector_consistency(db, document_ids: List[int] = None) -> List[dict]:
+    query = select(RFPDocument).filter(RFPDocument.is_deleted == False)
+    if document_ids:
+        query = query.filter(RFPDocument.id.in_(document_ids))
+    documents = (await db.execute(query.order_by(RFPDocument.id))).scalars().all()
+    return [await check_document_vectors(doc) for doc in documents]
+
+
+@register_job_handler(VECTOR_BACKFILL_JOB)
+async def run_vector_backfill_job(ctx: JobContext) -> dict:
+    """
+    Check every live document's namespace and re-index the ones that are
+    missing vectors. Progress is saved per document, so a resumed job
+    continues where it stopped.
+    """
+    dry_run = ctx.payload.get("dry_run", False)
+    done = set(ctx.state.get("done", []))
+    reindexed = dict(ctx.state.get("reindexed", {}))
+
+    await ctx.stage("check", STAGE_RUNNING)
+    async with AsyncSessionLocal() as db:
+        report = await check_vector_consistency(db, ctx.payload.get("document_ids"))
+    await ctx.stage("check", STAGE_COMPLETED)
+
+    await ctx.stage("backfill", STAGE_RUNNING)
+    if not dry_run:
+        async with AsyncSessionLocal() as db:
+            for entry in report:
+                if entry["status"] == "ok" or entry["document_id"] in done:
+                    continue
+                doc = await db.get(RFPDocument, entry["document_id"])
+                reindexed[str(doc.id)] = await reindex_document(doc)
+                done.add(doc.id)
+                ctx.state.update({"done": sorted(done), "reindexed": reindexed})
+                await ctx.save_state()
+    await ctx.stage("backfill", STAGE_COMPLETED)
+
+    return {
+        "dry_run": dry_run,
+        "checked": len(report),
+        "inconsistent": [entry for entry in report if entry["status"] != "ok"],
+        "reindexed": reindexed,
+    }
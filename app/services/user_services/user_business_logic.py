@@ -1,7 +1,6 @@
 from sqlalchemy.orm import Session
-from app.models.rfp_models import KeystoneFile, RFPDocument
+from app.models.rfp_models import RFPDocument
 from app.services.llm_services.llm_service import (
-    get_similar_context, 
     generate_answer_with_context,
     analyze_answer_score_only,
 )
@@ -11,8 +10,18 @@ from typing import List, Dict, Any
 
 from .user_repository import UserRepository
 from .user_validator import UserValidator
-from fastapi import HTTPException
-from sqlalchemy import select
+
+def format_enhanced_context(keystone_text: str, rfp_context: str) -> str:
+    return f"""
+    KEYSTONE DATA (PRIMARY SOURCE – MUST FOLLOW):
+    {keystone_text}
+
+    ----------------------------------------
+
+    RFP CONTEXT (REFERENCE):
+    {rfp_context}
+    """
+
 
 class UserBusinessLogic:
     """Business logic for user operations"""
@@ -47,76 +56,14 @@ class UserBusinessLogic:
             "answer": latest_answer.answer if latest_answer else None
         }
     
-    async def generate_enhanced_context(
-        self,
-        question_text: str,
-        rfp_id: int,
-        admin_id: int
-    ) -> tuple:
-        """
-        Generate enhanced context using:
-        1. Keystone XLS (PRIMARY source)
-        2. RFP semantic context (SECONDARY source)
-        """
-        rfp_context, sources = await get_similar_context(
-            question_text,
-            rfp_id
-        )
-
-        result = await self.db.execute(
-            select(KeystoneFile)
-            .where(KeystoneFile.admin_id == admin_id)
-            .order_by(KeystoneFile.uploaded_at.desc())
-        )
-
-        keystone = result.scalars().first()
-
-        if not keystone:
-            raise HTTPException(
-                status_code=400,
-                detail="Keystone Data not uploaded. Please upload Keystone XLS."
-            )
-
-        # background_doc = (
-        #     self.db.query(RFPDocument)
-        #     .filter(
-        #         RFPDocument.admin_id == admin_id,
-        #         RFPDocument.category == "Client and Industry Background",
-        #         RFPDocument.is_deleted == False
-        #     )
-        #     .order_by(RFPDocument.uploaded_at.desc())
-        #     .first()
-        # )
-
-        # background_text = (
-        #     background_doc.extracted_text
-        #     if background_doc and background_doc.extracted_text
-        #     else "Client and Industry Background document not found."
-        # )
-
-        enhanced_context = f"""
-    KEYSTONE DATA (PRIMARY SOURCE – MUST FOLLOW):
-    {keystone.extracted_text}
-
-    ----------------------------------------
-
-    RFP CONTEXT (REFERENCE):
-    {rfp_context}
-    """
-
-        sources = ["keystone", "rfp"]
-        # if background_doc and background_doc.extracted_text:
-        #     sources.append("client_industry_background")
-
-        return enhanced_context, sources
-
-    async def generate_answer_for_question(self, question_text: str, enhanced_context: str, short_name: str, provider: str) -> str:
+    async def generate_answer_for_question(self, question_text: str, enhanced_context: str, short_name: str, provider: str, use_cache: bool = True) -> str:
         """Generate and clean answer"""
         answer = await generate_answer_with_context(
             question_text,
             enhanced_context,
             short_name,
             provider=provider,
+            use_cache=use_cache,
         )
         return clean_answer(answer)
     
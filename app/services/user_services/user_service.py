@@ -2,12 +2,17 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models.rfp_models import User
 from fastapi import HTTPException
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any, Tuple
 from datetime import datetime
 from app.services.user_services.user_repository import UserRepository
 from app.services.user_services.user_validator import UserValidator
 from app.services.user_services.user_business_logic import UserBusinessLogic
-from app.services.llm_services.llm_service import get_short_name,get_active_keystone_text
+from app.services.llm_services.answer_session import get_answer_session
+from app.core.llm_client.scheduler import PRIORITY_INTERACTIVE, llm_priority
+from app.core.llm_client.telemetry import llm_attribution
+from app.services.llm_services.llm_service import stream_answer_with_context
+from app.api.routes.utils import clean_answer
+from app.db.database import AsyncSessionLocal
 from app.models.rfp_models import ReviewerAnswerVersion
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -51,25 +56,23 @@ class UserService:
             rfp_id = question.rfp_id
             question_text = question.question_text
             
-            rfp_document = await self.repository.get_rfp_document(self.db, rfp_id)
-            self.validator.validate_rfp_document_exists(rfp_document)
-            
-            short_name = get_short_name(rfp_document.filename)
-            keystone_text = await get_active_keystone_text(self.db, question.admin_id)
-            enhanced_context, sources = await  self.business_logic.generate_enhanced_context(
-                question_text=question_text,
-                rfp_id=rfp_id,
-                admin_id=question.admin_id
-            )
-            # print(enhanced_context)
+            # Keystone, RFP chunks and short name come from the cached
+            # per-RFP session; only the question itself is embedded here
+            session = await get_answer_session(self.db, rfp_id, question.admin_id)
+            short_name = session.short_name
+            enhanced_context, sources = await session.build_context(question_text)
 
-            
-            answer = await self.business_logic.generate_answer_for_question(
-                question_text, 
-                enhanced_context, 
-                short_name,
-                provider
-            )
+            # A reviewer is waiting on this one; it goes ahead of bulk jobs
+            with llm_priority(PRIORITY_INTERACTIVE), llm_attribution(rfp_id=rfp_id, user_id=current_user.id):
+                # Asking again for an answered question is a regenerate,
+                # which must not return the cached answer it replaces
+                answer = await self.business_logic.generate_answer_for_question(
+                    question_text, 
+                    enhanced_context, 
+                    short_name,
+                    provider,
+                    use_cache=not (reviewer.ans or "").strip(),
+                )
             
             version = await self.business_logic.create_and_save_answer_version(
                 current_user.id, 
@@ -92,6 +95,71 @@ class UserService:
             await self.db.rollback()
             raise HTTPException(status_code=500, detail=str(e))
     
+    async def stream_answer(self, current_user: User, question_id: int, provider: str = "gpt-4o-mini") -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streaming variant of generate_answer.
+
+        The assignment is validated and the context built before this
+        returns, so those failures still surface as HTTP errors. The returned
+        generator yields ("token", {"text"}) per delta, then persists the
+        cleaned answer as a new version and yields ("done", payload) with the
+        same fields generate_answer returns, or ("error", {"message"}).
+        """
+        assignment = await self.repository.get_question_assignment(
+            self.db,
+            current_user.id,
+            question_id
+        )
+        self.validator.validate_assignment_exists(assignment)
+
+        question, reviewer = assignment
+        user_id = current_user.id
+        regenerating = bool((reviewer.ans or "").strip())
+        rfp_id = question.rfp_id
+        question_text = question.question_text
+
+        session = await get_answer_session(self.db, rfp_id, question.admin_id)
+        enhanced_context, sources = await session.build_context(question_text)
+
+        async def events():
+            parts = []
+            try:
+                async for delta in stream_answer_with_context(
+                    question_text,
+                    enhanced_context,
+                    session.short_name,
+                    provider=provider,
+                    use_cache=not regenerating,
+                    priority=PRIORITY_INTERACTIVE,
+                    attribution={"rfp_id": rfp_id, "user_id": user_id},
+                ):
+                    parts.append(delta)
+                    yield "token", {"text": delta}
+
+                answer = clean_answer("".join(parts))
+
+                # The request's session may already be closed while streaming
+                async with AsyncSessionLocal() as db:
+                    version = await self.repository.create_answer_version(db, user_id, question_id, answer)
+                    reviewer = await self.repository.get_reviewer(db, user_id, question_id)
+                    self.business_logic.update_reviewer_answer(reviewer, answer)
+                    await db.commit()
+            except Exception as e:
+                detail = getattr(e, "detail", None) or str(e)
+                yield "error", {"message": str(detail)}
+                return
+
+            yield "done", {
+                "question_id": question_id,
+                "question_text": question_text,
+                "rfp_id": rfp_id,
+                "answer_id": version.id,
+                "answer": answer,
+                "sources": sources
+            }
+
+        return events()
+
     async def get_answer_versions(self, current_user: User, question_id: int) -> Dict[str, Any]:
         """Get all answer versions for a question"""
         try:
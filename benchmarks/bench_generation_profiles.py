@@ -0,0 +1,107 @@
+"""
+Latency per llm_service task with the old single output budget (Claude's
+max_tokens=18096 for every call) versus the per-task GenerationProfile.
+
+    python -m benchmarks.bench_generation_profiles --calls 20 --tokens-per-second 400
+
+Runs ClaudeClient against a local mock Messages endpoint, so the request
+really carries each profile's max_tokens. The mock "generates" at a fixed
+rate: each task has a typical output length and, some of the time, a
+runaway one (a score followed by an explanation, an answer that keeps
+going), and a response stops at whichever of that length or max_tokens
+comes first. The numbers show how much a budget caps the tail; they do not
+model provider-side queueing, which a smaller budget also reduces.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from benchmarks.stub_server import StubServer
+from app.core.llm_client.claude import ClaudeClient
+from app.core.llm_client.profiles import DEFAULT_PROFILE, profile_for
+from app.core.llm_client.registry import ClientRegistry
+
+# caller -> (typical output tokens, runaway output tokens, runaway rate)
+TASKS = {
+    "analyze_answer_score_only": (4, 300, 0.3),
+    "generate_search_queries": (250, 900, 0.1),
+    "generate_summary": (600, 2500, 0.1),
+    "generate_answer_with_context": (450, 3000, 0.1),
+}
+
+
+def _messages_route(tokens_per_second: float, seed: int):
+    rng = random.Random(seed)
+
+    def _route(request):
+        body = request["json"] or {}
+        task = body["messages"][0]["content"]
+        typical, runaway, rate = TASKS[task]
+        natural = runaway if rng.random() < rate else typical
+        produced = min(natural, body["max_tokens"])
+        time.sleep(produced / tokens_per_second)
+        return {
+            "id": "msg_bench",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model"),
+            "content": [{"type": "text", "text": "x" * produced}],
+            "stop_reason": "end_turn" if produced == natural else "max_tokens",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 10, "output_tokens": produced},
+        }
+
+    return _route
+
+
+async def run(base_url: str, calls: int, use_profiles: bool) -> dict:
+    registry = ClientRegistry(claude_api_key="stub", anthropic_base_url=base_url)
+    llm = ClaudeClient(model="claude-sonnet-4-6", registry=registry)
+    timings = {}
+    try:
+        for task in TASKS:
+            profile = profile_for(task) if use_profiles else DEFAULT_PROFILE
+            timings[task] = []
+            for _ in range(calls):
+                start = time.perf_counter()
+                await llm.complete(task, profile=profile)
+                timings[task].append(time.perf_counter() - start)
+    finally:
+        await registry.aclose()
+    return timings
+
+
+def _summary(timings: list[float]) -> str:
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[max(int(len(ms) * 0.95) - 1, 0)]
+    return f"mean={statistics.mean(ms):8.1f}ms  p95={p95:8.1f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--tokens-per-second", type=float, default=400)
+    parser.add_argument("--latency", type=float, default=0.02, help="time to first token, seconds")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    results = {}
+    for label, use_profiles in (("before", False), ("after", True)):
+        # Same seed for both runs, so both see the same runaway draws
+        routes = {"/v1/messages": _messages_route(args.tokens_per_second, args.seed)}
+        with StubServer(routes, latency=args.latency) as server:
+            results[label] = asyncio.run(run(server.url, args.calls, use_profiles))
+
+    print(f"calls={args.calls} per task, {args.tokens_per_second:.0f} tokens/s, ttft={args.latency * 1000:.0f}ms")
+    for task in TASKS:
+        budget = profile_for(task).max_tokens
+        before, after = results["before"][task], results["after"][task]
+        print(f"{task:<30} max_tokens 18096 -> {budget:<6}")
+        print(f"    before  {_summary(before)}")
+        print(f"    after   {_summary(after)}   mean drop {(1 - statistics.mean(after) / statistics.mean(before)) * 100:5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
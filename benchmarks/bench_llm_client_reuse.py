@@ -0,0 +1,91 @@
+"""
+Latency of repeated chat completions: a fresh AsyncOpenAI per call (the old
+get_llm_client behaviour) versus the shared, pooled ClientRegistry client.
+
+    python -m benchmarks.bench_llm_client_reuse --calls 50 --latency 0.02
+
+Runs against a local mock OpenAI endpoint; no API key or network is needed.
+Against the real API the gap is larger, since every fresh client also pays
+DNS and a TLS handshake.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from openai import AsyncOpenAI
+
+from benchmarks.stub_server import StubServer
+from app.core.llm_client.openai import OpenAIClient
+from app.core.llm_client.registry import ClientRegistry
+
+
+def _fake_completion(request):
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": (request["json"] or {}).get("model", "gpt-4o-mini"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": "ok"},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6},
+    }
+
+
+async def fresh_client_per_call(base_url: str, calls: int) -> list[float]:
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        client = AsyncOpenAI(api_key="stub", base_url=base_url)
+        await client.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "ping"}]
+        )
+        await client.close()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def shared_registry_client(base_url: str, calls: int) -> list[float]:
+    registry = ClientRegistry(openai_api_key="stub", openai_base_url=base_url)
+    llm = OpenAIClient(model="gpt-4o-mini", registry=registry)
+    timings = []
+    try:
+        for _ in range(calls):
+            start = time.perf_counter()
+            await llm.client.chat.completions.create(
+                model=llm.model, messages=[{"role": "user", "content": "ping"}]
+            )
+            timings.append(time.perf_counter() - start)
+    finally:
+        await registry.aclose()
+    return timings
+
+
+def _summary(label: str, timings: list[float]) -> str:
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    return f"{label:<24} mean={statistics.mean(ms):7.2f}ms  p50={statistics.median(ms):7.2f}ms  p95={p95:7.2f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    with StubServer({"/v1/chat/completions": _fake_completion}, latency=args.latency) as server:
+        base_url = f"{server.url}/v1"
+        fresh = asyncio.run(fresh_client_per_call(base_url, args.calls))
+        shared = asyncio.run(shared_registry_client(base_url, args.calls))
+
+    print(f"calls={args.calls} server latency={args.latency * 1000:.0f}ms")
+    print(_summary("fresh client per call", fresh))
+    print(_summary("shared registry client", shared))
+    print(f"mean latency drop: {(statistics.mean(fresh) - statistics.mean(shared)) * 1000:.2f}ms per call")
+
+
+if __name__ == "__main__":
+    main()
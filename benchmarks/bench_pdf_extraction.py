@@ -0,0 +1,102 @@
+"""
+PDF text extraction time, serial versus page-parallel.
+
+    python -m benchmarks.bench_pdf_extraction --pages 120 --scanned 0.25
+
+Builds a synthetic PDF where a --scanned fraction of the pages carry only
+an image, so they go through OCR. `serial` is the loop extract_text_from_pdf
+used to run in one thread: every page in turn, OCR inline on a full-page
+300 DPI render. `parallel` is stream_pdf_page_records with its text and OCR
+process pools and adaptive OCR (image regions only, DPI from line height,
+raw grayscale samples). The pools are warmed up first so process start-up
+is not counted, and the OCR cache is bypassed. Needs PyMuPDF and tesseract.
+"""
+import argparse
+import asyncio
+import io
+import os
+import tempfile
+import time
+
+import fitz
+import pytesseract
+from PIL import Image
+
+from app.services.file_services import pdf_extraction
+from app.services.file_services.pdf_extraction import shutdown_pdf_pools, stream_pdf_page_records
+
+PARAGRAPH = (
+    "The Contractor shall provide all labor, materials and supervision required "
+    "to deliver the services described in this Scope of Work. "
+)
+
+
+def build_pdf(pages: int, scanned: float) -> bytes:
+    doc = fitz.open()
+    scanned_every = round(1 / scanned) if scanned > 0 else 0
+    for number in range(pages):
+        page = doc.new_page()
+        box = fitz.Rect(72, 72, page.rect.width - 72, page.rect.height - 72)
+        text = f"Section {number + 1}\n" + PARAGRAPH * 25
+        if scanned_every and number % scanned_every == 0:
+            # Render the text and put it back as an image only, like a scan
+            scratch = fitz.open()
+            scratch.new_page().insert_textbox(box, text, fontsize=11)
+            pix = scratch[0].get_pixmap(dpi=150)
+            page.insert_image(page.rect, pixmap=pix)
+        else:
+            page.insert_textbox(box, text, fontsize=11)
+    return doc.tobytes()
+
+
+def extract_serial(pdf: bytes) -> list:
+    pages = []
+    with fitz.open(stream=pdf, filetype="pdf") as doc:
+        for page in doc:
+            text = page.get_text()
+            if text and text.strip():
+                pages.append(text)
+            else:
+                pix = page.get_pixmap(dpi=300)
+                image = Image.open(io.BytesIO(pix.tobytes("png")))
+                pages.append(pytesseract.image_to_string(image))
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=120)
+    parser.add_argument("--scanned", type=float, default=0.25, help="fraction of image-only pages")
+    args = parser.parse_args()
+
+    pdf = build_pdf(args.pages, args.scanned)
+    pdf_extraction.pdf_ocr_cache = None
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pdf")
+        with open(path, "wb") as f:
+            f.write(pdf)
+
+        start = time.perf_counter()
+        serial = extract_serial(pdf)
+        serial_seconds = time.perf_counter() - start
+
+        async def _parallel():
+            async for _ in stream_pdf_page_records(build_pdf(2 * 8, 0.5)):  # warm both pools
+                pass
+            start = time.perf_counter()
+            pages = [record["text"] async for record in stream_pdf_page_records(path)]
+            return pages, time.perf_counter() - start
+
+        try:
+            parallel, parallel_seconds = asyncio.run(_parallel())
+        finally:
+            shutdown_pdf_pools()
+
+    assert len(serial) == len(parallel)
+    print(f"pages={args.pages} scanned={args.scanned:.0%} cpus={os.cpu_count()}")
+    print(f"serial    {serial_seconds:7.2f}s")
+    print(f"parallel  {parallel_seconds:7.2f}s   speedup {serial_seconds / parallel_seconds:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare the old serial `requests.get` SerpAPI loop with the pooled async fan-out.
+
+    python -m benchmarks.bench_serpapi --queries 12 --latency 0.4
+
+Runs against a local stub server, so no SerpAPI key or network is needed.
+"""
+import argparse
+import asyncio
+import time
+
+import requests
+
+from benchmarks.stub_server import StubServer
+from app.core.serpapi.serpapi import SerpAPIClient, parse_serpapi_results
+
+
+def _fake_search(request):
+    query = request["query"].get("q", [""])[0]
+    return {
+        "organic_results": [
+            {"title": f"{query} #{i}", "link": f"https://example.com/{i}", "snippet": f"snippet {i} for {query}"}
+            for i in range(8)
+        ]
+    }
+
+
+def serial_requests(base_url: str, queries: list[str]) -> list:
+    results = []
+    for query in queries:
+        res = requests.get(f"{base_url}/search", params={"engine": "google", "q": query, "api_key": "stub"})
+        results.append(parse_serpapi_results(res.json()))
+    return results
+
+
+async def async_fan_out(base_url: str, queries: list[str], concurrency: int) -> list:
+    client = SerpAPIClient(api_key="stub", base_url=base_url, concurrency=concurrency)
+    try:
+        return await client.search_many(queries)
+    finally:
+        await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=12)
+    parser.add_argument("--latency", type=float, default=0.4)
+    parser.add_argument("--concurrency", type=int, default=6)
+    args = parser.parse_args()
+
+    queries = [f"agency budget {i}" for i in range(args.queries)]
+
+    with StubServer({"/search": _fake_search}, latency=args.latency) as server:
+        start = time.perf_counter()
+        serial = serial_requests(server.url, queries)
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fanned = asyncio.run(async_fan_out(server.url, queries, args.concurrency))
+        async_time = time.perf_counter() - start
+
+    assert serial == fanned
+    print(f"queries={args.queries} latency={args.latency}s concurrency={args.concurrency}")
+    print(f"serial requests.get : {serial_time:.3f}s")
+    print(f"async fan-out       : {async_time:.3f}s  ({serial_time / async_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
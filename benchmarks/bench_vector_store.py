@@ -0,0 +1,89 @@
+"""
+Concurrent retrieval latency through the vector store layer.
+
+    python -m benchmarks.bench_vector_store --queries 20 --latency 0.05
+
+`blocking` calls a Pinecone-like index directly from async code, as
+get_similar_context used to, so every query stalls the event loop.
+`pinecone` runs the same fake index through PineconeVectorStore, which
+offloads each call to a thread. `local` is the in-process NumPy store,
+memory-mapped under --path when given. No API key or network is needed.
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from app.core.vector_store import LocalVectorStore, PineconeVectorStore
+
+
+class FakeIndex:
+    """Mimics the Pinecone Index API with a fixed per-call latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def upsert(self, vectors, namespace=None):
+        time.sleep(self.latency)
+
+    def query(self, vector, top_k, namespace=None, include_metadata=True, filter=None):
+        time.sleep(self.latency)
+        return {"matches": [{"id": "0", "score": 1.0, "metadata": {"text": ""}}]}
+
+    def delete(self, **kwargs):
+        time.sleep(self.latency)
+
+
+async def run_blocking(index: FakeIndex, queries: list) -> float:
+    async def _query(q):
+        return index.query(vector=q, top_k=5, include_metadata=True)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[_query(q) for q in queries])
+    return time.perf_counter() - start
+
+
+async def run_store(store, queries: list) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*[store.query(q, top_k=5, namespace="bench") for q in queries])
+    return time.perf_counter() - start
+
+
+async def main(n_queries: int, latency: float, vectors: int, dimension: int, path: str = None):
+    rng = np.random.default_rng(0)
+    queries = [rng.standard_normal(dimension).tolist() for _ in range(n_queries)]
+
+    blocking = await run_blocking(FakeIndex(latency), queries)
+    offloaded = await run_store(PineconeVectorStore(index=FakeIndex(latency)), queries)
+
+    local = LocalVectorStore(dimension=dimension, path=path)
+    matrix = rng.standard_normal((vectors, dimension)).astype(np.float32)
+    await local.upsert(
+        [(str(i), row, {"text": f"chunk {i}"}) for i, row in enumerate(matrix)],
+        namespace="bench",
+    )
+    local_total = await run_store(local, queries)
+
+    single = []
+    for q in queries:
+        start = time.perf_counter()
+        await local.query(q, top_k=5, namespace="bench")
+        single.append(time.perf_counter() - start)
+
+    print(f"{n_queries} concurrent queries, {latency * 1000:.0f} ms simulated index latency")
+    print(f"  blocking index calls : {blocking:.3f}s")
+    print(f"  PineconeVectorStore  : {offloaded:.3f}s  ({blocking / offloaded:.1f}x)")
+    print(f"  LocalVectorStore     : {local_total:.4f}s  "
+          f"(median single query {sorted(single)[len(single) // 2] * 1000:.3f} ms over {vectors} x {dimension})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--vectors", type=int, default=5000)
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--path", default=None, help="persist the local store here (memory-mapped)")
+    args = parser.parse_args()
+    asyncio.run(main(args.queries, args.latency, args.vectors, args.dimension, args.path))
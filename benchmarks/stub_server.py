@@ -0,0 +1,81 @@
+"""
+Minimal threaded HTTP stub used by the benchmarks in this folder.
+
+Routes map a path to a function returning a JSON-serialisable body; every
+response is delayed by `latency` seconds to stand in for a remote API.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class StubServer:
+    def __init__(self, routes: dict, latency: float = 0.05, host: str = "127.0.0.1", port: int = 0):
+        self.routes = routes
+        self.latency = latency
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body in one segment; avoids Nagle/delayed-ACK stalls on keep-alive
+            disable_nagle_algorithm = True
+            wbufsize = -1
+
+            def _respond(self):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+
+                with stub._lock:
+                    stub.request_count += 1
+
+                route = stub.routes.get(parsed.path)
+                if route is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                request = {
+                    "query": parse_qs(parsed.query),
+                    "json": json.loads(body) if body else None,
+                }
+                time.sleep(stub.latency)
+                payload = json.dumps(route(request)).encode()
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = _respond
+            do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -15,6 +15,13 @@ from sqlalchemy import select
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi.errors import RateLimitExceeded
 from app.core.rate_limiter import limiter
+from app.services.job_services import worker_pool
+from app.core.serpapi.serpapi import serpapi_client, serpapi_cache
+from app.core.llm_client.response_cache import llm_response_cache
+from app.core.llm_client.registry import client_registry
+from app.core.llm_client.telemetry import llm_usage
+from app.core.vector_store import vector_store
+from app.services.file_services.pdf_extraction import pdf_ocr_cache, shutdown_pdf_pools
 
 
 
@@ -86,9 +93,25 @@ async def auto_delete_expired_rfps():
             await db.rollback()
 
 
+async def purge_expired_cache_entries():
+    try:
+        if serpapi_cache is not None:
+            purged = await serpapi_cache.purge_expired()
+            print(f"Purged {purged} expired search cache entries")
+        if llm_response_cache.durable is not None:
+            purged = await llm_response_cache.durable.purge_expired()
+            print(f"Purged {purged} expired LLM cache entries")
+        if pdf_ocr_cache is not None:
+            purged = await pdf_ocr_cache.purge_expired()
+            print(f"Purged {purged} expired OCR cache entries")
+    except Exception as e:
+        print("Cache purge error:", e)
+
+
 def start_scheduler():
     scheduler = AsyncIOScheduler() 
     scheduler.add_job(auto_delete_expired_rfps, 'interval', days=7)
+    scheduler.add_job(purge_expired_cache_entries, 'interval', days=1)
     scheduler.start()
 
 
@@ -98,6 +121,19 @@ async def startup_event():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     start_scheduler()
+    if worker_pool.concurrency > 0:
+        worker_pool.start()
+    llm_usage.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await worker_pool.stop()
+    await llm_usage.aclose()
+    await serpapi_client.aclose()
+    await client_registry.aclose()
+    await vector_store.aclose()
+    shutdown_pdf_pools()
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))